@@ -0,0 +1,50 @@
+"""Throughput of batched shortest-path queries versus worker count.
+
+    python benchmarks/bench_batch_paths.py --nodes 20000 --sources 200 --pairs 2000
+"""
+import argparse
+import os
+import random
+import time
+
+from synthetic import location_name, random_road_graph
+
+from batch_paths import shortest_paths_batch
+from csr_graph import CSRGraph
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--nodes', type=int, default=20000)
+    parser.add_argument('--sources', type=int, default=200)
+    parser.add_argument('--pairs', type=int, default=2000)
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    store = CSRGraph()
+    for i in range(args.nodes):
+        store.add_location(location_name(i))
+    store.add_edges(random_road_graph(args.nodes))
+    rng = random.Random(0)
+    sources = [location_name(rng.randrange(args.nodes)) for _ in range(args.sources)]
+    pairs = [(rng.choice(sources), location_name(rng.randrange(args.nodes))) for _ in range(args.pairs)]
+
+    start = time.perf_counter()
+    for a, b in pairs:
+        store.shortest_path(a, b)
+    single = time.perf_counter() - start
+    print(f"one query at a time: {single:7.2f} s {len(pairs) / single:9.0f} pairs/s")
+
+    expected = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        paths = shortest_paths_batch(store, pairs, workers)
+        elapsed = time.perf_counter() - start
+        expected = expected or [len(p) for p in paths]
+        assert [len(p) for p in paths] == expected
+        print(f"batch, {workers:>2} workers:  {elapsed:7.2f} s {len(pairs) / elapsed:9.0f} pairs/s")
+
+
+if __name__ == '__main__':
+    main()
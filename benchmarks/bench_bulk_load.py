@@ -0,0 +1,78 @@
+"""Bulk edge-import throughput (edges/second) for CSV and .npy inputs.
+
+    python benchmarks/bench_bulk_load.py --edges 500000
+"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from synthetic import random_road_graph
+
+from bulk_loader import iter_edge_chunks, iter_matrix_chunks
+from csr_graph import CSRGraph
+
+
+def write_csv(path, edges):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['source', 'destination', 'distance'])
+        writer.writerows(edges)
+
+
+def load_into_csr(chunks):
+    store = CSRGraph()
+    count = 0
+    for chunk in chunks:
+        store.add_edges(chunk)
+        count += len(chunk)
+    store.csr()
+    return count
+
+
+def load_into_dict(chunks):
+    # Mirrors the default (dict-of-lists) branch of Graph._insert_edges.
+    locations = {}
+    count = 0
+    for chunk in chunks:
+        for source, destination, distance in chunk:
+            locations.setdefault(source, []).append((destination, distance))
+            locations.setdefault(destination, []).append((source, distance))
+        count += len(chunk)
+    return count
+
+
+def report(label, load, chunks):
+    start = time.perf_counter()
+    count = load(chunks)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {count:>9} edges {elapsed:>7.2f} s {count / elapsed:>12,.0f} edges/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--edges', type=int, default=500000)
+    parser.add_argument('--matrix-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    edges = random_road_graph(args.edges // 2, degree=4)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'edges.csv')
+        write_csv(csv_path, edges)
+        report('csv -> CSRGraph', load_into_csr, iter_edge_chunks(csv_path))
+        report('csv -> dict adjacency', load_into_dict, iter_edge_chunks(csv_path))
+
+        rng = np.random.default_rng(0)
+        n = args.matrix_size
+        matrix = rng.uniform(1, 100, (n, n))
+        matrix = np.triu(matrix, 1) + np.triu(matrix, 1).T
+        npy_path = os.path.join(tmp, 'distances.npy')
+        np.save(npy_path, matrix)
+        report(f'npy {n}x{n} -> CSRGraph', load_into_csr, iter_matrix_chunks(npy_path))
+
+
+if __name__ == '__main__':
+    main()
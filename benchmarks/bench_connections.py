@@ -0,0 +1,65 @@
+"""Build and query the user/company connection graph from the product table.
+
+    python benchmarks/bench_connections.py --users 1000000 --companies 50000
+"""
+import argparse
+import time
+
+import numpy as np
+
+import synthetic  # noqa: F401  (puts code/ on sys.path)
+
+from connections import Connections
+from products import ProductTable
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=1000000)
+    parser.add_argument('--companies', type=int, default=50000)
+    parser.add_argument('--orders', type=int, default=3000000)
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    table = ProductTable()
+    table.users = [f"user{i}" for i in range(args.users)]
+    table.user_ids = {user: i for i, user in enumerate(table.users)}
+    table.user_column.extend(rng.integers(0, args.users, args.orders))
+    # A skewed company popularity, as with real suppliers.
+    table.company_column.extend(np.minimum(rng.zipf(1.3, args.orders) - 1, args.companies - 1))
+    table.name_column.extend(np.zeros(args.orders))
+    table.day_column.extend(np.zeros(args.orders))
+
+    start = time.perf_counter()
+    connections = Connections.from_products(table)
+    built = time.perf_counter() - start
+    print(f"build from {args.orders} orders: {built:.2f} s, {len(connections)} links, "
+          f"{connections.keys().nbytes / 2**20:.0f} MB of keys")
+
+    users = rng.integers(0, args.users, args.queries)
+    before = len(connections)
+    start = time.perf_counter()
+    for u in table.user_column.view()[:args.queries].tolist():
+        connections.add(table.users[u], connections.companies_of(table.users[u])[0])
+    print(f"re-adding {args.queries} existing links one by one: {(time.perf_counter() - start) * 1e3:.0f} ms, "
+          f"link count unchanged: {before == len(connections)}")
+    start = time.perf_counter()
+    connections.add_many((f"new{i}", companies) for i, companies in enumerate(connections.companies[:args.queries]))
+    len(connections)
+    print(f"adding {args.queries} new links in bulk: {(time.perf_counter() - start) * 1e3:.0f} ms")
+
+    companies = connections.companies
+    for label, query, keys in (("companies_of", connections.companies_of, [table.users[u] for u in users.tolist()]),
+                               ("users_of", connections.users_of, [companies[c] for c in range(args.queries)]),
+                               ("shared_users", connections.shared_users, [companies[c] for c in range(args.queries)])):
+        query(keys[0])
+        start = time.perf_counter()
+        for key in keys:
+            query(key)
+        print(f"{label:>13}: {(time.perf_counter() - start) / len(keys) * 1e3:.3f} ms per query")
+
+
+if __name__ == '__main__':
+    main()
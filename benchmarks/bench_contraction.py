@@ -0,0 +1,60 @@
+"""Contraction-hierarchy preprocessing cost and query latency vs Dijkstra.
+
+    python benchmarks/bench_contraction.py --sizes 10000 100000
+"""
+import argparse
+import random
+import time
+
+from synthetic import grid_road_graph
+
+from contraction import ContractionHierarchy
+from csr_graph import CSRGraph
+from shortest_path import csr_dijkstra
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--highway-every', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'nodes':>8} {'build (s)':>10} {'shortcuts':>10} {'settled':>8} "
+          f"{'ch query (ms)':>14} {'dijkstra (ms)':>14} {'speedup':>8}")
+    for n in args.sizes:
+        edges, _ = grid_road_graph(n, seed=args.seed, highway_every=args.highway_every)
+        store = CSRGraph()
+        store.add_edges(edges)
+        start = time.perf_counter()
+        hierarchy = ContractionHierarchy.build(store)
+        build = time.perf_counter() - start
+
+        rng = random.Random(args.seed)
+        pairs = [tuple(rng.sample(store.names, 2)) for _ in range(args.queries)]
+        hierarchy.query(*pairs[0])    # converts the arrays to lists once
+        settled = 0
+        start = time.perf_counter()
+        results = []
+        for source, target in pairs:
+            _, cost, count = hierarchy.query(source, target)
+            results.append(cost)
+            settled += count
+        query = (time.perf_counter() - start) / len(pairs)
+
+        checked = pairs[:max(1, len(pairs) // 20)]
+        views = store.views()
+        start = time.perf_counter()
+        for (source, target), cost in zip(checked, results):
+            target_id = store.ids[target]
+            dist, _ = csr_dijkstra(*views, store.ids[source], target_id)
+            assert abs(dist[target_id] - cost) < 1e-6, "hierarchy disagrees with dijkstra"
+        dijkstra = (time.perf_counter() - start) / len(checked)
+
+        print(f"{len(store):>8} {build:>10.1f} {hierarchy.num_shortcuts:>10} {settled // len(pairs):>8} "
+              f"{query * 1e3:>14.3f} {dijkstra * 1e3:>14.2f} {dijkstra / query:>7.0f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Memory footprint of the dict + networkx graph versus the CSR backend.
+
+    python benchmarks/bench_csr_memory.py --sizes 100000 1000000
+"""
+import argparse
+import time
+import tracemalloc
+
+import networkx as nx
+
+from synthetic import location_name, random_road_graph
+
+from csr_graph import CSRGraph
+
+
+def build_dict_graph(n, edges):
+    # Same writes as the default Graph.add_location/add_edge.
+    locations = {}
+    graph = nx.Graph()
+    for i in range(n):
+        locations[location_name(i)] = []
+    for source, destination, distance in edges:
+        locations[source].append((destination, distance))
+        locations[destination].append((source, distance))
+        graph.add_edge(source, destination, weight=distance)
+    return locations, graph
+
+
+def build_csr_graph(n, edges):
+    store = CSRGraph()
+    for i in range(n):
+        store.add_location(location_name(i))
+    for source, destination, distance in edges:
+        store.add_edge(source, destination, distance)
+    store.csr()
+    return store
+
+
+def measure(build, n, edges):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build(n, edges)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--degree', type=int, default=6)
+    args = parser.parse_args()
+
+    print(f"{'nodes':>9} {'edges':>9} {'dict+nx MB':>11} {'CSR MB':>8} {'bytes/edge CSR':>15} {'ratio':>6}")
+    for n in args.sizes:
+        edges = random_road_graph(n, degree=args.degree)
+        dict_bytes, _ = measure(build_dict_graph, n, edges)
+        csr_bytes, _ = measure(build_csr_graph, n, edges)
+        print(f"{n:>9} {len(edges):>9} {dict_bytes / 2**20:>11.1f} {csr_bytes / 2**20:>8.1f} "
+              f"{csr_bytes / len(edges):>15.1f} {dict_bytes / csr_bytes:>5.1f}x")
+
+
+if __name__ == '__main__':
+    main()
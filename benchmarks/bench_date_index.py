@@ -0,0 +1,66 @@
+"""Date-range queries through the sorted date index against a full scan.
+
+    python benchmarks/bench_date_index.py --orders 5000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+import synthetic  # noqa: F401  (puts code/ on sys.path)
+
+from products import ProductTable, today
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--orders', type=int, default=5000000)
+    parser.add_argument('--companies', type=int, default=5000)
+    parser.add_argument('--days', type=int, default=3 * 365)
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    reference = today()
+    table = ProductTable()
+    table.users = ['user']
+    table.company_column.extend(rng.integers(0, args.companies, args.orders))
+    table.day_column.extend(reference - rng.integers(0, args.days, args.orders))
+    table.name_column.extend(np.zeros(args.orders))
+    table.user_column.extend(np.zeros(args.orders))
+
+    start = time.perf_counter()
+    index = table.date_index()._refresh()
+    print(f"index {args.orders} orders: {time.perf_counter() - start:.2f} s")
+
+    companies = rng.integers(0, args.companies, args.queries).tolist()
+    days, company_column = table.days, table.companies
+    for label, query in (
+            ("last 3 days", lambda c: index.rows_between(reference - 2, reference)),
+            ("company, last 30 days", lambda c: index.rows_between(reference - 29, reference, c)),
+            ("company, 90-day histogram", lambda c: index.day_counts(reference - 89, reference, c)),
+            ("oldest 10 undelivered", lambda c: index.oldest_undelivered(reference, 10, c)),
+            ("scan: company, last 30 days",
+             lambda c: np.flatnonzero((company_column == c) & (days >= reference - 29)))):
+        queries = companies if not label.startswith('scan') else companies[:20]
+        start = time.perf_counter()
+        for company in queries:
+            query(company)
+        print(f"{label:>28}: {(time.perf_counter() - start) / len(queries) * 1e3:.3f} ms per query")
+
+    # Dashboard polls while orders keep arriving: 1000 new orders per poll.
+    polls = 200
+    elapsed = 0.0
+    for _ in range(polls):
+        table.company_column.extend(rng.integers(0, args.companies, 1000))
+        table.day_column.extend(np.full(1000, reference))
+        table.name_column.extend(np.zeros(1000))
+        table.user_column.extend(np.zeros(1000))
+        start = time.perf_counter()
+        index.rows_between(reference, reference)
+        elapsed += time.perf_counter() - start
+    print(f"poll after 1000 new orders: {elapsed / polls * 1e3:.2f} ms on average over {polls} polls")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""Array-based dense Dijkstra versus the heap engine on complete graphs.
+
+    python benchmarks/bench_dense_dijkstra.py --sizes 500 1000 2000 5000
+"""
+import argparse
+import time
+
+import numpy as np
+
+import synthetic  # noqa: F401  (puts code/ on sys.path)
+
+from shortest_path import dense_dijkstra, dijkstra
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 1000, 2000, 5000])
+    parser.add_argument('--heap-limit', type=int, default=2000,
+                        help="skip the heap engine above this many stops")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'stops':>6} {'dense (ms)':>11} {'heap (ms)':>10}")
+    for n in args.sizes:
+        matrix = rng.uniform(1, 100, (n, n))
+        matrix = (matrix + matrix.T) / 2
+        np.fill_diagonal(matrix, 0)
+
+        start = time.perf_counter()
+        dist, _ = dense_dijkstra(matrix, 0)
+        dense = time.perf_counter() - start
+
+        heap = float('nan')
+        if n <= args.heap_limit:
+            adjacency = {i: [(j, w) for j, w in enumerate(row) if j != i] for i, row in enumerate(matrix.tolist())}
+            start = time.perf_counter()
+            expected, _ = dijkstra(adjacency, 0)
+            heap = time.perf_counter() - start
+            assert np.allclose(dist, [expected[i] for i in range(n)])
+        print(f"{n:>6} {dense * 1e3:>11.1f} {heap * 1e3:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Import time of the entry-point modules, checked against a budget.
+
+    python benchmarks/bench_import_time.py --repeat 5
+
+Each module is imported in a fresh interpreter under ``-X importtime``.
+The exit status is 1 if any module goes over its budget or pulls in a
+drawing/graph library at import, so the script can gate CI.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+CODE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'code')
+
+# Cumulative import time allowed per module, in ms.  integrated_with_turtle
+# and basic need NumPy up front (product table, dense matrices).
+BUDGETS = {'Advanced': 60, 'service': 60, 'integrated_with_turtle': 250, 'basic': 250}
+# Only loaded on demand (visualize_graph, the networkx path, turtle drawing).
+HEAVY = ('networkx', 'matplotlib', 'tkinter', 'turtle')
+
+
+def import_time(module):
+    """(cumulative ms for ``import module``, heavy modules it loaded)."""
+    probe = f"import {module}, sys; print(','.join(m for m in {HEAVY!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', probe], cwd=CODE,
+                            capture_output=True, text=True, check=True)
+    for line in result.stderr.splitlines():
+        parts = [part.strip() for part in line.split('|')]
+        if len(parts) == 3 and parts[2] == module:
+            cumulative = int(parts[1])
+    loaded = [name for name in result.stdout.strip().split(',') if name]
+    return cumulative / 1e3, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--modules', nargs='+', default=list(BUDGETS))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--scale', type=float, default=1.0, help="multiply every budget (slow machines)")
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'module':>24} {'import (ms)':>12} {'budget (ms)':>12}  heavy modules loaded")
+    for module in args.modules:
+        runs = [import_time(module) for _ in range(args.repeat)]
+        best = min(ms for ms, _ in runs)
+        loaded = runs[0][1]
+        budget = BUDGETS.get(module, 100) * args.scale
+        ok = best <= budget and not loaded
+        failed |= not ok
+        print(f"{module:>24} {best:>12.1f} {budget:>12.0f}  {', '.join(loaded) or '-'}{'' if ok else '  FAIL'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
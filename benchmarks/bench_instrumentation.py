@@ -0,0 +1,53 @@
+"""Cost of the instrumentation hooks, switched off and on.
+
+    python benchmarks/bench_instrumentation.py --nodes 10000 --queries 200
+"""
+import argparse
+import random
+import time
+
+from synthetic import grid_road_graph
+
+import instrumentation
+from Advanced import Graph
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--nodes', type=int, default=10000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--calls', type=int, default=200000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    def bare(x):
+        return x
+
+    timed = instrumentation.timed('bare')(bare)
+    for label, func, on in (('undecorated', bare, False), ('timed, off', timed, False), ('timed, on', timed, True)):
+        instrumentation.enable(on)
+        start = time.perf_counter()
+        for i in range(args.calls):
+            func(i)
+        print(f"{label:>12}: {(time.perf_counter() - start) / args.calls * 1e9:6.0f} ns per call")
+
+    edges, _ = grid_road_graph(args.nodes, seed=args.seed)
+    graph = Graph(compact=True)
+    graph.add_edges(edges)
+    names = list(graph.locations)
+    rng = random.Random(args.seed)
+    pairs = [(rng.choice(names), rng.choice(names)) for _ in range(args.queries)]
+    graph.get_shortest_path(*pairs[0])   # builds the CSR index
+    for on in (False, True, False, True):
+        instrumentation.reset()
+        instrumentation.enable(on)
+        start = time.perf_counter()
+        for source, target in pairs:
+            graph.get_shortest_path(source, target)
+        elapsed = time.perf_counter() - start
+        print(f"{len(pairs)} queries, instrumentation {'on ' if on else 'off'}: {elapsed / len(pairs) * 1e3:.2f} ms per query")
+    instrumentation.enable(False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""Stream a JSON-lines order history into the graph and read the reports.
+
+    python benchmarks/bench_order_stream.py --orders 1000000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+import synthetic  # noqa: F401  (puts code/ on sys.path)
+
+from integrated_with_turtle import Graph
+from order_stream import CHUNK_SIZE
+from products import from_day, today
+
+
+def write_events(path, orders, companies, users, seed):
+    rng = np.random.default_rng(seed)
+    company_ids = np.minimum(rng.zipf(1.3, orders) - 1, companies - 1).tolist()
+    names = rng.integers(0, 1000, orders).tolist()
+    days = (today() - rng.integers(0, 365, orders)).tolist()
+    dates = {day: from_day(day) for day in set(days)}
+    user_ids = rng.integers(0, users, orders).tolist()
+    with open(path, 'w') as f:
+        for company_id, name, day, user in zip(company_ids, names, days, user_ids):
+            f.write(json.dumps({'company_id': company_id, 'name': f"product{name}",
+                                'date': dates[day], 'user_id': f"user{user}"}) + '\n')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--orders', type=int, default=1000000)
+    parser.add_argument('--companies', type=int, default=5000)
+    parser.add_argument('--users', type=int, default=200000)
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix='.jsonl')
+    os.close(fd)
+    try:
+        write_events(path, args.orders, args.companies, args.users, args.seed)
+        graph = Graph()
+        start = time.perf_counter()
+        count = graph.ingest_orders(path, args.chunk_size)
+        elapsed = time.perf_counter() - start
+        print(f"ingest {count} orders: {elapsed:.2f} s, {count / elapsed:,.0f} events/s")
+    finally:
+        os.remove(path)
+
+    reference = today()
+    for label, report in (("status counts", lambda: graph.get_delivery_status_counts(reference)),
+                          ("average delivery time", lambda: graph.get_average_delivery_time(reference)),
+                          ("company summary", lambda: graph.get_company_order_summary(0, reference))):
+        start = time.perf_counter()
+        report()
+        print(f"{label:>22}: {(time.perf_counter() - start) * 1e3:.2f} ms")
+    start = time.perf_counter()
+    graph.products.status_counts(reference)
+    print(f"{'full rescan (before)':>22}: {(time.perf_counter() - start) * 1e3:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
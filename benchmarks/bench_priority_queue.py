@@ -0,0 +1,87 @@
+"""Heap-backed PriorityQueue versus the previous linear-scan class.
+
+    python benchmarks/bench_priority_queue.py --sizes 10000 100000 1000000
+"""
+import argparse
+import random
+import time
+
+import synthetic  # noqa: F401  (puts code/ on sys.path)
+
+from priority_queue import PriorityQueue
+
+
+class LegacyPriorityQueue:
+    # The previous integrated_with_turtle.PriorityQueue.
+    def __init__(self):
+        self.queue = []
+
+    def push(self, priority, item):
+        self.queue.append((priority, item))
+
+    def pop(self):
+        if not self.is_empty():
+            min_index = 0
+            for i in range(1, len(self.queue)):
+                if self.queue[i][0] < self.queue[min_index][0]:
+                    min_index = i
+            return self.queue.pop(min_index)[1]
+
+    def is_empty(self):
+        return len(self.queue) == 0
+
+
+def push_pop(queue_class, pairs):
+    queue = queue_class()
+    start = time.perf_counter()
+    for priority, item in pairs:
+        queue.push(priority, item)
+    while not queue.is_empty():
+        queue.pop()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--legacy-limit', type=int, default=20000,
+                        help="larger legacy runs are extrapolated (pop is O(n))")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'items':>8} {'legacy push+drain':>18} {'heap push+drain':>16} "
+          f"{'push_many+drain':>16} {'10% updates':>12} {'10% removes':>12}")
+    for n in args.sizes:
+        pairs = [(rng.randrange(n), i) for i in range(n)]
+        if n <= args.legacy_limit:
+            legacy = f"{push_pop(LegacyPriorityQueue, pairs):17.2f}s"
+        else:
+            sample = args.legacy_limit
+            estimate = push_pop(LegacyPriorityQueue, pairs[:sample]) * (n / sample) ** 2
+            legacy = f"~{estimate:16.0f}s"
+        heap = push_pop(PriorityQueue, pairs)
+
+        queue = PriorityQueue()
+        start = time.perf_counter()
+        queue.push_many(pairs)
+        while not queue.is_empty():
+            queue.pop()
+        bulk = time.perf_counter() - start
+
+        queue = PriorityQueue()
+        queue.push_many(pairs)
+        touched = rng.sample(range(n), n // 10)
+        start = time.perf_counter()
+        for item in touched:
+            queue.update_priority(item, rng.randrange(n))
+        updates = time.perf_counter() - start
+        start = time.perf_counter()
+        for item in touched:
+            queue.remove(item)
+        removes = time.perf_counter() - start
+
+        print(f"{n:>8} {legacy:>18} {heap:>15.2f}s {bulk:>15.2f}s {updates:>11.3f}s {removes:>11.3f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Indexed versus scanning product lookups, and columnar versus dict storage.
+
+    python benchmarks/bench_product_index.py --products 1000000
+"""
+import argparse
+import random
+import time
+import tracemalloc
+from array import array
+
+import synthetic  # noqa: F401  (puts code/ on sys.path)
+
+from products import ProductTable
+
+
+def scan_search(company_products, name):
+    # The previous search_product_by_name loop.
+    found = []
+    for company_id, products in company_products.items():
+        for product in products:
+            if product['name'] == name:
+                found.append((company_id, product))
+    return found
+
+
+def scan_companies_by_user(company_products, user_id):
+    # The previous Graph.get_companies_by_user loop (duplicates included).
+    companies = []
+    for company_id, products in company_products.items():
+        for product in products:
+            if product['user_id'] == user_id:
+                companies.append(company_id)
+    return companies
+
+
+def timed(func, *args, repeat=5):
+    func(*args)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func(*args)
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--products', type=int, default=1000000)
+    parser.add_argument('--companies', type=int, default=5000)
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--names', type=int, default=20000)
+    args = parser.parse_args()
+
+    def orders():
+        # Fresh string objects per order, as input() would produce.
+        rng = random.Random(0)
+        for _ in range(args.products):
+            yield (rng.randrange(args.companies), f"product-{rng.randrange(args.names)}",
+                   f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}", f"user-{rng.randrange(args.users)}")
+
+    # Previous layout: one dict per order, kept per company and per user.
+    tracemalloc.start()
+    company_products, user_products = {}, {}
+    for company_id, name, date, user_id in orders():
+        product = {'name': name, 'date': date, 'user_id': user_id}
+        company_products.setdefault(company_id, []).append(product)
+        user_products.setdefault(user_id, []).append(product)
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    # New layout: one table row per order, row indices per company and user
+    # (what Graph.add_product_to_node stores).
+    tracemalloc.start()
+    table = ProductTable()
+    company_rows, user_rows = {}, {}
+    for company_id, name, date, user_id in orders():
+        row = table.append(company_id, name, date, user_id)
+        company_rows.setdefault(company_id, array('q')).append(row)
+        user_rows.setdefault(user_id, array('q')).append(row)
+    table_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    print(f"{args.products} orders: dicts {dict_bytes / 2**20:.0f} MB, "
+          f"product table {table_bytes / 2**20:.0f} MB ({dict_bytes / table_bytes:.1f}x smaller)")
+
+    name, user = 'product-7', 'user-7'
+    scan, expected = timed(scan_search, company_products, name, repeat=1)
+    indexed, got = timed(table.products_named, name)
+    assert sorted(map(repr, got)) == sorted(map(repr, expected))
+    print(f"search by name:      scan {scan * 1e3:9.2f} ms  indexed {indexed * 1e6:8.2f} us")
+
+    scan, expected = timed(scan_companies_by_user, company_products, user, repeat=1)
+    indexed, got = timed(lambda u: table.companies_of(user_rows.get(u, [])), user)
+    assert got == sorted(set(expected))
+    print(f"companies by user:   scan {scan * 1e3:9.2f} ms  indexed {indexed * 1e6:8.2f} us")
+
+
+if __name__ == '__main__':
+    main()
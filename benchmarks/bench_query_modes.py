@@ -0,0 +1,53 @@
+"""Locations settled and latency per point-to-point search mode.
+
+    python benchmarks/bench_query_modes.py --sizes 10000 100000
+"""
+import argparse
+import random
+import time
+
+from synthetic import grid_road_graph, to_adjacency
+
+from shortest_path import SEARCH_ALGORITHMS, Landmarks, coordinate_scale, point_to_point
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--queries', type=int, default=20)
+    parser.add_argument('--landmarks', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'nodes':>8} {'mode':>14} {'settled':>10} {'query (ms)':>11} {'vs dijkstra':>12}")
+    for n in args.sizes:
+        edges, coordinates = grid_road_graph(n, seed=args.seed)
+        adjacency = to_adjacency(edges)
+        start = time.perf_counter()
+        scale = coordinate_scale(adjacency, coordinates)
+        landmarks = Landmarks(adjacency, args.landmarks)
+        setup = time.perf_counter() - start
+        rng = random.Random(args.seed)
+        names = list(adjacency)
+        pairs = [tuple(rng.sample(names, 2)) for _ in range(args.queries)]
+
+        baseline = None
+        for algorithm in SEARCH_ALGORITHMS:
+            settled, costs = 0, []
+            start = time.perf_counter()
+            for source, target in pairs:
+                _, cost, count = point_to_point(adjacency, source, target, algorithm,
+                                                coordinates, scale, landmarks)
+                settled += count
+                costs.append(cost)
+            elapsed = (time.perf_counter() - start) / len(pairs)
+            if baseline is None:
+                baseline, expected = elapsed, costs
+            assert all(abs(a - b) < 1e-6 for a, b in zip(costs, expected)), f"{algorithm} disagrees with dijkstra"
+            print(f"{len(adjacency):>8} {algorithm:>14} {settled // len(pairs):>10} "
+                  f"{elapsed * 1e3:>11.2f} {baseline / elapsed:>11.1f}x")
+        print(f"{'':>8} {'setup (s)':>14} {setup:>10.2f}  (coordinate scale + {args.landmarks} landmarks)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Vectorised delivery-status / average-delivery-time reports versus the
+per-product strptime loops they replaced.
+
+    python benchmarks/bench_reports.py --orders 10000000
+"""
+import argparse
+import datetime
+import time
+
+import numpy as np
+
+import synthetic  # noqa: F401  (puts code/ on sys.path)
+
+from products import ProductTable, from_day, today
+
+
+def legacy_reports(dates):
+    # The previous per-product loops: strptime and now() once per order.
+    total, buckets = 0, {'In-transit': 0, 'Out of delivery': 0, 'Delivered': 0}
+    for date in dates:
+        order_date = datetime.datetime.strptime(date, "%Y-%m-%d").date()
+        days_difference = (datetime.datetime.now().date() - order_date).days
+        total += days_difference
+        if days_difference < 3:
+            buckets['In-transit'] += 1
+        elif days_difference <= 5:
+            buckets['Out of delivery'] += 1
+        else:
+            buckets['Delivered'] += 1
+    return total / len(dates), buckets
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--orders', type=int, default=10000000)
+    parser.add_argument('--companies', type=int, default=50000)
+    parser.add_argument('--legacy-sample', type=int, default=100000,
+                        help="orders timed with the old loop (extrapolated to --orders)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    now = today()
+    table = ProductTable()
+    # Fill the columns directly; per-row append() is not what is measured here.
+    table.company_column.extend(rng.integers(0, args.companies, args.orders))
+    table.day_column.extend(now - rng.integers(0, 30, args.orders))
+
+    start = time.perf_counter()
+    company_ids, counts = table.status_counts(now)
+    average = table.average_delivery_days(now)
+    vectorised = time.perf_counter() - start
+
+    sample = [from_day(day) for day in table.days[:args.legacy_sample]]
+    start = time.perf_counter()
+    legacy_reports(sample)
+    legacy = (time.perf_counter() - start) * args.orders / len(sample)
+
+    print(f"{args.orders} orders, {len(company_ids)} companies, mean {average:.2f} days")
+    print(f"vectorised status counts + mean: {vectorised:8.3f} s")
+    print(f"legacy loops (extrapolated):     {legacy:8.1f} s")
+
+
+if __name__ == '__main__':
+    main()
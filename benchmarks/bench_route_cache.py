@@ -0,0 +1,68 @@
+"""Dispatcher-style repeated route queries with and without the route cache.
+
+    python benchmarks/bench_route_cache.py --locations 20000 --queries 5000
+"""
+import argparse
+import random
+import time
+
+import synthetic
+
+from Advanced import Graph
+
+
+def run(graph, queries):
+    start = time.perf_counter()
+    for kind, source, target in queries:
+        if kind == 'path':
+            graph.get_shortest_path(source, target)
+        else:
+            graph.get_next_delivery_location(source)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--locations', type=int, default=20000)
+    parser.add_argument('--queries', type=int, default=5000)
+    parser.add_argument('--depots', type=int, default=10)
+    parser.add_argument('--pairs', type=int, default=500, help="distinct start/end pairs asked about")
+    parser.add_argument('--compact', action='store_true')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    edges, _ = synthetic.grid_road_graph(args.locations, seed=args.seed)
+    names = sorted({source for source, _, _ in edges})
+    depots = rng.sample(names, args.depots)
+    pairs = [(rng.choice(depots), rng.choice(names)) for _ in range(args.pairs)]
+    queries = [('next', source, None) if rng.random() < 0.1 else ('path', source, target)
+               for source, target in (rng.choice(pairs) for _ in range(args.queries))]
+
+    results = {}
+    for label, cached in (("no cache", False), ("route cache", True)):
+        graph = Graph(args.compact)
+        graph.add_edges(edges)
+        if not cached:
+            graph.route_cache = None
+        # The uncached run is slow on big graphs; time a slice and scale it.
+        sample = queries if cached else queries[:max(50, len(queries) // 20)]
+        elapsed = run(graph, sample) * len(queries) / len(sample)
+        results[label] = elapsed
+        print(f"{label:>12}: {elapsed:.2f} s for {len(queries)} queries "
+              f"({elapsed / len(queries) * 1e3:.3f} ms each)")
+        if cached:
+            print(f"{'':>12}  {graph.route_cache.stats()}")
+    print(f"speedup: {results['no cache'] / results['route cache']:.1f}x")
+
+    # Live traffic: lengthening one edge evicts only routes that use it.
+    source, destination, distance = edges[len(edges) // 2]
+    before = len(graph.route_cache)
+    start = time.perf_counter()
+    graph.update_edge_weight(source, destination, distance * 2)
+    print(f"lengthen one edge: {(time.perf_counter() - start) * 1e3:.2f} ms, "
+          f"entries {before} -> {len(graph.route_cache)}")
+
+
+if __name__ == '__main__':
+    main()
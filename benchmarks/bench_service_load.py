@@ -0,0 +1,86 @@
+"""Load test for the JSON-lines server: p50/p99 latency and requests/second.
+
+Starts ``code/service.py`` on a free localhost port with a synthetic road
+network, then drives it with concurrent asyncio clients.
+
+    python benchmarks/bench_service_load.py --nodes 20000 --clients 50 --requests 100
+"""
+import argparse
+import asyncio
+import csv
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from synthetic import CODE_DIR, location_name, random_road_graph
+
+
+async def client(host, port, requests, latencies, rng, nodes, pipeline):
+    reader, writer = await asyncio.open_connection(host, port, limit=2**24)
+    pending = {}
+    for i in range(requests):
+        if rng.random() < 0.8:
+            a, b = rng.randrange(nodes), rng.randrange(nodes)
+            request = {'id': i, 'op': 'shortest_path',
+                       'args': {'start_location': location_name(a), 'end_location': location_name(b)}}
+        else:
+            request = {'id': i, 'op': 'next_location',
+                       'args': {'current_location': location_name(rng.randrange(nodes))}}
+        pending[i] = time.perf_counter()
+        writer.write(json.dumps(request).encode() + b'\n')
+        if len(pending) >= pipeline:
+            await writer.drain()
+            response = json.loads(await reader.readline())
+            assert 'error' not in response, response
+            latencies.append(time.perf_counter() - pending.pop(response['id']))
+    await writer.drain()
+    while pending:
+        response = json.loads(await reader.readline())
+        assert 'error' not in response, response
+        latencies.append(time.perf_counter() - pending.pop(response['id']))
+    writer.close()
+
+
+async def run(host, port, args):
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, args.requests, latencies, random.Random(i), args.nodes, args.pipeline)
+                           for i in range(args.clients)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    pick = lambda q: latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1e3
+    print(f"{len(latencies)} requests from {args.clients} clients in {elapsed:.2f} s: "
+          f"{len(latencies) / elapsed:,.0f} req/s, p50 {pick(0.5):.2f} ms, p99 {pick(0.99):.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--nodes', type=int, default=20000)
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=100, help="per client")
+    parser.add_argument('--pipeline', type=int, default=1, help="requests in flight per client")
+    parser.add_argument('--threads', type=int)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        edges = os.path.join(tmp, 'edges.csv')
+        with open(edges, 'w', newline='') as f:
+            csv.writer(f).writerows(random_road_graph(args.nodes))
+        command = [sys.executable, os.path.join(CODE_DIR, 'service.py'), '--port', '0', '--edges', edges]
+        if args.threads:
+            command += ['--threads', str(args.threads)]
+        server = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+        try:
+            host, port = server.stdout.readline().split()[-1].rsplit(':', 1)
+            asyncio.run(run(host, int(port), args))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Compare the shortest-path engine with the old heap-rescan next-stop search.
+
+    python benchmarks/bench_shortest_path.py --sizes 1000 10000 100000
+"""
+import argparse
+import heapq
+import random
+import time
+
+from synthetic import random_road_graph, to_adjacency
+
+from shortest_path import dijkstra, nearest_location
+
+
+def legacy_next_delivery_location(locations, current_location):
+    # Verbatim copy of the previous Graph.get_next_delivery_location.
+    heap = []
+    for location in locations:
+        if location != current_location:
+            heapq.heappush(heap, (float('inf'), location))
+    heapq.heappush(heap, (0, current_location))
+
+    while heap:
+        cost, location = heapq.heappop(heap)
+        if cost == float('inf'):
+            break
+        if location != current_location:
+            return location
+
+        for neighbor, edge_distance in locations[location]:
+            new_cost = cost + edge_distance
+            for i in range(len(heap)):
+                if heap[i][1] == neighbor:
+                    if new_cost < heap[i][0]:
+                        heap[i] = (new_cost, neighbor)
+                        heapq.heapify(heap)
+                    break
+    return None
+
+
+def time_queries(func, adjacency, sources):
+    start = time.perf_counter()
+    results = [func(adjacency, source) for source in sources]
+    return (time.perf_counter() - start) / len(sources), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--queries', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'nodes':>8} {'edges':>8} {'legacy next (ms)':>17} {'engine next (ms)':>17} "
+          f"{'speedup':>8} {'engine full SSSP (ms)':>22}")
+    for n in args.sizes:
+        edges = random_road_graph(n, seed=args.seed)
+        adjacency = to_adjacency(edges)
+        rng = random.Random(args.seed)
+        sources = [rng.choice(list(adjacency)) for _ in range(args.queries)]
+
+        legacy, expected = time_queries(legacy_next_delivery_location, adjacency, sources)
+        engine, got = time_queries(nearest_location, adjacency, sources)
+        assert got == expected, "engine and legacy disagree on the next stop"
+        full, _ = time_queries(dijkstra, adjacency, sources)
+
+        print(f"{n:>8} {len(edges):>8} {legacy * 1e3:>17.3f} {engine * 1e3:>17.3f} "
+              f"{legacy / engine:>7.0f}x {full * 1e3:>22.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""Snapshot round trip and cold start-up time of a memory-mapped load.
+
+    python benchmarks/bench_snapshot.py --nodes 1000000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from synthetic import CODE_DIR, location_name, random_road_graph
+
+from csr_graph import CSRGraph
+from products import ProductTable
+from snapshot import load_graph, read_arrays, save_graph
+
+STARTUP = """
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, {code!r})
+from csr_graph import CSRGraph
+from snapshot import load_graph
+class Graph:
+    def __init__(self, compact=False):
+        self.compact = compact
+imported = time.perf_counter()
+graph = load_graph(Graph, {path!r}, mmap={mmap})
+loaded = time.perf_counter()
+graph.locations.nearest_location('L12345')
+graph.locations.shortest_path('L1000', 'L1010')
+print(imported - start, loaded - imported, time.perf_counter() - imported)
+"""
+
+
+class _Graph:
+    # Minimal stand-in with the attributes save_graph/load_graph use.
+    def __init__(self, compact=False):
+        self.compact = compact
+        self.nodes, self.user_products = {}, {}
+        self.products = ProductTable()
+
+    def add_node(self, company_id):
+        self.nodes.setdefault(company_id, SimpleNamespace(products=None))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--nodes', type=int, default=1000000)
+    parser.add_argument('--products', type=int, default=1000000)
+    args = parser.parse_args()
+
+    graph = _Graph(compact=True)
+    graph.locations = CSRGraph()
+    for i in range(args.nodes):
+        graph.locations.add_location(location_name(i))
+    graph.locations.add_edges(random_road_graph(args.nodes))
+    rng = np.random.default_rng(0)
+    graph.products.names, graph.products.users = ['gas', 'oil'], ['ann', 'bob']
+    graph.products.name_column.extend(rng.integers(0, 2, args.products))
+    graph.products.user_column.extend(rng.integers(0, 2, args.products))
+    graph.products.company_column.extend(rng.integers(0, 1000, args.products))
+    graph.products.day_column.extend(rng.integers(19000, 20000, args.products))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'network.snap')
+        start = time.perf_counter()
+        save_graph(graph, path)
+        print(f"save: {time.perf_counter() - start:.2f} s, {os.path.getsize(path) / 2**20:.0f} MB")
+
+        arrays, _ = read_arrays(path)
+        for name, original in (('csr_offsets', graph.locations.csr()[0]),
+                               ('csr_targets', graph.locations.csr()[1]),
+                               ('product_day', graph.products.days)):
+            assert np.array_equal(arrays[name], original), name
+        loaded = load_graph(_Graph, path)
+        for a, b in (('L0', 'L100'), ('L5', 'L77')):
+            assert loaded.locations.shortest_path(a, b) == graph.locations.shortest_path(a, b)
+        print("round trip: ok")
+
+        for mmap in (True, False):
+            out = subprocess.run([sys.executable, '-c', STARTUP.format(code=CODE_DIR, path=path, mmap=mmap)],
+                                 capture_output=True, text=True, check=True).stdout.split()
+            imported, loaded, answered = (float(x) * 1e3 for x in out)
+            print(f"fresh process, mmap={mmap!s:5}: imports {imported:6.1f} ms, load {loaded:7.1f} ms, "
+                  f"first queries answered {answered:7.1f} ms after import")
+
+
+if __name__ == '__main__':
+    main()
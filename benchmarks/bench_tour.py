@@ -0,0 +1,49 @@
+"""Tour quality versus runtime for the multi-stop route optimizer.
+
+    python benchmarks/bench_tour.py --stops 50 200 1000 --budgets 0.1 0.5 2
+"""
+import argparse
+import time
+
+import numpy as np
+
+from synthetic import random_road_graph, to_adjacency
+
+from tour import nearest_neighbor_tour, optimize_tour, plan_route, tour_length
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--stops', type=int, nargs='+', default=[50, 200, 1000])
+    parser.add_argument('--budgets', type=float, nargs='+', default=[0.1, 0.5, 2.0])
+    parser.add_argument('--road-nodes', type=int, default=5000,
+                        help="road graph size for the end-to-end plan_route timing")
+    parser.add_argument('--road-stops', type=int, nargs='+', default=[50, 200])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print("Optimizer on Euclidean stops (length relative to nearest-neighbour tour)")
+    print(f"{'stops':>6} {'budget s':>9} {'used s':>7} {'length':>10} {'vs NN':>7}")
+    for n in args.stops:
+        points = rng.random((n, 2)) * 100
+        matrix = np.linalg.norm(points[:, None] - points[None], axis=-1)
+        nn = tour_length(matrix, nearest_neighbor_tour(matrix))
+        print(f"{n:>6} {'NN':>9} {'':>7} {nn:>10.1f} {1:>7.3f}")
+        for budget in args.budgets:
+            start = time.perf_counter()
+            length = tour_length(matrix, optimize_tour(matrix, 0, budget))
+            used = time.perf_counter() - start
+            print(f"{n:>6} {budget:>9.2f} {used:>7.2f} {length:>10.1f} {length / nn:>7.3f}")
+
+    print(f"\nplan_route end to end on a {args.road_nodes}-location road graph")
+    adjacency = to_adjacency(random_road_graph(args.road_nodes))
+    names = list(adjacency)
+    for n in args.road_stops:
+        stops = [names[i] for i in rng.choice(len(names), n, replace=False)]
+        start = time.perf_counter()
+        ordered, path = plan_route(adjacency, names[0], stops, time_budget=args.budgets[0])
+        print(f"{n:>6} stops: {time.perf_counter() - start:.2f} s, {len(path)} locations on the road path")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""Throughput of in-place edge-weight updates, with and without a depot table.
+
+    python benchmarks/bench_traffic_updates.py --nodes 100000 --batch 1000
+"""
+import argparse
+import random
+import time
+
+from synthetic import grid_road_graph
+
+from Advanced import Graph
+
+
+def build(edges, compact):
+    graph = Graph(compact)
+    graph.add_edges(edges)
+    return graph
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--nodes', type=int, default=100000)
+    parser.add_argument('--batch', type=int, default=1000)
+    parser.add_argument('--depots', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    edges, _ = grid_road_graph(args.nodes, seed=args.seed, highway_every=10)
+    rng = random.Random(args.seed)
+    print(f"{'store':>8} {'table':>8} {'updates/s':>11} {'batch (ms)':>11} {'rebuild table (ms)':>19}")
+    for compact in (False, True):
+        for depots in (0, args.depots):
+            graph = build(edges, compact)
+            if depots:
+                graph.precompute_distances([f"L{i}" for i in range(depots)])
+            batch = [(s, d, w * rng.uniform(0.5, 2.0)) for s, d, w in rng.sample(edges, args.batch)]
+            start = time.perf_counter()
+            graph.update_edge_weights(batch)
+            elapsed = time.perf_counter() - start
+            rebuild = ''
+            if depots:
+                start = time.perf_counter()
+                graph.precompute_distances([f"L{i}" for i in range(depots)])
+                rebuild = f"{(time.perf_counter() - start) * 1e3:.1f}"
+            print(f"{'csr' if compact else 'dict':>8} {depots or '-':>8} {args.batch / elapsed:>11.0f} "
+                  f"{elapsed * 1e3:>11.1f} {rebuild:>19}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""Time to write the user/company connection map as SVG and EPS.
+
+    python benchmarks/bench_turtle_render.py --users 100 1000 10000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import synthetic  # noqa: F401  (puts code/ on sys.path)
+
+from turtle_render import draw_connections
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--companies', type=int, default=50)
+    parser.add_argument('--per-user', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    out = tempfile.mkdtemp()
+    companies = set(range(args.companies))
+    print(f"{'users':>8} {'edges':>8} {'svg (ms)':>9} {'eps (ms)':>9}")
+    for users in args.users:
+        connections = {f"user{u}": rng.sample(range(args.companies), args.per_user) for u in range(users)}
+        times = []
+        for extension in ('svg', 'eps'):
+            start = time.perf_counter()
+            draw_connections(connections, companies, os.path.join(out, f"connections_{users}.{extension}"))
+            times.append(time.perf_counter() - start)
+        print(f"{users:>8} {users * args.per_user:>8} {times[0] * 1e3:>9.1f} {times[1] * 1e3:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
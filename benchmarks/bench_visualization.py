@@ -0,0 +1,49 @@
+"""Layout and headless render time for large delivery networks.
+
+    python benchmarks/bench_visualization.py --sizes 1000 10000 100000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from synthetic import grid_road_graph
+
+from csr_graph import CSRGraph
+from visualization import GraphLayout, draw_network
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--format', default='png', choices=['png', 'svg'])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    out = tempfile.mkdtemp()
+    print(f"{'nodes':>8} {'layout':>12} {'layout (s)':>11} {'+10 nodes (ms)':>15} {'render (s)':>11} {'file (KB)':>10}")
+    for n in args.sizes:
+        edges, coordinates = grid_road_graph(n, seed=args.seed, highway_every=10)
+        for use_coordinates in (True, False):
+            store = CSRGraph()
+            store.add_edges(edges)
+            start = time.perf_counter()
+            layout = GraphLayout(args.seed).update(store, coordinates if use_coordinates else None)
+            placed = time.perf_counter() - start
+
+            for i in range(10):
+                store.add_edges([(f"new{i}", store.names[i * 7], 1.0)])
+            start = time.perf_counter()
+            layout.update(store)
+            incremental = time.perf_counter() - start
+
+            path = os.path.join(out, f"network_{n}_{int(use_coordinates)}.{args.format}")
+            start = time.perf_counter()
+            draw_network(store, layout, path)
+            rendered = time.perf_counter() - start
+            print(f"{len(store):>8} {'coordinates' if use_coordinates else 'pivot':>12} {placed:>11.2f} "
+                  f"{incremental * 1e3:>15.1f} {rendered:>11.2f} {os.path.getsize(path) / 1024:>10.0f}")
+
+
+if __name__ == '__main__':
+    main()
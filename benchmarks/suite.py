@@ -0,0 +1,234 @@
+"""Time every hot path across input sizes and compare with a saved baseline.
+
+    python benchmarks/suite.py --sizes 1000 10000 100000 --save baseline.json
+    python benchmarks/suite.py --sizes 1000 10000 100000 --baseline baseline.json
+
+Cases run on seeded synthetic inputs (see synthetic.py):
+
+* grid, geometric, scale-free: a road network of ``size`` locations, built
+  with Graph.add_location/add_edge, then get_shortest_path and
+  get_next_delivery_location between random locations.  The route cache is
+  off, so the searches themselves are measured.
+* orders: ``size`` orders streamed in with Graph.ingest_orders, then the
+  Graph calls behind the check_delivery_status,
+  calculate_average_delivery_time, search_product_by_name and
+  get_companies_by_user menu entries, without their input() and print().
+* priority_queue: ``size`` pushes, then pops until empty.
+
+Times are seconds per operation.  A query is repeated on fresh inputs
+until ``--budget`` seconds have passed, after one untimed warm-up call that
+builds whatever it builds lazily.  Each case is built and queried
+``--repeats`` times and the fastest time per operation kept, which is what
+makes a run comparable with a baseline: a single pass on a busy machine can
+be off by a third.  The spread between the repeats is saved too.  The peak
+memory of building a case's inputs is taken from tracemalloc in a second,
+traced build, so tracing doesn't slow the timings; ``--no-memory`` skips
+it.  With ``--baseline`` a time or peak more than ``--tolerance`` above the
+saved one is flagged and the exit status is 1; for a time, the larger
+spread of the two runs is added to the tolerance, so an operation too
+short to time steadily doesn't fail the gate on noise alone.
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import synthetic
+
+from integrated_with_turtle import Graph
+from priority_queue import PriorityQueue
+from products import today
+
+# Per-operation differences below this many seconds are timer noise.
+NOISE_FLOOR = 1e-6
+# The allowed slowdown is widened by an operation's own spread across
+# repeats (slowest / fastest - 1), up to this fraction.
+MAX_NOISE = 1.0
+
+NETWORKS = {
+    'grid': lambda n, seed: synthetic.grid_road_graph(n, seed)[0],
+    'geometric': lambda n, seed: synthetic.random_geometric_graph(n, seed=seed)[0],
+    'scale-free': lambda n, seed: synthetic.scale_free_graph(n, seed=seed),
+}
+
+
+def per_call(func, inputs, budget):
+    """Mean seconds per ``func(item)`` over ``inputs``, stopping after
+    ``budget`` seconds; the first item is a warm-up."""
+    func(inputs[0])
+    calls = 0
+    start = time.perf_counter()
+    for item in inputs[1:]:
+        func(item)
+        calls += 1
+        if time.perf_counter() - start > budget:
+            break
+    return (time.perf_counter() - start) / max(calls, 1)
+
+
+def build_network(kind, n, args):
+    edges = NETWORKS[kind](n, args.seed)
+    graph = Graph(args.compact)
+    graph.route_cache = None
+    names = list(dict.fromkeys(name for source, destination, _ in edges for name in (source, destination)))
+    timings = {}
+    start = time.perf_counter()
+    for name in names:
+        graph.add_location(name)
+    timings['Graph.add_location'] = (time.perf_counter() - start) / len(names)
+    start = time.perf_counter()
+    for source, destination, distance in edges:
+        graph.add_edge(source, destination, distance)
+    timings['Graph.add_edge'] = (time.perf_counter() - start) / len(edges)
+    return (graph, names), timings
+
+
+def query_network(state, args, rng):
+    graph, names = state
+    pairs = [(rng.choice(names), rng.choice(names)) for _ in range(1000)]
+    sources = [rng.choice(names) for _ in range(1000)]
+    return {'Graph.get_shortest_path': per_call(lambda pair: graph.get_shortest_path(*pair), pairs, args.budget),
+            'Graph.get_next_delivery_location': per_call(graph.get_next_delivery_location, sources, args.budget)}
+
+
+def build_orders(n, args):
+    graph = Graph()
+    events = synthetic.order_history(n, max(10, n // 100), max(10, n // 10), seed=args.seed)
+    start = time.perf_counter()
+    graph.ingest_orders(events)
+    return graph, {'Graph.ingest_orders': (time.perf_counter() - start) / n}
+
+
+def query_orders(graph, args, rng):
+    reference = today()
+    names = [rng.choice(graph.products.names) for _ in range(1000)]
+    users = [rng.choice(graph.products.users) for _ in range(1000)]
+
+    def check_delivery_status(_):
+        graph.get_delivery_status_counts(reference)
+        graph.products.delivery_status(reference)
+
+    return {'check_delivery_status': per_call(check_delivery_status, range(1000), args.budget),
+            'calculate_average_delivery_time': per_call(lambda _: graph.get_average_delivery_time(reference),
+                                                        range(1000), args.budget),
+            'search_product_by_name': per_call(graph.search_products_by_name, names, args.budget),
+            'get_companies_by_user': per_call(graph.get_companies_by_user, users, args.budget)}
+
+
+def build_queue(n, args):
+    rng = random.Random(args.seed)
+    queue = PriorityQueue()
+    start = time.perf_counter()
+    for i in range(n):
+        queue.push(rng.random(), i)
+    return queue, {'PriorityQueue.push': (time.perf_counter() - start) / n}
+
+
+def drain_queue(queue, args, rng):
+    n = len(queue)
+    start = time.perf_counter()
+    while not queue.is_empty():
+        queue.pop()
+    return {'PriorityQueue.pop': (time.perf_counter() - start) / n}
+
+
+CASES = {kind: (lambda n, args, kind=kind: build_network(kind, n, args), query_network) for kind in NETWORKS}
+CASES['orders'] = (build_orders, query_orders)
+CASES['priority_queue'] = (build_queue, drain_queue)
+
+
+def run(cases, sizes, args):
+    results = {'seconds': {}, 'noise': {}, 'peak_bytes': {}}
+    for case in cases:
+        build, query = CASES[case]
+        for n in sizes:
+            runs = {}
+            for _ in range(args.repeats):
+                state, times = build(n, args)
+                times.update(query(state, args, random.Random(args.seed)))
+                del state
+                for op, seconds in times.items():
+                    runs.setdefault(op, []).append(seconds)
+            timings = {op: min(times) for op, times in runs.items()}
+            for op, times in runs.items():
+                results['seconds'][f"{case}/{n}/{op}"] = min(times)
+                results['noise'][f"{case}/{n}/{op}"] = max(times) / min(times) - 1 if min(times) else 0.0
+            line = "  ".join(f"{op} {_format(seconds)}" for op, seconds in timings.items())
+            if args.memory:
+                tracemalloc.start()
+                state = build(n, args)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                del state
+                results['peak_bytes'][f"{case}/{n}"] = peak
+                line += f"  peak {peak / 2**20:.1f} MB"
+            print(f"{case:>14} {n:>8}  {line}", flush=True)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """``[(section, key, baseline, now)]`` for every time or peak that got
+    worse by more than ``tolerance`` (a fraction), widened for times by the
+    noise either run measured."""
+    regressions = []
+    for section in ('seconds', 'peak_bytes'):
+        saved = baseline.get(section, {})
+        for key, value in results[section].items():
+            old = saved.get(key)
+            allowed = tolerance
+            if section == 'seconds':
+                noise = max(results['noise'].get(key, 0.0), baseline.get('noise', {}).get(key, 0.0))
+                allowed += min(noise, MAX_NOISE)
+            if not old or value <= old * (1 + allowed):
+                continue
+            if section == 'seconds' and value - old < NOISE_FLOOR:
+                continue
+            regressions.append((section, key, old, value))
+    return regressions
+
+
+def _format(seconds):
+    if seconds >= 1:
+        return f"{seconds:.2f}s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f}ms"
+    return f"{seconds * 1e6:.2f}us"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cases', nargs='+', choices=sorted(CASES), default=list(CASES))
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000])
+    parser.add_argument('--budget', type=float, default=1.0, help="seconds spent on each query")
+    parser.add_argument('--repeats', type=int, default=3, help="runs per case; the fastest counts")
+    parser.add_argument('--compact', action='store_true', help="use the CSR store for the networks")
+    parser.add_argument('--no-memory', dest='memory', action='store_false')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save', help="write the results as a baseline JSON file")
+    parser.add_argument('--baseline', help="compare with a baseline written by --save")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed slowdown, as a fraction")
+    args = parser.parse_args()
+
+    results = run(args.cases, args.sizes, args)
+    results['python'] = platform.python_version()
+    results['compact'] = args.compact
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for section, key, old, value in regressions:
+            shown = _format if section == 'seconds' else (lambda size: f"{size / 2**20:.1f} MB")
+            print(f"REGRESSION {key}: {shown(old)} -> {shown(value)} ({value / old:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions beyond {args.tolerance:.0%} of {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+"""Seeded synthetic inputs shared by the benchmark scripts.
+
+Road networks come as ``[(source, destination, distance), ...]`` edge lists
+(the arguments of ``Graph.add_edge``): ``random_road_graph``,
+``grid_road_graph``, ``random_geometric_graph`` and ``scale_free_graph``.
+``order_history`` yields order events for ``Graph.ingest_orders``.
+"""
+import bisect
+import datetime
+import itertools
+import math
+import os
+import random
+import sys
+
+CODE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'code')
+if CODE_DIR not in sys.path:
+    sys.path.insert(0, CODE_DIR)
+
+
+def location_name(i):
+    return f"L{i}"
+
+
+def random_road_graph(n, degree=4, seed=0):
+    """Connected, road-like edge list: a ring plus short local chords.
+
+    Returns ``[(source, destination, distance), ...]`` with string location
+    names, the same arguments ``Graph.add_edge`` takes.
+    """
+    rng = random.Random(seed)
+    edges = []
+    for i in range(n):
+        edges.append((location_name(i), location_name((i + 1) % n), rng.uniform(1, 10)))
+    window = max(2, min(n - 1, 50))
+    for i in range(n):
+        for _ in range(max(0, degree // 2 - 1)):
+            j = (i + rng.randint(2, window)) % n
+            if j != i:
+                edges.append((location_name(i), location_name(j), rng.uniform(5, 50)))
+    return edges
+
+
+def to_adjacency(edges):
+    """Build the ``Graph.locations`` dict-of-lists shape from an edge list."""
+    adjacency = {}
+    for source, destination, distance in edges:
+        adjacency.setdefault(source, []).append((destination, distance))
+        adjacency.setdefault(destination, []).append((source, distance))
+    return adjacency
+
+
+def grid_road_graph(n, seed=0, highway_every=0):
+    """Jittered street grid of about ``n`` locations with coordinates.
+
+    Returns ``(edges, coordinates)``.  Streets cost 1-1.5x the straight-line
+    distance between their ends; with ``highway_every=k`` every k-th row and
+    column is a highway at about a quarter of that, which gives the network
+    the hierarchy real road maps have.
+    """
+    rng = random.Random(seed)
+    side = max(2, int(round(n ** 0.5)))
+    coordinates = {}
+    for row in range(side):
+        for col in range(side):
+            coordinates[location_name(row * side + col)] = (
+                col + rng.uniform(-0.3, 0.3), row + rng.uniform(-0.3, 0.3))
+    edges = []
+    for row in range(side):
+        for col in range(side):
+            here = row * side + col
+            for other, line in (((here + 1) if col + 1 < side else None, row),
+                                ((here + side) if row + 1 < side else None, col)):
+                if other is None:
+                    continue
+                a, b = coordinates[location_name(here)], coordinates[location_name(other)]
+                straight = ((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2) ** 0.5
+                if highway_every and line % highway_every == 0:
+                    cost = straight * rng.uniform(0.25, 0.3)
+                else:
+                    cost = straight * rng.uniform(1.0, 1.5)
+                edges.append((location_name(here), location_name(other), cost))
+    return edges, coordinates
+
+
+def random_geometric_graph(n, degree=6, seed=0):
+    """Locations scattered in the unit square, linked to every location
+    within the radius that gives about ``degree`` neighbours each.
+
+    Returns ``(edges, coordinates)`` with straight-line distances.  A chain
+    through the occupied cells, in serpentine order, keeps it connected.
+    """
+    rng = random.Random(seed)
+    radius = (degree / (math.pi * max(n, 1))) ** 0.5
+    # Cells small enough that locations sharing one are always linked.
+    side = max(1, int(2 ** 0.5 / radius))
+    points = [(rng.random(), rng.random()) for _ in range(n)]
+    cells = {}
+    for i, (x, y) in enumerate(points):
+        cells.setdefault((min(int(x * side), side - 1), min(int(y * side), side - 1)), []).append(i)
+
+    def distance(i, j):
+        (ax, ay), (bx, by) = points[i], points[j]
+        return ((ax - bx) ** 2 + (ay - by) ** 2) ** 0.5
+
+    edges = []
+    for (cx, cy), members in cells.items():
+        for dx, dy in ((0, 0), (0, 1), (0, 2), (1, -2), (1, -1), (1, 0), (1, 1), (1, 2),
+                       (2, -2), (2, -1), (2, 0), (2, 1), (2, 2)):
+            others = cells.get((cx + dx, cy + dy))
+            if not others:
+                continue
+            for a in members:
+                for b in others:
+                    if (dx, dy) == (0, 0) and b <= a:
+                        continue
+                    d = distance(a, b)
+                    if d <= radius:
+                        edges.append((location_name(a), location_name(b), d))
+    previous = None
+    for cx in range(side):
+        for cy in (range(side) if cx % 2 == 0 else range(side - 1, -1, -1)):
+            members = cells.get((cx, cy))
+            if members:
+                if previous is not None and distance(previous, members[0]) > radius:
+                    edges.append((location_name(previous), location_name(members[0]),
+                                  distance(previous, members[0])))
+                previous = members[0]
+    coordinates = {location_name(i): point for i, point in enumerate(points)}
+    return edges, coordinates
+
+
+def scale_free_graph(n, links=2, seed=0):
+    """Preferential-attachment (Barabasi-Albert) network: each new location
+    links to ``links`` existing ones picked in proportion to their degree,
+    so a few hubs get most of the edges.  Connected; distances 1-10."""
+    rng = random.Random(seed)
+    edges = []
+    ends = []   # every edge end once, so a uniform pick is degree-weighted
+    for i in range(1, n):
+        targets = {0} if i == 1 else set()
+        while len(targets) < min(links, i):
+            targets.add(rng.choice(ends))
+        for j in targets:
+            edges.append((location_name(i), location_name(j), rng.uniform(1, 10)))
+            ends.extend((i, j))
+    return edges
+
+
+def order_history(orders, companies, users, days=365, products=1000, seed=0):
+    """Yield ``orders`` order events over the last ``days`` days, oldest
+    first, as ``Graph.ingest_orders`` takes them.  Company popularity is
+    skewed; users and products are uniform."""
+    rng = random.Random(seed)
+    today = datetime.date.today()
+    dates = [(today - datetime.timedelta(days=day)).isoformat() for day in range(days)]
+    # Zipf-like weights without numpy: company k is picked ~1/(k+1) as often.
+    weights = list(itertools.accumulate(1 / (k + 1) for k in range(companies)))
+    for i in range(orders):
+        day = days - 1 - i * days // max(orders, 1)
+        yield {'company_id': bisect.bisect_left(weights, rng.random() * weights[-1]),
+               'name': f"product{rng.randrange(products)}",
+               'date': dates[day],
+               'user_id': f"user{rng.randrange(users)}"}
@@ -1,61 +1,357 @@
-import heapq
-import networkx as nx
-import matplotlib.pyplot as plt
+from array import array
+import instrumentation
+from route_cache import MISSING, RouteCache
+from shortest_path import (Landmarks, add_shortest_edges, coordinate_scale, dijkstra, location_dijkstra,
+                           nearest_location, point_to_point, reconstruct_path)
 
+@instrumentation.instrument
 class Graph:
-    def __init__(self):
-        self.locations = {}
-        self.graph = nx.Graph()
+    def __init__(self, compact=False):
+        # compact=True keeps the network in a CSRGraph and no networkx graph.
+        self.compact = compact
+        if compact:
+            from csr_graph import CSRGraph
+            self.locations = CSRGraph()
+        else:
+            self.locations = {}
+        self._graph = None
+        self.distance_table = None
+        # Optional (x, y) per location for A*; landmarks and the coordinate
+        # scale are built on the first query that needs them.
+        self.coordinates = {}
+        self._coordinate_scale = None
+        self.landmarks = None
+        self.contraction = None
+        self.edge_profiles = {}
+        self.layout = None
+        # LRU of route and next-stop results plus shortest-path trees of busy
+        # sources (see route_cache.py); None turns it off.
+        self.route_cache = RouteCache()
 
-    def add_location(self, location):
-        self.locations[location] = []
+    def add_location(self, location, coordinates=None):
+        if self.compact:
+            self.locations.add_location(location)
+        else:
+            self.locations[location] = []
+        if coordinates is not None:
+            x, y = coordinates
+            self.coordinates[location] = (float(x), float(y))
+            self._coordinate_scale = None
+        if self.distance_table is not None:
+            self.distance_table.add_location(location)
+        if self.route_cache is not None:
+            self.route_cache.invalidate()
 
     def add_edge(self, source, destination, distance):
-        if source in self.locations and destination in self.locations:
+        if self.compact:
+            self.locations.add_edge(source, destination, distance)
+        elif source in self.locations and destination in self.locations:
             self.locations[source].append((destination, distance))
             self.locations[destination].append((source, distance))
-            self.graph.add_edge(source, destination, weight=distance)
+            if self._graph is not None:
+                add_shortest_edges(self._graph, [(source, destination, distance)])
+        self._invalidate_search()
+        if self.distance_table is not None:
+            self.distance_table.add_edge(self.locations, source, destination, distance)
 
-    def visualize_graph(self):
-        pos = nx.spring_layout(self.graph)
-        nx.draw(self.graph, pos, with_labels=True, node_size=500, node_color='lightblue', edge_color='gray')
-        edge_labels = nx.get_edge_attributes(self.graph, 'weight')
-        nx.draw_networkx_edge_labels(self.graph, pos, edge_labels=edge_labels)
-        plt.show()
-
-    def get_shortest_path(self, start_location, end_location):
-        path = nx.shortest_path(self.graph, start_location, end_location, weight='weight')
+    def update_edge_weight(self, source, destination, distance):
+        return self.update_edge_weights([(source, destination, distance)])
+
+    def update_edge_weights(self, updates):
+        # Change existing edges' distances in place (live traffic), rather
+        # than re-adding them; returns how many edges changed.  A distance
+        # table is repaired only where routes actually change.
+        changes = {}
+        for source, destination, distance in updates:
+            key = (destination, source) if (destination, source) in changes else (source, destination)
+            changes[key] = distance
+        changed = []
+        for (source, destination), distance in changes.items():
+            old = self._edge_weight(source, destination)
+            if old is not None and distance != old:
+                changed.append((source, destination, old, distance))
+        self._write_edge_weights([(s, d, new) for s, d, _, new in changed])
+        if self.distance_table is not None:
+            self.distance_table.update_edges(self.locations, changed)
+        if any(new < old for _, _, old, new in changed):
+            # Only a shorter edge can break landmark and coordinate bounds
+            # or shorten routes that don't use it.
+            self._coordinate_scale = None
+            self.landmarks = None
+            if self.route_cache is not None:
+                self.route_cache.invalidate()
+        elif changed and self.route_cache is not None:
+            self.route_cache.evict_edges((source, destination) for source, destination, _, _ in changed)
+        if changed:
+            self.contraction = None
+        return len(changed)
+
+    def _edge_weight(self, source, destination):
+        if self.compact:
+            return self.locations.edge_weight(source, destination)
+        found = [d for neighbor, d in self.locations.get(source, ()) if neighbor == destination]
+        return min(found) if found else None
+
+    def _write_edge_weights(self, edges):
+        if self.compact:
+            self.locations.update_edges(edges)
+            return
+        for source, destination, distance in edges:
+            for a, b in ((source, destination), (destination, source)):
+                neighbors = self.locations[a]
+                for i, (neighbor, _) in enumerate(neighbors):
+                    if neighbor == b:
+                        neighbors[i] = (b, distance)
+            if self._graph is not None:
+                self._graph[source][destination]['weight'] = distance
+
+    def set_edge_profile(self, source, destination, profile):
+        # Distance per time-of-day slot (e.g. 24 hourly values) for an
+        # existing edge; apply_edge_profiles(slot) switches to that slot.
+        self.edge_profiles[(source, destination)] = array('d', profile)
+
+    def apply_edge_profiles(self, slot):
+        return self.update_edge_weights((source, destination, profile[slot % len(profile)])
+                                        for (source, destination), profile in self.edge_profiles.items())
+
+    def add_edges(self, edges):
+        # Distances are checked like load_edges checks a file's; a bad edge
+        # raises ValueError before anything is inserted.
+        from bulk_loader import validate_edges
+
+        self._insert_edges(validate_edges(edges))
+        self._refresh_distance_table()
+
+    def load_edges(self, path, **kwargs):
+        # Streams a CSV/TSV edge list or a .npy distance matrix in chunks;
+        # returns the number of edges inserted.
+        count = 0
+        from bulk_loader import iter_file_chunks
+
+        for chunk in iter_file_chunks(path, **kwargs):
+            self._insert_edges(chunk)
+            count += len(chunk)
+        self._refresh_distance_table()
+        return count
+
+    def _insert_edges(self, edges):
+        # Bulk counterpart of add_edge: missing locations are created and
+        # the networkx graph is updated once per batch.
+        edges = list(edges)   # walked twice below
+        self._invalidate_search()
+        if self.compact:
+            self.locations.add_edges(edges)
+            return
+        locations = self.locations
+        for source, destination, distance in edges:
+            if source not in locations:
+                locations[source] = []
+            if destination not in locations:
+                locations[destination] = []
+            locations[source].append((destination, distance))
+            locations[destination].append((source, distance))
+        if self._graph is not None:
+            add_shortest_edges(self._graph, edges)
+
+    def _refresh_distance_table(self):
+        table = self.distance_table
+        if table is not None:
+            self.precompute_distances(None if table.square else table.sources)
+
+    def save(self, path):
+        from snapshot import save_graph
+
+        save_graph(self, path)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        # The loaded graph is compact and backed by the mapped file until the
+        # first write; see snapshot.py for the format.
+        from snapshot import load_graph
+
+        return load_graph(cls, path, mmap)
+
+    @property
+    def graph(self):
+        # networkx copy of the dict store, built the first time something
+        # asks for it and kept in step with later writes from then on.
+        if self._graph is None and not self.compact:
+            import networkx as nx
+
+            # Published only once complete: readers on other threads must
+            # never see a half-built graph.
+            graph = nx.Graph()
+            add_shortest_edges(graph, ((source, destination, distance)
+                                       for source, neighbors in self.locations.items()
+                                       for destination, distance in neighbors))
+            self._graph = graph
+        return self._graph
+
+    def to_networkx(self):
+        if self.compact:
+            return self.locations.to_networkx()
+        return self.graph
+
+    def visualize_graph(self, path=None):
+        # The layout is cached and only new locations get placed; large
+        # networks are binned (see visualization.draw_network).  With a
+        # .png/.svg path the figure is written headlessly instead of shown.
+        from visualization import GraphLayout, draw_network
+
+        if self.layout is None:
+            self.layout = GraphLayout()
+        self.layout.update(self.locations, self.coordinates)
+        return draw_network(self.locations, self.layout, path)
+
+    def precompute_distances(self, sources=None, method=None):
+        # Opt-in all-pairs (or depot-rows) table; add_location/add_edge keep
+        # it up to date so later lookups never fall back to a search.
+        from distance_table import DistanceTable
+
+        self.distance_table = DistanceTable(self.locations, sources, method)
+        return self.distance_table
+
+    def get_distance(self, start_location, end_location):
+        table = self.distance_table
+        hit = table is not None and table.covers(start_location, end_location)
+        instrumentation.cache('distance_table', hit)
+        if hit:
+            return table.distance(start_location, end_location)
+        if start_location not in self.locations:
+            return float('inf')
+        dist, _ = dijkstra(self.locations, start_location, end_location)
+        return dist.get(end_location, float('inf'))
+
+    def _invalidate_search(self):
+        # A new edge can shorten distances, which breaks landmark bounds,
+        # may need shortcuts the hierarchy doesn't have and stales cached routes.
+        self._coordinate_scale = None
+        self.landmarks = None
+        self.contraction = None
+        if self.route_cache is not None:
+            self.route_cache.invalidate()
+
+    def build_contraction_hierarchy(self):
+        # Slow one-off preprocessing for fast get_shortest_path queries on a
+        # network that rarely changes; saved with the graph by save().
+        from contraction import ContractionHierarchy
+        from csr_graph import CSRGraph
+
+        store = self.locations if self.compact else CSRGraph.from_adjacency(self.locations)
+        self.contraction = ContractionHierarchy.build(store)
+        return self.contraction
+
+    def search(self, start_location, end_location, algorithm='dijkstra'):
+        # Returns (path, cost, settled); see shortest_path.point_to_point,
+        # plus 'ch' for the contraction hierarchy.
+        if algorithm == 'ch':
+            instrumentation.cache('contraction', self.contraction is not None)
+            if self.contraction is None:
+                self.build_contraction_hierarchy()
+            return self.contraction.query(start_location, end_location)
+        if algorithm == 'astar':
+            instrumentation.cache('coordinate_scale', self._coordinate_scale is not None)
+            if self._coordinate_scale is None:
+                self._coordinate_scale = coordinate_scale(self.locations, self.coordinates)
+        if algorithm == 'alt':
+            instrumentation.cache('landmarks', self.landmarks is not None)
+            if self.landmarks is None:
+                self.landmarks = Landmarks(self.locations)
+        return point_to_point(self.locations, start_location, end_location, algorithm,
+                              self.coordinates, self._coordinate_scale or 0.0, self.landmarks)
+
+    def get_shortest_path(self, start_location, end_location, algorithm=None):
+        # List of locations from start to end; None if either is unknown or
+        # no route joins them, whichever backend or algorithm answers.
+        cache = self.route_cache
+        if cache is None:
+            return self._shortest_path(start_location, end_location, algorithm)
+        query = ('path', start_location, end_location, algorithm)
+        path = cache.get(query)
+        if path is not MISSING:
+            return path
+        if algorithm is None:
+            tree = self._route_tree(start_location)
+            if tree is not None and end_location in tree[0]:
+                return reconstruct_path(tree[1], start_location, end_location)
+        version = cache.version
+        path = self._shortest_path(start_location, end_location, algorithm)
+        cache.put(query, path, version, zip(path, path[1:]) if path else ())
         return path
 
+    def _route_tree(self, source):
+        # Shortest-path tree of a source that keeps missing the cache, so
+        # the rest of its routes are a walk up the predecessor map.
+        cache = self.route_cache
+        tree = cache.tree(source)
+        if tree is None and source in self.locations and cache.wants_tree(source):
+            version = cache.version
+            tree = location_dijkstra(self.locations, source)
+            cache.put_tree(source, *tree, version)
+        return tree
+
+    def _shortest_path(self, start_location, end_location, algorithm=None):
+        if algorithm is not None:
+            return self.search(start_location, end_location, algorithm)[0]
+        table = self.distance_table
+        hit = table is not None and table.covers(start_location, end_location)
+        instrumentation.cache('distance_table', hit)
+        if hit:
+            return table.path(start_location, end_location)
+        if self.contraction is not None:
+            return self.contraction.query(start_location, end_location)[0]
+        if self.compact:
+            return self.locations.shortest_path(start_location, end_location)
+        if start_location not in self.locations or end_location not in self.locations:
+            return None
+        if start_location == end_location:
+            return [start_location]   # may have no roads, so not in self.graph
+        import networkx as nx
+
+        instrumentation.count('search.networkx.searches')
+        try:
+            return nx.shortest_path(self.graph, start_location, end_location, weight='weight')
+        except (nx.NetworkXNoPath, nx.NodeNotFound):
+            return None
+
+    def plan_route(self, start, stops, time_budget=1.0, return_to_start=False):
+        # Returns (ordered_stops, road_path); raises ValueError for an
+        # unknown or unreachable start or stop.  See tour.plan_route.
+        from tour import plan_route
+
+        return plan_route(self.locations, start, stops, time_budget, return_to_start)
+
+    def get_shortest_paths_batch(self, pairs, workers=None):
+        # One path (or None) per (start, end) pair; see batch_paths.
+        from batch_paths import shortest_paths_batch
+        from csr_graph import CSRGraph
+
+        store = self.locations if self.compact else CSRGraph.from_adjacency(self.locations)
+        return shortest_paths_batch(store, pairs, workers)
+
     def get_next_delivery_location(self, current_location):
-        heap = []
-        for location in self.locations:
-            if location != current_location:
-                heapq.heappush(heap, (float('inf'), location))
-        heapq.heappush(heap, (0, current_location))
-
-        while heap:
-            cost, location = heapq.heappop(heap)
-            if cost == float('inf'):
-                break
-            if location != current_location:
-                return location
-
-            for neighbor, edge_distance in self.locations[location]:
-                new_cost = cost + edge_distance
-                for i in range(len(heap)):
-                    if heap[i][1] == neighbor:
-                        if new_cost < heap[i][0]:
-                            heap[i] = (new_cost, neighbor)
-                            heapq.heapify(heap)
-                        break
-
-        return None
+        cache = self.route_cache
+        if cache is None:
+            return self._next_delivery_location(current_location)
+        query = ('next', current_location)
+        location = cache.get(query)
+        if location is MISSING:
+            version = cache.version
+            location = self._next_delivery_location(current_location)
+            # The nearest location is a neighbour: only that edge matters.
+            cache.put(query, location, version, () if location is None else [(current_location, location)])
+        return location
 
+    def _next_delivery_location(self, current_location):
+        if self.compact:
+            return self.locations.nearest_location(current_location)
+        return nearest_location(self.locations, current_location)
 
+
+@instrumentation.instrument
 class DeliveryService:
-    def __init__(self):
-        self.graph = Graph()
+    def __init__(self, compact=False):
+        self.graph = Graph(compact)
 
     def add_location(self):
         location = input("Enter location: ")
@@ -67,6 +363,14 @@ class DeliveryService:
         distance = float(input("Enter distance: "))
         self.graph.add_edge(source, destination, distance)
 
+    def import_edges(self):
+        path = input("Enter edge list (.csv/.tsv) or distance matrix (.npy) path: ")
+        try:
+            count = self.graph.load_edges(path)
+            print(f"Imported {count} edges.")
+        except (OSError, ValueError) as e:
+            print(f"Import failed: {e}")
+
     def visualize_graph(self):
         self.graph.visualize_graph()
 
@@ -81,33 +385,56 @@ class DeliveryService:
         next_location = self.graph.get_next_delivery_location(current_location)
         return next_location
 
+    def plan_route(self):
+        start = input("Enter start location: ")
+        stops = [stop.strip() for stop in input("Enter stops (comma separated): ").split(',') if stop.strip()]
+        try:
+            return self.graph.plan_route(start, stops)
+        except ValueError as e:
+            print(e)
+            return None
+
 
 # usage
-delivery_service = DeliveryService()
-
-while True:
-    print("\n1. Add Location")
-    print("2. Add Edge")
-    print("3. Visualize Graph")
-    print("4. Get Shortest Delivery Path")
-    print("5. Get Next Delivery Location")
-    print("6. Exit")
-
-    choice = int(input("\nEnter your choice: "))
-
-    if choice == 1:
-        delivery_service.add_location()
-    elif choice == 2:
-        delivery_service.add_edge()
-    elif choice == 3:
-        delivery_service.visualize_graph()
-    elif choice == 4:
-        shortest_delivery_path = delivery_service.get_shortest_delivery_path()
-        print("Shortest Delivery Path:", shortest_delivery_path)
-    elif choice == 5:
-        next_delivery_location = delivery_service.get_next_delivery_location()
-        print("Next Delivery Location:", next_delivery_location)
-    elif choice == 6:
-        break
-    else:
-        print("Invalid choice. Please try again.")
+def main():
+    delivery_service = DeliveryService()
+
+    while True:
+        print("\n1. Add Location")
+        print("2. Add Edge")
+        print("3. Visualize Graph")
+        print("4. Get Shortest Delivery Path")
+        print("5. Get Next Delivery Location")
+        print("6. Import Edges From File")
+        print("7. Plan Multi-Stop Route")
+        print("8. Exit")
+
+        choice = int(input("\nEnter your choice: "))
+
+        if choice == 1:
+            delivery_service.add_location()
+        elif choice == 2:
+            delivery_service.add_edge()
+        elif choice == 3:
+            delivery_service.visualize_graph()
+        elif choice == 4:
+            shortest_delivery_path = delivery_service.get_shortest_delivery_path()
+            print("Shortest Delivery Path:", shortest_delivery_path)
+        elif choice == 5:
+            next_delivery_location = delivery_service.get_next_delivery_location()
+            print("Next Delivery Location:", next_delivery_location)
+        elif choice == 6:
+            delivery_service.import_edges()
+        elif choice == 7:
+            route = delivery_service.plan_route()
+            if route is not None:
+                print("Stop Order:", route[0])
+                print("Route:", route[1])
+        elif choice == 8:
+            break
+        else:
+            print("Invalid choice. Please try again.")
+
+
+if __name__ == '__main__':
+    main()
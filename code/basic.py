@@ -1,68 +1,82 @@
-import heapq
-import networkx as nx
-
-# Prompt the user to enter required details.
-print("Enter the number of delivery locations: ")
-num_locations = int(input())
-
-# Created a graph to represent the delivery locations and their connections.
-graph = nx.Graph()
-
-# Add nodes to the graph for each delivery location.
-for i in range(num_locations):
-    graph.add_node(i)
-
-# Add edges to the graph for the connections between delivery locations.
-for i in range(num_locations):
-    for j in range(i + 1, num_locations):
-        dist = int(input("Enter the distance between location {} and location {}: ".format(i, j)))
-        graph.add_edge(i, j, weight=dist)
-
-# Visualize the graph showing the locations user entered.
-nx.draw(graph, with_labels=True)
-
-# Display the shortest path (based on parameters like traffic, order number, restaurant number).
-# Create a min-heap to store the delivery locations yet to be visited.
-min_heap = []
-
-# Initialize the min-heap with the start location.
-heapq.heappush(min_heap, (0, 0))
-
-# While the min-heap is not empty, do the following:
-while min_heap:
-
-    # Pop the top element from the min-heap and get the current location.
-    (cost, current_location) = heapq.heappop(min_heap)
-
-    # If the current location is the destination, then stop.
-    if current_location == num_locations - 1:
-        break
-
-    # For each neighbor of the current location, do the following:
-    for neighbor in graph.neighbors(current_location):
-
-        # Calculate the new cost of the path from the start location to the neighbor.
-        new_cost = cost + float(graph.get_edge_data(current_location, neighbor)['weight'])
-
-        # If the min-heap is empty, push the new cost and neighbor to the heap.
-        if not min_heap:
-            heapq.heappush(min_heap, (new_cost, neighbor))
-        else:
-            # If the new cost is less than the cost of the path from the start location to the neighbor in the min-heap, then update the min-heap.
-            if new_cost < min_heap[0][0]:
-                heapq.heappush(min_heap, (new_cost, neighbor))
-
-# Print the shortest path.
-path = []
-current_location = num_locations - 1
-while current_location != 0:
-    path.append(current_location)
-    current_location = min_heap[0][1]
-
-print("The shortest path is: ")
-for location in path[::-1]:
-    print(location + 1)
-
-# Display the next delivery location.
-next_location = min_heap[0][1]
-print("The next delivery location is:", next_location + 1)
+import sys
+
+import numpy as np
+
+from bulk_loader import iter_edge_chunks
+from shortest_path import dense_dijkstra, dense_path
+
+
+def solve_route(distances, start=0, end=None):
+    """Shortest route between two delivery locations of a distance matrix.
+
+    ``distances`` is the n x n matrix of distances between locations (inf
+    where two locations are not connected); ``end`` defaults to the last
+    location.  Returns ``(path, cost, next_location)``, with ``path`` and
+    ``next_location`` as None when ``end`` cannot be reached.
+    """
+    distances = np.asarray(distances, dtype=np.float64)
+    if end is None:
+        end = len(distances) - 1
+    dist, prev = dense_dijkstra(distances, start, end)
+    path = dense_path(prev, start, end)
+    if path is None:
+        return None, float('inf'), None
+    next_location = path[1] if len(path) > 1 else path[0]
+    return path, float(dist[end]), next_location
+
+
+def read_distances(path=None):
+    # Load the distances from a file when one is given (a .npy matrix, or an
+    # edges .csv of "i,j,distance" rows), otherwise prompt the user for them.
+    if path is not None and path.endswith('.npy'):
+        return np.load(path)
+    if path is not None:
+        edges = [edge for chunk in iter_edge_chunks(path) for edge in chunk]
+        num_locations = 1 + max(max(int(i), int(j)) for i, j, dist in edges)
+        distances = np.full((num_locations, num_locations), np.inf)
+        np.fill_diagonal(distances, 0)
+        for i, j, dist in edges:
+            i, j = int(i), int(j)
+            distances[i, j] = distances[j, i] = min(distances[i, j], dist)
+        return distances
+
+    print("Enter the number of delivery locations: ")
+    num_locations = int(input())
+    distances = np.zeros((num_locations, num_locations))
+    for i in range(num_locations):
+        for j in range(i + 1, num_locations):
+            dist = int(input("Enter the distance between location {} and location {}: ".format(i, j)))
+            distances[i, j] = distances[j, i] = dist
+    return distances
+
+
+def main():
+    distances = read_distances(sys.argv[1] if len(sys.argv) > 1 else None)
+    num_locations = len(distances)
+
+    # Visualize the graph showing the locations user entered (small networks only).
+    if num_locations <= 50:
+        import networkx as nx
+        graph = nx.Graph()
+        graph.add_nodes_from(range(num_locations))
+        rows, cols = np.nonzero(np.isfinite(distances))
+        graph.add_weighted_edges_from((i, j, distances[i, j]) for i, j in zip(rows, cols) if i < j)
+        nx.draw(graph, with_labels=True)
+
+    # Display the shortest path from the first to the last location
+    # (based on parameters like traffic, order number, restaurant number).
+    path, cost, next_location = solve_route(distances, 0, num_locations - 1)
+    if path is None:
+        print("No route reaches location", num_locations)
+        return
+
+    print("The shortest path is: ")
+    for location in path:
+        print(location + 1)
+
+    # Display the next delivery location.
+    print("The next delivery location is:", next_location + 1)
+
+
+if __name__ == '__main__':
+    main()
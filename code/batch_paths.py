@@ -0,0 +1,87 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from shortest_path import csr_dijkstra, reconstruct_path
+
+# Set in each pool worker by _attach: memoryviews over the shared CSR arrays.
+_CSR = None
+_SEGMENTS = []
+
+
+def _share(arrays):
+    segments, spec = [], []
+    for array in arrays:
+        segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, array.dtype, buffer=segment.buf)[:] = array
+        segments.append(segment)
+        spec.append((segment.name, array.dtype.str, array.shape))
+    return segments, spec
+
+
+def _attach(spec):
+    global _CSR
+    arrays = []
+    for name, dtype, shape in spec:
+        segment = shared_memory.SharedMemory(name=name)
+        _SEGMENTS.append(segment)
+        arrays.append(memoryview(np.ndarray(shape, dtype, buffer=segment.buf)))
+    _CSR = tuple(arrays)
+
+
+def _solve_groups(groups, csr=None):
+    """``[(source, [target, ...]), ...]`` -> ``{(source, target): id path}``."""
+    csr = csr or _CSR
+    paths = {}
+    for source, targets in groups:
+        dist, prev = csr_dijkstra(*csr, source, targets[0] if len(targets) == 1 else None)
+        for target in targets:
+            paths[source, target] = reconstruct_path(prev, source, target)
+    return paths
+
+
+def shortest_paths_batch(store, pairs, workers=None):
+    """Shortest paths for many ``(start, end)`` pairs of a ``CSRGraph``.
+
+    Pairs are grouped by start so every source is searched once.  With more
+    than one worker the groups are spread over a process pool; the CSR
+    arrays are placed in shared memory once and attached by each worker
+    instead of being pickled per task.  Returns one path (or None) per pair,
+    in order.
+    """
+    pairs = list(pairs)
+    ids, names = store.ids, store.names
+    groups = {}
+    for start, end in pairs:
+        if start in ids and end in ids:
+            targets = groups.setdefault(ids[start], [])
+            if ids[end] not in targets:
+                targets.append(ids[end])
+    groups = list(groups.items())
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(groups))
+
+    if workers <= 1:
+        paths = _solve_groups(groups, store.views())
+    else:
+        segments, spec = _share(store.csr())
+        try:
+            # A few chunks per worker keeps them busy without a task per source.
+            chunks = [groups[i::workers * 4] for i in range(workers * 4)]
+            paths = {}
+            with ProcessPoolExecutor(workers, initializer=_attach, initargs=(spec,)) as pool:
+                for result in pool.map(_solve_groups, [chunk for chunk in chunks if chunk]):
+                    paths.update(result)
+        finally:
+            for segment in segments:
+                segment.close()
+                segment.unlink()
+
+    results = []
+    for start, end in pairs:
+        path = paths.get((ids.get(start), ids.get(end)))
+        results.append(None if path is None else [names[i] for i in path])
+    return results
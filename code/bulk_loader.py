@@ -0,0 +1,101 @@
+import csv
+import math
+import os
+
+import numpy as np
+
+CHUNK_SIZE = 50000
+
+
+def _parse_distance(value, where):
+    try:
+        distance = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{where}: distance {value!r} is not a number")
+    if not math.isfinite(distance) or distance < 0:
+        raise ValueError(f"{where}: distance must be finite and non-negative, got {value!r}")
+    return distance
+
+
+def validate_edges(edges):
+    """``edges`` (any iterable) as a list of ``(source, destination,
+    distance)`` with float distances, checked as the file loaders check
+    them; a malformed edge raises ``ValueError`` naming its position."""
+    checked = []
+    for i, edge in enumerate(edges):
+        try:
+            source, destination, value = edge
+        except (TypeError, ValueError):
+            raise ValueError(f"edge {i}: expected (source, destination, distance), got {edge!r}")
+        checked.append((source, destination, _parse_distance(value, f"edge {i}")))
+    return checked
+
+
+def iter_edge_chunks(path, delimiter=None, chunk_size=CHUNK_SIZE):
+    """Stream ``[(source, destination, distance), ...]`` chunks from a CSV/TSV.
+
+    Each row is ``source,destination,distance``; extra columns are ignored,
+    blank lines skipped, and a header row is recognised by a non-numeric
+    distance on the first line.  Malformed rows raise ``ValueError`` naming
+    the file and line.
+    """
+    if delimiter is None:
+        delimiter = '\t' if os.path.splitext(path)[1].lower() in ('.tsv', '.tab') else ','
+    chunk = []
+    with open(path, newline='') as f:
+        for line_number, row in enumerate(csv.reader(f, delimiter=delimiter), 1):
+            if not row:
+                continue
+            if len(row) < 3:
+                raise ValueError(f"{path}:{line_number}: expected source, destination, distance")
+            source, destination, value = row[0].strip(), row[1].strip(), row[2].strip()
+            if line_number == 1:
+                try:
+                    float(value)
+                except ValueError:
+                    continue
+            if not source or not destination:
+                raise ValueError(f"{path}:{line_number}: empty location name")
+            chunk.append((source, destination, _parse_distance(value, f"{path}:{line_number}")))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_matrix_chunks(path, names=None, chunk_size=CHUNK_SIZE):
+    """Stream edges from a square ``.npy`` distance matrix.
+
+    The matrix is memory-mapped and read a block of rows at a time; only the
+    upper triangle is used.  ``inf``/``nan`` entries mean "no edge"; 0 is
+    a zero-length road, as in an edge list, and a negative distance raises
+    ValueError.  Locations are named by ``names`` or by index.
+    """
+    matrix = np.load(path, mmap_mode='r')
+    if matrix.ndim != 2 or matrix.shape[0] != matrix.shape[1]:
+        raise ValueError(f"{path}: expected a square distance matrix, got shape {matrix.shape}")
+    n = matrix.shape[0]
+    if names is None:
+        names = list(range(n))
+    elif len(names) != n:
+        raise ValueError(f"{path}: {len(names)} names for a {n}x{n} matrix")
+    rows_per_block = max(1, chunk_size // max(n, 1))
+    for start in range(0, n, rows_per_block):
+        block = np.asarray(matrix[start:start + rows_per_block], dtype=np.float64)
+        rows, cols = np.nonzero(~np.isnan(block) & (block != np.inf))
+        rows += start
+        upper = cols > rows
+        rows, cols = rows[upper], cols[upper]
+        if len(rows):
+            weights = block[rows - start, cols]
+            if (weights < 0).any():
+                k = int(np.argmax(weights < 0))
+                _parse_distance(float(weights[k]), f"{path}: row {rows[k]}, column {cols[k]}")   # raises
+            yield [(names[i], names[j], w) for i, j, w in zip(rows.tolist(), cols.tolist(), weights.tolist())]
+
+
+def iter_file_chunks(path, chunk_size=CHUNK_SIZE, **kwargs):
+    if os.path.splitext(path)[1].lower() == '.npy':
+        return iter_matrix_chunks(path, chunk_size=chunk_size, **kwargs)
+    return iter_edge_chunks(path, chunk_size=chunk_size, **kwargs)
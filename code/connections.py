@@ -0,0 +1,156 @@
+from array import array
+
+import numpy as np
+
+# An edge is stored as ``user << COMPANY_BITS | company`` (vertex indices).
+COMPANY_BITS = 32
+COMPANY_MASK = (1 << COMPANY_BITS) - 1
+
+
+class Connections:
+    """Bipartite user/company connection graph.
+
+    Users and companies are interned into vertex tables and each edge is a
+    single int64 key.  Added edges wait in a buffer; the next query merges
+    them into one sorted, duplicate-free key array, so adding an edge twice
+    changes nothing and a bulk insert costs one sort.  Sorted keys make a
+    user's companies a slice; the company-major order used for a company's
+    users is built on first use after a change.
+    """
+
+    def __init__(self):
+        self.users = []
+        self.user_ids = {}
+        self.companies = []
+        self.company_ids = {}
+        self._keys = np.empty(0, dtype=np.int64)
+        self._pending = array('q')
+        self._user_offsets = None
+        self._by_company = None
+
+    @classmethod
+    def from_products(cls, table):
+        """Every user linked to each company they ordered from (a ProductTable)."""
+        connections = cls()
+        connections.users = list(table.users)
+        connections.user_ids = dict(table.user_ids)
+        companies, inverse = np.unique(table.companies, return_inverse=True)
+        connections.companies = companies.tolist()
+        connections.company_ids = {company: i for i, company in enumerate(connections.companies)}
+        keys = table.user_column.view().astype(np.int64) << COMPANY_BITS | inverse
+        connections._keys = _sorted_unique(keys)
+        return connections
+
+    @classmethod
+    def from_arrays(cls, users, companies, keys):
+        connections = cls()
+        connections.users = list(users)
+        connections.user_ids = {user: i for i, user in enumerate(connections.users)}
+        connections.companies = [int(company) for company in companies]
+        connections.company_ids = {company: i for i, company in enumerate(connections.companies)}
+        connections._keys = keys
+        return connections
+
+    def arrays(self):
+        """``(users, company ids, sorted edge keys)`` for a snapshot."""
+        return self.users, np.array(self.companies, dtype=np.int64), self.keys()
+
+    def __len__(self):
+        return len(self.keys())
+
+    @staticmethod
+    def _intern(value, ids, values):
+        i = ids.get(value)
+        if i is None:
+            i = ids[value] = len(values)
+            values.append(value)
+        return i
+
+    def add(self, user, company):
+        self._pending.append(self._intern(user, self.user_ids, self.users) << COMPANY_BITS
+                             | self._intern(company, self.company_ids, self.companies))
+
+    def add_many(self, pairs):
+        """Link every ``(user, company)`` in ``pairs``; repeats are ignored."""
+        intern = self._intern
+        user_ids, users, company_ids, companies = self.user_ids, self.users, self.company_ids, self.companies
+        self._pending.extend(intern(user, user_ids, users) << COMPANY_BITS | intern(company, company_ids, companies)
+                             for user, company in pairs)
+
+    def keys(self):
+        if self._pending:
+            pending = _sorted_unique(np.frombuffer(self._pending, dtype=np.int64))
+            self._pending = array('q')
+            at = np.searchsorted(self._keys, pending)
+            known = at < len(self._keys)
+            known[known] = self._keys[at[known]] == pending[known]
+            if not known.all():
+                self._keys = np.insert(self._keys, at[~known], pending[~known])
+                self._user_offsets = self._by_company = None
+        return self._keys
+
+    def _user_slices(self):
+        keys = self.keys()
+        if self._user_offsets is None:
+            self._user_offsets = np.searchsorted(keys >> COMPANY_BITS, np.arange(len(self.users) + 1))
+        return self._user_offsets
+
+    def _company_slices(self):
+        # (key positions grouped by company, offsets into them)
+        keys = self.keys()
+        if self._by_company is None:
+            companies = keys & COMPANY_MASK
+            offsets = np.zeros(len(self.companies) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(companies, minlength=len(self.companies)), out=offsets[1:])
+            self._by_company = np.argsort(companies, kind='stable'), offsets
+        return self._by_company
+
+    def companies_of(self, user):
+        u = self.user_ids.get(user)
+        if u is None:
+            return []
+        offsets = self._user_slices()
+        companies = self._keys[offsets[u]:offsets[u + 1]] & COMPANY_MASK
+        return [self.companies[c] for c in companies.tolist()]
+
+    def users_of(self, company):
+        c = self.company_ids.get(company)
+        if c is None:
+            return []
+        order, offsets = self._company_slices()
+        users = self._keys[order[offsets[c]:offsets[c + 1]]] >> COMPANY_BITS
+        return [self.users[u] for u in users.tolist()]
+
+    def shared_users(self, company):
+        """``{other company: number of users both have}``, most shared first."""
+        c = self.company_ids.get(company)
+        if c is None:
+            return {}
+        order, company_offsets = self._company_slices()
+        user_offsets = self._user_slices()
+        keys = self._keys
+        users = keys[order[company_offsets[c]:company_offsets[c + 1]]] >> COMPANY_BITS
+        # Every edge of those users at once, then one bincount over companies.
+        starts = user_offsets[users]
+        counts = user_offsets[users + 1] - starts
+        shift = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        others = keys[np.arange(counts.sum()) + shift] & COMPANY_MASK
+        shared = np.bincount(others, minlength=len(self.companies))
+        shared[c] = 0
+        found = np.flatnonzero(shared)
+        found = found[np.argsort(-shared[found], kind='stable')]
+        return {self.companies[k]: n for k, n in zip(found.tolist(), shared[found].tolist())}
+
+    def adjacency(self):
+        """``{user: [companies]}`` for every user with at least one link."""
+        offsets = self._user_slices().tolist()
+        companies = (self._keys & COMPANY_MASK).tolist()
+        names = self.companies
+        return {user: [names[c] for c in companies[offsets[u]:offsets[u + 1]]]
+                for u, user in enumerate(self.users) if offsets[u] < offsets[u + 1]}
+
+
+def _sorted_unique(keys):
+    # A plain sort: much faster than np.unique's hashing on millions of int64.
+    keys = np.sort(keys)
+    return keys[np.concatenate(([True], keys[1:] != keys[:-1]))] if len(keys) else keys
@@ -0,0 +1,234 @@
+import heapq
+
+import numpy as np
+
+import instrumentation
+
+INF = float('inf')
+
+# Witness searches stop after settling this many locations.  A cut-short
+# search can only add an unnecessary shortcut, never lose a path.
+WITNESS_SETTLE_LIMIT = 50
+
+
+class ContractionHierarchy:
+    """Contraction hierarchy over a CSRGraph's location ids.
+
+    Locations are contracted one by one (cheapest first, by edge difference
+    plus already-contracted neighbours); contracting ``v`` adds a shortcut
+    ``u - w`` of length ``d(u, v) + d(v, w)`` unless a witness search finds a
+    route at least as short without ``v``.  Every edge is then stored once,
+    under its lower-ranked end, so a query is two small Dijkstra searches
+    that only climb in rank and meet at the top.
+
+    The result is a handful of flat arrays (see ``arrays``) so it can be
+    written into a snapshot and memory-mapped back.
+    """
+
+    def __init__(self, names, ids, rank, up_offsets, up_targets, up_weights,
+                 shortcut_keys, shortcut_middle):
+        self.names = names
+        self.ids = ids
+        self.rank = rank
+        self.up_offsets = up_offsets
+        self.up_targets = up_targets
+        self.up_weights = up_weights
+        # Sorted ``low * n + high`` keys of edges that are shortcuts, and the
+        # location each one skips over.
+        self.shortcut_keys = shortcut_keys
+        self.shortcut_middle = shortcut_middle
+        self._lists = None
+
+    @classmethod
+    def build(cls, store):
+        """Preprocess a CSRGraph (``Graph.locations`` in compact mode)."""
+        offsets, targets, weights = store.csr()
+        n = len(store.names)
+        offsets, targets, weights = offsets.tolist(), targets.tolist(), weights.tolist()
+        adjacency = [{} for _ in range(n)]
+        for u in range(n):
+            neighbors = adjacency[u]
+            for i in range(offsets[u], offsets[u + 1]):
+                v, w = targets[i], weights[i]
+                if v != u and w < neighbors.get(v, INF):
+                    neighbors[v] = w
+
+        middle = {}
+        deleted = [0] * n
+        rank = np.empty(n, dtype=np.int32)
+        up = [None] * n
+        priority = [_priority(adjacency, v, deleted) for v in range(n)]
+        heap = [(p, v) for v, p in enumerate(priority)]
+        heapq.heapify(heap)
+        order = 0
+        while heap:
+            p, v = heapq.heappop(heap)
+            if adjacency[v] is None or p != priority[v]:
+                continue
+            # Lazy update: re-rank v if its priority went stale.
+            priority[v] = _priority(adjacency, v, deleted)
+            if heap and priority[v] > heap[0][0]:
+                heapq.heappush(heap, (priority[v], v))
+                continue
+            for u, w, length in list(_shortcuts(adjacency, v)):
+                if length < adjacency[u].get(w, INF):
+                    adjacency[u][w] = adjacency[w][u] = length
+                    middle[(u, w) if u < w else (w, u)] = v
+            neighbors = adjacency[v]
+            for u in neighbors:
+                del adjacency[u][v]
+                deleted[u] += 1
+            up[v] = neighbors
+            adjacency[v] = None
+            rank[v] = order
+            order += 1
+
+        up_offsets = np.zeros(n + 1, dtype=np.int64)
+        up_offsets[1:] = np.cumsum([len(neighbors) for neighbors in up])
+        up_targets = np.fromiter((u for neighbors in up for u in neighbors), dtype=np.int32,
+                                 count=int(up_offsets[-1]))
+        up_weights = np.fromiter((w for neighbors in up for w in neighbors.values()), dtype=np.float64,
+                                 count=int(up_offsets[-1]))
+        keys = np.array([low * n + high for low, high in middle], dtype=np.int64)
+        mids = np.array(list(middle.values()), dtype=np.int32)
+        order = np.argsort(keys)
+        return cls(store.names, store.ids, rank, up_offsets, up_targets, up_weights, keys[order], mids[order])
+
+    @classmethod
+    def from_arrays(cls, names, ids, arrays):
+        return cls(names, ids, *(arrays['ch_' + name] for name in _ARRAY_NAMES))
+
+    def arrays(self):
+        return {'ch_' + name: getattr(self, name) for name in _ARRAY_NAMES}
+
+    @property
+    def num_shortcuts(self):
+        return len(self.shortcut_keys)
+
+    def _up(self):
+        # Python lists index far faster than NumPy scalars in the query loop.
+        if self._lists is None:
+            self._lists = (self.up_offsets.tolist(), self.up_targets.tolist(), self.up_weights.tolist())
+        return self._lists
+
+    def query(self, source, target):
+        """Return ``(path, cost, settled)`` between two location names."""
+        s, t = self.ids.get(source), self.ids.get(target)
+        if s is None or t is None:
+            return None, INF, 0
+        if s == t:
+            return [source], 0, 1
+        if max(s, t) >= len(self.rank):
+            # Added after the hierarchy was built, so it has no edges yet.
+            return None, INF, 0
+        offsets, targets, weights = self._up()
+        dist = ({s: 0}, {t: 0})
+        prev = ({}, {})
+        heaps = ([(0, s)], [(0, t)])
+        best, meeting, settled, relaxed = INF, None, 0, 0
+        while heaps[0] or heaps[1]:
+            side = 0 if heaps[0] and (not heaps[1] or heaps[0][0][0] <= heaps[1][0][0]) else 1
+            cost, u = heapq.heappop(heaps[side])
+            if cost >= best:
+                # Everything left on this side is at least as long.
+                heaps[side].clear()
+                continue
+            mine = dist[side]
+            if cost > mine[u]:
+                continue
+            settled += 1
+            other = dist[1 - side].get(u)
+            if other is not None and cost + other < best:
+                best, meeting = cost + other, u
+            edges = list(zip(targets[offsets[u]:offsets[u + 1]], weights[offsets[u]:offsets[u + 1]]))
+            if _stalled(mine, edges, cost):
+                continue
+            for v, length in edges:
+                new_cost = cost + length
+                if new_cost < mine.get(v, INF):
+                    mine[v] = new_cost
+                    prev[side][v] = u
+                    heapq.heappush(heaps[side], (new_cost, v))
+                    relaxed += 1
+        if instrumentation.ENABLED:
+            instrumentation.search('ch', settled, relaxed)
+        if meeting is None:
+            return None, INF, settled
+        forward = _chain(prev[0], meeting)[::-1]
+        backward = _chain(prev[1], meeting)[1:]
+        ids = self.unpack(forward + backward)
+        return [self.names[i] for i in ids], best, settled
+
+    def unpack(self, ids):
+        """Expand shortcuts in a path of location ids, one level per pass."""
+        path = np.asarray(ids, dtype=np.int64)
+        n = len(self.rank)
+        keys = self.shortcut_keys
+        while len(path) > 1 and len(keys):
+            low = np.minimum(path[:-1], path[1:])
+            high = np.maximum(path[:-1], path[1:])
+            pair = low * n + high
+            at = np.minimum(np.searchsorted(keys, pair), len(keys) - 1)
+            hit = keys[at] == pair
+            if not hit.any():
+                break
+            path = np.insert(path, np.flatnonzero(hit) + 1, self.shortcut_middle[at[hit]])
+        return path.tolist()
+
+
+_ARRAY_NAMES = ('rank', 'up_offsets', 'up_targets', 'up_weights', 'shortcut_keys', 'shortcut_middle')
+
+
+def _stalled(dist, edges, cost):
+    # Stall-on-demand: a higher neighbour already reached more cheaply means
+    # this location's cost is not its shortest, so expanding it is wasted.
+    for v, length in edges:
+        if dist.get(v, INF) + length < cost:
+            return True
+    return False
+
+
+def _chain(prev, end):
+    chain = [end]
+    while chain[-1] in prev:
+        chain.append(prev[chain[-1]])
+    return chain
+
+
+def _shortcuts(adjacency, v):
+    """Yield ``(u, w, length)`` for every shortcut contracting ``v`` needs."""
+    neighbors = list(adjacency[v].items())
+    for i, (u, to_u) in enumerate(neighbors[:-1]):
+        rest = neighbors[i + 1:]
+        limit = to_u + max(length for _, length in rest)
+        dist = _witness(adjacency, u, v, limit, {w for w, _ in rest})
+        for w, to_w in rest:
+            if dist.get(w, INF) > to_u + to_w:
+                yield u, w, to_u + to_w
+
+
+def _witness(adjacency, source, skip, limit, targets):
+    dist = {source: 0}
+    heap = [(0, source)]
+    settled = 0
+    remaining = len(targets)
+    while heap and remaining:
+        cost, u = heapq.heappop(heap)
+        if cost > dist[u]:
+            continue
+        settled += 1
+        if cost > limit or settled > WITNESS_SETTLE_LIMIT:
+            break
+        if u in targets:
+            remaining -= 1
+        for v, length in adjacency[u].items():
+            new_cost = cost + length
+            if v != skip and new_cost < dist.get(v, INF):
+                dist[v] = new_cost
+                heapq.heappush(heap, (new_cost, v))
+    return dist
+
+
+def _priority(adjacency, v, deleted):
+    added = sum(1 for _ in _shortcuts(adjacency, v))
+    return added - len(adjacency[v]) + deleted[v]
@@ -0,0 +1,241 @@
+from array import array
+from collections.abc import Mapping
+
+import numpy as np
+
+import instrumentation
+from shortest_path import add_shortest_edges, csr_dijkstra, csr_nearest, reconstruct_path
+
+
+class CSRGraph(Mapping):
+    """Array-backed store for the delivery network.
+
+    Location names are interned to integer ids and every undirected edge is
+    kept once in flat ``array`` buffers (16 bytes per edge).  A compressed
+    sparse row index (``offsets``/``targets``/``weights`` NumPy arrays holding
+    both directions) is rebuilt lazily the first time a query needs it after
+    a write.
+
+    It is also a read-only ``Mapping`` from location name to the
+    ``[(neighbor, distance), ...]`` list, so code written against
+    ``Graph.locations`` keeps working.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.ids = {}
+        self.edge_sources = array('i')
+        self.edge_targets = array('i')
+        self.edge_weights = array('d')
+        self._csr = None
+        self._views = None
+        self._slot_edges = None
+        self._frozen = False
+
+    @classmethod
+    def from_adjacency(cls, adjacency):
+        """Snapshot a dict-of-lists ``Graph.locations`` into a new store."""
+        store = cls()
+        for location in adjacency:
+            store.add_location(location)
+        ids = store.ids
+        # Each undirected edge is listed under both of its ends; keep one copy.
+        store.add_edges((source, destination, distance)
+                        for source, neighbors in adjacency.items()
+                        for destination, distance in neighbors
+                        if ids[source] <= ids[destination])
+        return store
+
+    @classmethod
+    def from_arrays(cls, names, edge_sources, edge_targets, edge_weights, csr=None):
+        """Wrap read-only arrays, e.g. the memory-mapped ones of a snapshot.
+
+        ``names`` must be a sequence with ``find(name) -> id`` (see
+        snapshot.StringTable).  Nothing is copied until the first write.
+        """
+        from snapshot import NameIndex
+
+        store = cls()
+        store.names, store.ids = names, NameIndex(names)
+        store.edge_sources, store.edge_targets, store.edge_weights = edge_sources, edge_targets, edge_weights
+        store._csr = csr
+        store._frozen = True
+        return store
+
+    def _thaw(self):
+        # Copy mapped/read-only data into growable buffers before a write.
+        if self._frozen:
+            self.names = list(self.names)
+            self.ids = {name: i for i, name in enumerate(self.names)}
+            for attr, code, dtype in (('edge_sources', 'i', np.int32), ('edge_targets', 'i', np.int32),
+                                      ('edge_weights', 'd', np.float64)):
+                buffer = array(code)
+                buffer.frombytes(np.ascontiguousarray(getattr(self, attr), dtype=dtype).tobytes())
+                setattr(self, attr, buffer)
+            self._frozen = False
+
+    def add_location(self, location):
+        self._thaw()
+        if location not in self.ids:
+            self.ids[location] = len(self.names)
+            self.names.append(location)
+            self._csr = self._views = self._slot_edges = None
+        return self.ids[location]
+
+    def add_edge(self, source, destination, distance):
+        self._thaw()
+        if source in self.ids and destination in self.ids:
+            self.edge_sources.append(self.ids[source])
+            self.edge_targets.append(self.ids[destination])
+            self.edge_weights.append(distance)
+            self._csr = self._views = self._slot_edges = None
+
+    def add_edges(self, edges):
+        """Bulk insert ``(source, destination, distance)`` triples.
+
+        Unlike ``add_edge`` unknown locations are created, and the CSR index
+        is invalidated once for the whole batch.
+        """
+        self._thaw()
+        ids = self.ids
+        sources, targets, weights = array('i'), array('i'), array('d')
+        for source, destination, distance in edges:
+            u = ids.get(source)
+            if u is None:
+                u = self.add_location(source)
+            v = ids.get(destination)
+            if v is None:
+                v = self.add_location(destination)
+            sources.append(u)
+            targets.append(v)
+            weights.append(distance)
+        self.edge_sources.extend(sources)
+        self.edge_targets.extend(targets)
+        self.edge_weights.extend(weights)
+        self._csr = self._views = self._slot_edges = None
+
+    @property
+    def num_edges(self):
+        return len(self.edge_weights)
+
+    def csr(self):
+        """Return ``(offsets, targets, weights)``, building them if stale."""
+        if self._csr is None:
+            n = len(self.names)
+            sources = np.frombuffer(self.edge_sources, dtype=np.int32) if len(self.edge_sources) else np.empty(0, np.int32)
+            dests = np.frombuffer(self.edge_targets, dtype=np.int32) if len(self.edge_targets) else np.empty(0, np.int32)
+            weights = np.frombuffer(self.edge_weights, dtype=np.float64) if len(self.edge_weights) else np.empty(0)
+            rows = np.concatenate((sources, dests))
+            order = np.argsort(rows, kind='stable')
+            offsets = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(np.bincount(rows, minlength=n), out=offsets[1:])
+            targets = np.concatenate((dests, sources))[order]
+            both = np.concatenate((weights, weights))[order]
+            # Drop the frombuffer views so the edge buffers can grow again.
+            del sources, dests, weights
+            self._csr = (offsets, targets, both)
+        return self._csr
+
+    def edge_index(self):
+        """Edge id (position in the flat buffers) of every CSR slot."""
+        if self._slot_edges is None:
+            m = len(self.edge_weights)
+            sources = np.asarray(self.edge_sources, dtype=np.int32)
+            dests = np.asarray(self.edge_targets, dtype=np.int32)
+            # Same stable sort as csr(), so slot k holds concatenated entry order[k].
+            order = np.argsort(np.concatenate((sources, dests)), kind='stable')
+            self._slot_edges = order % m if m else order
+        return self._slot_edges
+
+    def edge_weight(self, source, destination):
+        """Distance of the shortest direct edge between two locations, or None."""
+        u, v = self.ids.get(source), self.ids.get(destination)
+        if u is None or v is None:
+            return None
+        targets, weights = self.neighbors(u)
+        found = weights[targets == v]
+        return float(found.min()) if len(found) else None
+
+    def update_edges(self, updates):
+        """Set the distance of existing ``(source, destination, distance)``
+        edges, every parallel copy included; returns how many were found.
+
+        Both the flat buffers and the CSR index are patched in place, so a
+        traffic update doesn't force the index to be rebuilt.
+        """
+        self._thaw()
+        offsets, targets, weights = self.csr()
+        if not weights.flags.writeable:
+            # Mapped from a snapshot: copy just the weights.
+            weights = weights.copy()
+            self._csr, self._views = (offsets, targets, weights), None
+        slot_edges = self.edge_index()
+        ids, edge_weights = self.ids, self.edge_weights
+        count = 0
+        for source, destination, distance in updates:
+            u, v = ids.get(source), ids.get(destination)
+            if u is None or v is None:
+                continue
+            found = False
+            for a, b in ((u, v), (v, u)):
+                start = offsets[a]
+                slots = start + np.flatnonzero(targets[start:offsets[a + 1]] == b)
+                weights[slots] = distance
+                for edge in slot_edges[slots].tolist():
+                    edge_weights[edge] = distance
+                found = found or len(slots) > 0
+            count += found
+        return count
+
+    def views(self):
+        # Counted here, once per search, rather than in csr() which every
+        # neighbour lookup goes through.
+        instrumentation.cache('csr', self._views is not None)
+        if self._views is None:
+            self._views = tuple(memoryview(a) for a in self.csr())
+        return self._views
+
+    def neighbors(self, location_id):
+        offsets, targets, weights = self.csr()
+        start, end = offsets[location_id], offsets[location_id + 1]
+        return targets[start:end], weights[start:end]
+
+    def shortest_path(self, start_location, end_location):
+        if start_location not in self.ids or end_location not in self.ids:
+            return None
+        source, target = self.ids[start_location], self.ids[end_location]
+        dist, prev = csr_dijkstra(*self.views(), source, target)
+        path = reconstruct_path(prev, source, target)
+        return None if path is None else [self.names[i] for i in path]
+
+    def nearest_location(self, location):
+        if location not in self.ids:
+            return None
+        nearest = csr_nearest(*self.views(), self.ids[location])
+        return None if nearest is None else self.names[nearest]
+
+    def iter_edges(self):
+        names = self.names
+        for u, v, w in zip(self.edge_sources.tolist(), self.edge_targets.tolist(), self.edge_weights.tolist()):
+            yield names[u], names[v], w
+
+    def to_networkx(self):
+        import networkx as nx
+        graph = nx.Graph()
+        graph.add_nodes_from(self.names)
+        add_shortest_edges(graph, self.iter_edges())
+        return graph
+
+    def __getitem__(self, location):
+        targets, weights = self.neighbors(self.ids[location])
+        names = self.names
+        return [(names[v], w) for v, w in zip(targets.tolist(), weights.tolist())]
+
+    def __contains__(self, location):
+        return location in self.ids
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
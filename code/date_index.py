@@ -0,0 +1,128 @@
+import numpy as np
+
+from products import STATUS_BOUNDS, _Column, to_day, today
+
+# Per-company keys are ``company << 32 | (day + DAY_BIAS)``, so one company's
+# orders are a contiguous run sorted by day.
+DAY_BIAS = 1 << 31
+# Pending rows are merged into the sorted arrays once there are more than
+# DELTA_MIN of them and more than 1/DELTA_FRACTION of the rows indexed.
+DELTA_MIN = 4096
+DELTA_FRACTION = 16
+
+
+class _SortedRows:
+    """Row numbers sorted by an int64 key; equal keys stay in row order.
+
+    New rows go into a small sorted delta, kept in columns with spare
+    capacity, and are folded into the main arrays only once the delta
+    reaches a fraction of their size.  Rows arriving in key order are a
+    plain append, so keeping up with k new rows costs O(k log k) amortised
+    instead of a copy of the whole index.  Queries search both parts and
+    merge the delta's share in.
+    """
+
+    def __init__(self):
+        self.keys = np.empty(0, dtype=np.int64)
+        self.rows = np.empty(0, dtype=np.int64)
+        self.delta_keys = _Column(np.int64)
+        self.delta_rows = _Column(np.int64)
+
+    def insert(self, keys, rows):
+        order = np.argsort(keys, kind='stable')
+        keys, rows = keys[order], rows[order]
+        delta_keys, delta_rows = self.delta_keys, self.delta_rows
+        if not delta_keys.size or keys[0] >= delta_keys.data[delta_keys.size - 1]:
+            # Orders mostly arrive in date order: a plain append.
+            delta_keys.extend(keys)
+            delta_rows.extend(rows)
+        else:
+            at = np.searchsorted(delta_keys.view(), keys, side='right')
+            merged_keys = np.insert(delta_keys.view(), at, keys)
+            merged_rows = np.insert(delta_rows.view(), at, rows)
+            delta_keys.data, delta_keys.size = merged_keys, len(merged_keys)
+            delta_rows.data, delta_rows.size = merged_rows, len(merged_rows)
+        if delta_keys.size > max(DELTA_MIN, len(self.keys) // DELTA_FRACTION):
+            at = np.searchsorted(self.keys, delta_keys.view(), side='right')
+            self.keys = np.insert(self.keys, at, delta_keys.view())
+            self.rows = np.insert(self.rows, at, delta_rows.view())
+            self.delta_keys = _Column(np.int64)
+            self.delta_rows = _Column(np.int64)
+
+    def between(self, low, high):
+        """Rows with ``low <= key <= high``, in key order."""
+        start, stop = np.searchsorted(self.keys, (low, high + 1))
+        delta_keys = self.delta_keys.view()
+        first, last = np.searchsorted(delta_keys, (low, high + 1))
+        if first == last:
+            return self.rows[start:stop]
+        # Main rows come first among equal keys: they are the older rows.
+        keys = np.concatenate((self.keys[start:stop], delta_keys[first:last]))
+        rows = np.concatenate((self.rows[start:stop], self.delta_rows.view()[first:last]))
+        return rows[np.argsort(keys, kind='stable')]
+
+    def counts(self, low, high):
+        """Rows per key for every key in ``low..high``."""
+        edges = np.arange(low, high + 2, dtype=np.int64)
+        return (np.diff(np.searchsorted(self.keys, edges))
+                + np.diff(np.searchsorted(self.delta_keys.view(), edges)))
+
+
+def _day(value):
+    return value if isinstance(value, (int, np.integer)) else to_day(value)
+
+
+class DateIndex:
+    """Orders of a ProductTable sorted by date, overall and per company.
+
+    Dates are day numbers, sorted once; a range is a few binary searches
+    and a slice, so every query is O(log n + k).  Rows appended to the
+    table since the last query are added on the next one, at an amortised
+    cost that depends on how many there are, not on the size of the index.
+    Dates may be given as day numbers, ``date`` objects or ``'YYYY-MM-DD'``
+    strings; ranges are inclusive.
+    """
+
+    def __init__(self, table):
+        self.table = table
+        self.size = 0
+        self.by_day = _SortedRows()
+        self.by_company = _SortedRows()
+
+    def _refresh(self):
+        stop = len(self.table)
+        if stop > self.size:
+            days = self.table.day_column.data[self.size:stop].astype(np.int64)
+            companies = self.table.company_column.data[self.size:stop].astype(np.int64)
+            rows = np.arange(self.size, stop, dtype=np.int64)
+            self.by_day.insert(days, rows)
+            self.by_company.insert(companies << 32 | (days + DAY_BIAS), rows)
+            self.size = stop
+        return self
+
+    def _range(self, first, last, company_id):
+        # (index, low key, high key) for the inclusive day range
+        first, last = _day(first), _day(last)
+        self._refresh()
+        if company_id is None:
+            return self.by_day, first, last
+        base = int(company_id) << 32
+        return self.by_company, base + first + DAY_BIAS, base + last + DAY_BIAS
+
+    def rows_between(self, first, last, company_id=None):
+        """Row numbers of the orders placed from ``first`` to ``last``,
+        oldest first; only ``company_id``'s when given."""
+        index, low, high = self._range(first, last, company_id)
+        return index.between(low, high) if low <= high else index.rows[:0]
+
+    def day_counts(self, first, last, company_id=None):
+        """Number of orders on each day from ``first`` to ``last``."""
+        index, low, high = self._range(first, last, company_id)
+        return index.counts(low, high) if low <= high else np.zeros(0, dtype=np.int64)
+
+    def oldest_undelivered(self, today_number=None, limit=10, company_id=None):
+        """Up to ``limit`` rows not yet delivered as of ``today_number``
+        (see DELIVERY_STATUSES), oldest first."""
+        today_number = today() if today_number is None else today_number
+        first = today_number - STATUS_BOUNDS[-1] + 1
+        return self.rows_between(first, DAY_BIAS - 1, company_id)[:limit]
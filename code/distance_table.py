@@ -0,0 +1,217 @@
+import heapq
+
+import numpy as np
+
+from shortest_path import location_dijkstra
+
+INF = float('inf')
+
+# Above this many locations the table is filled one Dijkstra per source
+# instead of with Floyd-Warshall (O(n^3) work, O(n^2) temporaries).
+FLOYD_WARSHALL_LIMIT = 1500
+
+
+class DistanceTable:
+    """Precomputed shortest distances and predecessors.
+
+    ``dist[i, j]`` is the distance from ``sources[i]`` to location ``j`` and
+    ``pred[i, j]`` the location before ``j`` on that route (-1 if none).
+    With ``sources=None`` every location is a source and the table is square.
+
+    ``add_location`` and ``add_edge`` repair the table in place: a new edge
+    can only shorten routes, so each row is relaxed through the edge in both
+    directions with a couple of vectorised array operations.
+    ``update_edges`` repairs it after distances change in place.
+    """
+
+    def __init__(self, adjacency, sources=None, method=None):
+        self.names = list(adjacency)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+        self.square = sources is None
+        self.sources = list(self.names) if self.square else [s for s in sources if s in self.ids]
+        self.rows = {name: i for i, name in enumerate(self.sources)}
+        if method is None:
+            method = 'floyd-warshall' if self.square and len(self.names) <= FLOYD_WARSHALL_LIMIT else 'dijkstra'
+        if method == 'floyd-warshall' and not self.square:
+            raise ValueError("Floyd-Warshall needs every location as a source")
+        self.method = method
+        if method == 'floyd-warshall':
+            self._floyd_warshall(adjacency)
+        elif method == 'dijkstra':
+            self._dijkstra_batches(adjacency)
+        else:
+            raise ValueError(f"Unknown method {method!r}")
+
+    def _floyd_warshall(self, adjacency):
+        n = len(self.names)
+        dist = np.full((n, n), INF)
+        pred = np.full((n, n), -1, dtype=np.int32)
+        for name, i in self.ids.items():
+            for neighbor, distance in adjacency[name]:
+                j = self.ids[neighbor]
+                if distance < dist[i, j]:
+                    dist[i, j] = distance
+                    pred[i, j] = i
+        np.fill_diagonal(dist, 0)
+        np.fill_diagonal(pred, -1)
+        for k in range(n):
+            through = dist[:, k, None] + dist[None, k, :]
+            better = through < dist
+            dist[better] = through[better]
+            pred[better] = np.broadcast_to(pred[k], (n, n))[better]
+        self.dist, self.pred = dist, pred
+
+    def _dijkstra_batches(self, adjacency):
+        n = len(self.names)
+        self.dist = np.full((len(self.sources), n), INF)
+        self.pred = np.full((len(self.sources), n), -1, dtype=np.int32)
+        for row, source in enumerate(self.sources):
+            self.dist[row], self.pred[row] = self._single_source(adjacency, source)
+
+    def _single_source(self, adjacency, source):
+        dist_row = np.full(len(self.names), INF)
+        pred_row = np.full(len(self.names), -1, dtype=np.int32)
+        dist, prev = location_dijkstra(adjacency, source)
+        ids = self.ids
+        index = np.fromiter((ids[name] for name in dist), dtype=np.int64, count=len(dist))
+        dist_row[index] = np.fromiter(dist.values(), dtype=np.float64, count=len(dist))
+        if prev:
+            index = np.fromiter((ids[name] for name in prev), dtype=np.int64, count=len(prev))
+            pred_row[index] = np.fromiter((ids[name] for name in prev.values()), dtype=np.int32, count=len(prev))
+        return dist_row, pred_row
+
+    def _row(self, adjacency, location):
+        if location in self.rows:
+            row = self.rows[location]
+            return self.dist[row].copy(), self.pred[row].copy()
+        return self._single_source(adjacency, location)
+
+    def add_location(self, location):
+        if location in self.ids:
+            return
+        self.ids[location] = len(self.names)
+        self.names.append(location)
+        self.dist = np.pad(self.dist, ((0, 0), (0, 1)), constant_values=INF)
+        self.pred = np.pad(self.pred, ((0, 0), (0, 1)), constant_values=-1)
+        if self.square:
+            self.rows[location] = len(self.sources)
+            self.sources.append(location)
+            new_dist = np.full((1, len(self.names)), INF)
+            new_dist[0, -1] = 0
+            self.dist = np.vstack((self.dist, new_dist))
+            self.pred = np.vstack((self.pred, np.full((1, len(self.names)), -1, dtype=np.int32)))
+
+    def add_edge(self, adjacency, source, destination, distance):
+        """Relax every row through the new edge; ``adjacency`` already has it."""
+        if source not in self.ids or destination not in self.ids:
+            return
+        u, v = self.ids[source], self.ids[destination]
+        dist_u, pred_u = self._row(adjacency, source)
+        dist_v, pred_v = self._row(adjacency, destination)
+        # Routes ending in ...->u->v->j take j's predecessor from v's tree,
+        # except j == v itself whose predecessor is u (and symmetrically).
+        pred_v[v] = u
+        pred_u[u] = v
+        to_u, to_v = self.dist[:, u].copy(), self.dist[:, v].copy()
+        for head, tail_dist, tail_pred in ((to_u, dist_v, pred_v), (to_v, dist_u, pred_u)):
+            candidate = head[:, None] + distance + tail_dist[None, :]
+            better = candidate < self.dist
+            self.dist[better] = candidate[better]
+            self.pred[better] = np.broadcast_to(tail_pred, self.dist.shape)[better]
+
+    def update_edges(self, adjacency, changes):
+        """Repair every row after edge distances changed in place.
+
+        ``changes`` holds ``(source, destination, old, new)`` and ``adjacency``
+        already has the new distances.  In each row, locations whose route
+        ran over a lengthened edge (its subtree in that row's shortest-path
+        tree) are reset and re-reached from their neighbours, shortened
+        edges seed improvements, and one Dijkstra pass spreads both.  The
+        work is proportional to the part of the row that actually changes.
+        """
+        ids = self.ids
+        changes = [(ids[s], ids[d], old, new) for s, d, old, new in changes if s in ids and d in ids]
+        longer = [(u, v) for u, v, old, new in changes if new > old]
+        shorter = [(u, v, new) for u, v, old, new in changes if new < old]
+        names = self.names
+        for row in range(len(self.sources)):
+            dist, pred = self.dist[row], self.pred[row]
+            heap = []
+            roots = [v if pred[v] == u else u for u, v in longer if pred[v] == u or pred[u] == v]
+            if roots:
+                reset = _subtree(pred, roots)
+                if 2 * len(reset) > len(names):
+                    # Most of the row is affected; a fresh search is cheaper.
+                    dist[:], pred[:] = self._single_source(adjacency, self.sources[row])
+                    continue
+                dist[reset] = INF
+                pred[reset] = -1
+                inside = np.zeros(len(names), dtype=bool)
+                inside[reset] = True
+                for x in reset.tolist():
+                    for neighbor, distance in adjacency[names[x]]:
+                        y = ids[neighbor]
+                        if not inside[y] and dist[y] + distance < dist[x]:
+                            dist[x], pred[x] = dist[y] + distance, y
+                    if dist[x] < INF:
+                        heap.append((dist[x], x))
+            for u, v, distance in shorter:
+                for a, b in ((u, v), (v, u)):
+                    if dist[a] + distance < dist[b]:
+                        dist[b], pred[b] = dist[a] + distance, a
+                        heap.append((dist[b], b))
+            heapq.heapify(heap)
+            while heap:
+                cost, x = heapq.heappop(heap)
+                if cost > dist[x]:
+                    continue
+                for neighbor, distance in adjacency[names[x]]:
+                    y = ids[neighbor]
+                    if cost + distance < dist[y]:
+                        dist[y], pred[y] = cost + distance, x
+                        heapq.heappush(heap, (cost + distance, y))
+
+    def covers(self, start_location, end_location):
+        return ((start_location in self.rows and end_location in self.ids)
+                or (end_location in self.rows and start_location in self.ids))
+
+    def distance(self, start_location, end_location):
+        if start_location in self.rows:
+            return float(self.dist[self.rows[start_location], self.ids[end_location]])
+        return float(self.dist[self.rows[end_location], self.ids[start_location]])
+
+    def path(self, start_location, end_location):
+        """Route between two covered locations, or None if unreachable."""
+        reverse = start_location not in self.rows
+        if reverse:
+            start_location, end_location = end_location, start_location
+        row = self.rows[start_location]
+        i, j = self.ids[start_location], self.ids[end_location]
+        if self.dist[row, j] == INF:
+            return None
+        pred = self.pred[row]
+        path = [j]
+        while path[-1] != i:
+            path.append(int(pred[path[-1]]))
+        if not reverse:
+            path.reverse()
+        return [self.names[k] for k in path]
+
+
+def _subtree(pred, roots):
+    """Ids of ``roots`` and all their descendants in a predecessor array."""
+    order = np.argsort(pred, kind='stable')
+    children = pred[order]
+    seen = np.zeros(len(pred), dtype=bool)
+    frontier = np.unique(np.asarray(roots, dtype=np.int64))
+    found = []
+    while len(frontier):
+        frontier = frontier[~seen[frontier]]
+        seen[frontier] = True
+        found.append(frontier)
+        # Children of the whole frontier at once: one slice of ``order`` each.
+        starts = np.searchsorted(children, frontier)
+        counts = np.searchsorted(children, frontier, side='right') - starts
+        shift = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        frontier = order[np.arange(counts.sum()) + shift]
+    return np.concatenate(found) if found else np.empty(0, dtype=np.int64)
@@ -0,0 +1,163 @@
+"""Opt-in timing, counters and per-query profiling.
+
+Off by default, when a timed method costs one extra call and a flag check.
+``enable()`` turns collection on; ``snapshot()`` returns what has been
+gathered so far and ``dump()`` writes it as JSON::
+
+    instrumentation.enable()
+    graph.get_shortest_path('A', 'B')
+    instrumentation.snapshot()['calls']['Graph.get_shortest_path']
+
+Setting ``DELIVERY_STATS=stats.json`` in the environment enables it for a
+whole run and writes the file at exit.
+"""
+import atexit
+import functools
+import os
+import threading
+import time
+import types
+from contextlib import contextmanager
+
+ENABLED = False
+
+_lock = threading.Lock()
+# tracemalloc and the profiler hook are process-wide: one capture at a time.
+# Reentrant so a nested capture on the same thread does not deadlock.
+_capture_lock = threading.RLock()
+_calls = {}      # name -> [calls, total seconds, max seconds]
+_counters = {}   # name -> int
+
+
+def enable(on=True):
+    global ENABLED
+    ENABLED = on
+
+
+def reset():
+    with _lock:
+        _calls.clear()
+        _counters.clear()
+
+
+def timed(name):
+    """Decorator recording calls and wall time under ``name`` while enabled."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                with _lock:
+                    entry = _calls.get(name)
+                    if entry is None:
+                        entry = _calls[name] = [0, 0.0, 0.0]
+                    entry[0] += 1
+                    entry[1] += elapsed
+                    entry[2] = max(entry[2], elapsed)
+        return wrapper
+    return decorate
+
+
+def instrument(cls):
+    """Class decorator: time every public method as ``Class.method``."""
+    for attr, value in list(vars(cls).items()):
+        if not attr.startswith('_') and isinstance(value, types.FunctionType):
+            setattr(cls, attr, timed(f"{cls.__name__}.{attr}")(value))
+    return cls
+
+
+def count(name, n=1):
+    if ENABLED:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + n
+
+
+def cache(name, hit):
+    """Count a lookup in cache ``name`` as a hit or a miss."""
+    count(f"{name}.{'hits' if hit else 'misses'}")
+
+
+def search(algorithm, settled, relaxed):
+    """Count one search and the locations it settled and edges it relaxed."""
+    if ENABLED:
+        with _lock:
+            for key, n in (('searches', 1), ('settled', settled), ('relaxed', relaxed)):
+                key = f"search.{algorithm}.{key}"
+                _counters[key] = _counters.get(key, 0) + n
+
+
+def snapshot():
+    """Everything collected so far as plain dicts (JSON-serialisable)."""
+    with _lock:
+        calls = {name: {'calls': n, 'total_ms': total * 1e3, 'mean_ms': total / n * 1e3, 'max_ms': most * 1e3}
+                 for name, (n, total, most) in _calls.items()}
+        counters = dict(_counters)
+    caches = {}
+    for key, n in counters.items():
+        name, _, kind = key.rpartition('.')
+        if kind in ('hits', 'misses'):
+            caches.setdefault(name, {'hits': 0, 'misses': 0})[kind] = n
+    for stats in caches.values():
+        stats['hit_rate'] = stats['hits'] / (stats['hits'] + stats['misses'])
+    return {'enabled': ENABLED, 'calls': calls, 'counters': counters, 'caches': caches}
+
+
+def dump(path=None):
+    """The snapshot as JSON, also written to ``path`` when given."""
+    import json
+
+    text = json.dumps(snapshot(), indent=2, sort_keys=True)
+    if path is not None:
+        with open(path, 'w') as f:
+            f.write(text)
+    return text
+
+
+@contextmanager
+def capture(memory=True, top=20):
+    """Profile the ``with`` block; the yielded dict is filled in on exit with
+    ``seconds``, the ``top`` functions by cumulative time and, with
+    ``memory``, the peak traced allocation in bytes.
+
+    tracemalloc and cProfile are global to the process, so captures are
+    serialised: one started on another thread waits for this one to end.
+    The profile covers only the thread that entered the block.
+    """
+    import cProfile
+    import io
+    import pstats
+    import tracemalloc
+
+    with _capture_lock:
+        report = {}
+        tracing = tracemalloc.is_tracing()
+        if memory:
+            if tracing:
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        profiler.enable()
+        try:
+            yield report
+        finally:
+            profiler.disable()
+            report['seconds'] = time.perf_counter() - start
+            if memory:
+                report['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+                if not tracing:
+                    tracemalloc.stop()
+            stream = io.StringIO()
+            pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(top)
+            report['profile'] = stream.getvalue()
+
+
+if os.environ.get('DELIVERY_STATS'):
+    enable()
+    atexit.register(dump, os.environ['DELIVERY_STATS'])
@@ -1,121 +1,527 @@
 import datetime
-from turtle import *
-import heapq
-import networkx as nx
-import matplotlib.pyplot as plt
+from array import array
+from connections import Connections
+import instrumentation
+from priority_queue import PriorityQueue
+from products import DELIVERY_STATUSES, ProductTable, from_day, today
+from route_cache import MISSING, RouteCache
+from shortest_path import (Landmarks, add_shortest_edges, coordinate_scale, dijkstra, location_dijkstra,
+                           nearest_location, point_to_point, reconstruct_path)
 
 class Node:
     def __init__(self, company_id):
         self.company_id = company_id
-        self.products = []
+        self.products = array('q')      # row indices into Graph.products
 
-    def add_product(self, product):
-        self.products.append(product)
+    def add_product(self, row):
+        self.products.append(row)
 
+@instrumentation.instrument
 class Graph:
-    def __init__(self):
+    def __init__(self, compact=False):
         self.nodes = {}
-        self.edges = {}
+        # Which users are linked to which companies (see connections.py).
+        self.connections = Connections()
         self.user_products = {}
-        self.locations = {}
-        self.graph = nx.Graph()
+        self.products = ProductTable()
+        # Per-company/per-user running totals behind the delivery reports
+        # (see order_stream.OrderTotals), built on the first report.
+        self.order_totals = None
+        # compact=True keeps the delivery network in a CSRGraph and no
+        # networkx graph.
+        self.compact = compact
+        if compact:
+            from csr_graph import CSRGraph
+            self.locations = CSRGraph()
+        else:
+            self.locations = {}
+        self._graph = None
+        self.distance_table = None
+        # Optional (x, y) per location for A*; landmarks and the coordinate
+        # scale are built on the first query that needs them.
+        self.coordinates = {}
+        self._coordinate_scale = None
+        self.landmarks = None
+        self.contraction = None
+        self.edge_profiles = {}
+        self.layout = None
+        # LRU of route and next-stop results plus shortest-path trees of busy
+        # sources (see route_cache.py); None turns it off.
+        self.route_cache = RouteCache()
 
     def add_node(self, company_id):
         if company_id not in self.nodes:
             self.nodes[company_id] = Node(company_id)
-            self.edges[company_id] = []
 
-    def add_edge_pro(self, node1, node2):           #for product connection with user and company
-        if node1 in self.nodes and node2 in self.nodes:
-            self.edges[node1].append(node2)
-            self.edges[node2].append(node1)
+    def add_edge_pro(self, user_id, company_id):     #for product connection with user and company
+        # Linking a pair that is already linked changes nothing.
+        if company_id in self.nodes:
+            self.connections.add(user_id, company_id)
         
     def add_edge(self,source,destination,distance):  #for delivery location connection
-        if source in self.locations and destination in self.locations:
+        if self.compact:
+            self.locations.add_edge(source, destination, distance)
+        elif source in self.locations and destination in self.locations:
             self.locations[source].append((destination, distance))
             self.locations[destination].append((source, distance))
-            self.graph.add_edge(source, destination, weight=distance)
+            if self._graph is not None:
+                add_shortest_edges(self._graph, [(source, destination, distance)])
+        self._invalidate_search()
+        if self.distance_table is not None:
+            self.distance_table.add_edge(self.locations, source, destination, distance)
         
-    def add_location(self, location):
-        self.locations[location] = []
-
-    def visualize_graph(self):
-        pos = nx.spring_layout(self.graph)
-        nx.draw(self.graph, pos, with_labels=True, node_size=500, node_color='lightblue', edge_color='gray')
-        edge_labels = nx.get_edge_attributes(self.graph, 'weight')
-        nx.draw_networkx_edge_labels(self.graph, pos, edge_labels=edge_labels)
-        plt.show()
-
-    def get_shortest_path(self, start_location, end_location):
-        path = nx.shortest_path(self.graph, start_location, end_location, weight='weight')
+    def add_location(self, location, coordinates=None):
+        if self.compact:
+            self.locations.add_location(location)
+        else:
+            self.locations[location] = []
+        if coordinates is not None:
+            x, y = coordinates
+            self.coordinates[location] = (float(x), float(y))
+            self._coordinate_scale = None
+        if self.distance_table is not None:
+            self.distance_table.add_location(location)
+        if self.route_cache is not None:
+            self.route_cache.invalidate()
+
+    def update_edge_weight(self, source, destination, distance):
+        return self.update_edge_weights([(source, destination, distance)])
+
+    def update_edge_weights(self, updates):
+        # Change existing edges' distances in place (live traffic), rather
+        # than re-adding them; returns how many edges changed.  A distance
+        # table is repaired only where routes actually change.
+        changes = {}
+        for source, destination, distance in updates:
+            key = (destination, source) if (destination, source) in changes else (source, destination)
+            changes[key] = distance
+        changed = []
+        for (source, destination), distance in changes.items():
+            old = self._edge_weight(source, destination)
+            if old is not None and distance != old:
+                changed.append((source, destination, old, distance))
+        self._write_edge_weights([(s, d, new) for s, d, _, new in changed])
+        if self.distance_table is not None:
+            self.distance_table.update_edges(self.locations, changed)
+        if any(new < old for _, _, old, new in changed):
+            # Only a shorter edge can break landmark and coordinate bounds
+            # or shorten routes that don't use it.
+            self._coordinate_scale = None
+            self.landmarks = None
+            if self.route_cache is not None:
+                self.route_cache.invalidate()
+        elif changed and self.route_cache is not None:
+            self.route_cache.evict_edges((source, destination) for source, destination, _, _ in changed)
+        if changed:
+            self.contraction = None
+        return len(changed)
+
+    def _edge_weight(self, source, destination):
+        if self.compact:
+            return self.locations.edge_weight(source, destination)
+        found = [d for neighbor, d in self.locations.get(source, ()) if neighbor == destination]
+        return min(found) if found else None
+
+    def _write_edge_weights(self, edges):
+        if self.compact:
+            self.locations.update_edges(edges)
+            return
+        for source, destination, distance in edges:
+            for a, b in ((source, destination), (destination, source)):
+                neighbors = self.locations[a]
+                for i, (neighbor, _) in enumerate(neighbors):
+                    if neighbor == b:
+                        neighbors[i] = (b, distance)
+            if self._graph is not None:
+                self._graph[source][destination]['weight'] = distance
+
+    def set_edge_profile(self, source, destination, profile):
+        # Distance per time-of-day slot (e.g. 24 hourly values) for an
+        # existing edge; apply_edge_profiles(slot) switches to that slot.
+        self.edge_profiles[(source, destination)] = array('d', profile)
+
+    def apply_edge_profiles(self, slot):
+        return self.update_edge_weights((source, destination, profile[slot % len(profile)])
+                                        for (source, destination), profile in self.edge_profiles.items())
+
+    def add_edges(self, edges):
+        # Distances are checked like load_edges checks a file's; a bad edge
+        # raises ValueError before anything is inserted.
+        from bulk_loader import validate_edges
+
+        self._insert_edges(validate_edges(edges))
+        self._refresh_distance_table()
+
+    def load_edges(self, path, **kwargs):
+        # Streams a CSV/TSV edge list or a .npy distance matrix in chunks;
+        # returns the number of edges inserted.
+        count = 0
+        from bulk_loader import iter_file_chunks
+
+        for chunk in iter_file_chunks(path, **kwargs):
+            self._insert_edges(chunk)
+            count += len(chunk)
+        self._refresh_distance_table()
+        return count
+
+    def _insert_edges(self, edges):
+        # Bulk counterpart of add_edge: missing locations are created and
+        # the networkx graph is updated once per batch.
+        edges = list(edges)   # walked twice below
+        self._invalidate_search()
+        if self.compact:
+            self.locations.add_edges(edges)
+            return
+        locations = self.locations
+        for source, destination, distance in edges:
+            if source not in locations:
+                locations[source] = []
+            if destination not in locations:
+                locations[destination] = []
+            locations[source].append((destination, distance))
+            locations[destination].append((source, distance))
+        if self._graph is not None:
+            add_shortest_edges(self._graph, edges)
+
+    def _refresh_distance_table(self):
+        table = self.distance_table
+        if table is not None:
+            self.precompute_distances(None if table.square else table.sources)
+
+    def save(self, path):
+        from snapshot import save_graph
+
+        save_graph(self, path)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        # The loaded graph is compact and backed by the mapped file until the
+        # first write; see snapshot.py for the format.
+        from snapshot import load_graph
+
+        return load_graph(cls, path, mmap)
+
+    @property
+    def graph(self):
+        # networkx copy of the dict store, built the first time something
+        # asks for it and kept in step with later writes from then on.
+        if self._graph is None and not self.compact:
+            import networkx as nx
+
+            # Published only once complete: readers on other threads must
+            # never see a half-built graph.
+            graph = nx.Graph()
+            add_shortest_edges(graph, ((source, destination, distance)
+                                       for source, neighbors in self.locations.items()
+                                       for destination, distance in neighbors))
+            self._graph = graph
+        return self._graph
+
+    def to_networkx(self):
+        if self.compact:
+            return self.locations.to_networkx()
+        return self.graph
+
+    def visualize_graph(self, path=None):
+        # The layout is cached and only new locations get placed; large
+        # networks are binned (see visualization.draw_network).  With a
+        # .png/.svg path the figure is written headlessly instead of shown.
+        from visualization import GraphLayout, draw_network
+
+        if self.layout is None:
+            self.layout = GraphLayout()
+        self.layout.update(self.locations, self.coordinates)
+        return draw_network(self.locations, self.layout, path)
+
+    def precompute_distances(self, sources=None, method=None):
+        # Opt-in all-pairs (or depot-rows) table; add_location/add_edge keep
+        # it up to date so later lookups never fall back to a search.
+        from distance_table import DistanceTable
+
+        self.distance_table = DistanceTable(self.locations, sources, method)
+        return self.distance_table
+
+    def get_distance(self, start_location, end_location):
+        table = self.distance_table
+        hit = table is not None and table.covers(start_location, end_location)
+        instrumentation.cache('distance_table', hit)
+        if hit:
+            return table.distance(start_location, end_location)
+        if start_location not in self.locations:
+            return float('inf')
+        dist, _ = dijkstra(self.locations, start_location, end_location)
+        return dist.get(end_location, float('inf'))
+
+    def _invalidate_search(self):
+        # A new edge can shorten distances, which breaks landmark bounds,
+        # may need shortcuts the hierarchy doesn't have and stales cached routes.
+        self._coordinate_scale = None
+        self.landmarks = None
+        self.contraction = None
+        if self.route_cache is not None:
+            self.route_cache.invalidate()
+
+    def build_contraction_hierarchy(self):
+        # Slow one-off preprocessing for fast get_shortest_path queries on a
+        # network that rarely changes; saved with the graph by save().
+        from contraction import ContractionHierarchy
+        from csr_graph import CSRGraph
+
+        store = self.locations if self.compact else CSRGraph.from_adjacency(self.locations)
+        self.contraction = ContractionHierarchy.build(store)
+        return self.contraction
+
+    def search(self, start_location, end_location, algorithm='dijkstra'):
+        # Returns (path, cost, settled); see shortest_path.point_to_point,
+        # plus 'ch' for the contraction hierarchy.
+        if algorithm == 'ch':
+            instrumentation.cache('contraction', self.contraction is not None)
+            if self.contraction is None:
+                self.build_contraction_hierarchy()
+            return self.contraction.query(start_location, end_location)
+        if algorithm == 'astar':
+            instrumentation.cache('coordinate_scale', self._coordinate_scale is not None)
+            if self._coordinate_scale is None:
+                self._coordinate_scale = coordinate_scale(self.locations, self.coordinates)
+        if algorithm == 'alt':
+            instrumentation.cache('landmarks', self.landmarks is not None)
+            if self.landmarks is None:
+                self.landmarks = Landmarks(self.locations)
+        return point_to_point(self.locations, start_location, end_location, algorithm,
+                              self.coordinates, self._coordinate_scale or 0.0, self.landmarks)
+
+    def get_shortest_path(self, start_location, end_location, algorithm=None):
+        # List of locations from start to end; None if either is unknown or
+        # no route joins them, whichever backend or algorithm answers.
+        cache = self.route_cache
+        if cache is None:
+            return self._shortest_path(start_location, end_location, algorithm)
+        query = ('path', start_location, end_location, algorithm)
+        path = cache.get(query)
+        if path is not MISSING:
+            return path
+        if algorithm is None:
+            tree = self._route_tree(start_location)
+            if tree is not None and end_location in tree[0]:
+                return reconstruct_path(tree[1], start_location, end_location)
+        version = cache.version
+        path = self._shortest_path(start_location, end_location, algorithm)
+        cache.put(query, path, version, zip(path, path[1:]) if path else ())
         return path
 
+    def _route_tree(self, source):
+        # Shortest-path tree of a source that keeps missing the cache, so
+        # the rest of its routes are a walk up the predecessor map.
+        cache = self.route_cache
+        tree = cache.tree(source)
+        if tree is None and source in self.locations and cache.wants_tree(source):
+            version = cache.version
+            tree = location_dijkstra(self.locations, source)
+            cache.put_tree(source, *tree, version)
+        return tree
+
+    def _shortest_path(self, start_location, end_location, algorithm=None):
+        if algorithm is not None:
+            return self.search(start_location, end_location, algorithm)[0]
+        table = self.distance_table
+        hit = table is not None and table.covers(start_location, end_location)
+        instrumentation.cache('distance_table', hit)
+        if hit:
+            return table.path(start_location, end_location)
+        if self.contraction is not None:
+            return self.contraction.query(start_location, end_location)[0]
+        if self.compact:
+            return self.locations.shortest_path(start_location, end_location)
+        if start_location not in self.locations or end_location not in self.locations:
+            return None
+        if start_location == end_location:
+            return [start_location]   # may have no roads, so not in self.graph
+        import networkx as nx
+
+        instrumentation.count('search.networkx.searches')
+        try:
+            return nx.shortest_path(self.graph, start_location, end_location, weight='weight')
+        except (nx.NetworkXNoPath, nx.NodeNotFound):
+            return None
+
+    def plan_route(self, start, stops, time_budget=1.0, return_to_start=False):
+        # Returns (ordered_stops, road_path); raises ValueError for an
+        # unknown or unreachable start or stop.  See tour.plan_route.
+        from tour import plan_route
+
+        return plan_route(self.locations, start, stops, time_budget, return_to_start)
+
+    def get_shortest_paths_batch(self, pairs, workers=None):
+        # One path (or None) per (start, end) pair; see batch_paths.
+        from batch_paths import shortest_paths_batch
+        from csr_graph import CSRGraph
+
+        store = self.locations if self.compact else CSRGraph.from_adjacency(self.locations)
+        return shortest_paths_batch(store, pairs, workers)
+
     def get_next_delivery_location(self, current_location):
-        heap = []
-        for location in self.locations:
-            if location != current_location:
-                heapq.heappush(heap, (float('inf'), location))
-        heapq.heappush(heap, (0, current_location))
-
-        while heap:
-            cost, location = heapq.heappop(heap)
-            if cost == float('inf'):
-                break
-            if location != current_location:
-                return location
-
-            for neighbor, edge_distance in self.locations[location]:
-                new_cost = cost + edge_distance
-                for i in range(len(heap)):
-                    if heap[i][1] == neighbor:
-                        if new_cost < heap[i][0]:
-                            heap[i] = (new_cost, neighbor)
-                            heapq.heapify(heap)
-                        break
-        return None
-
-    def get_connections(self, p):
-        if p in self.nodes:
-            return self.edges[p]
-        return self.edges
+        cache = self.route_cache
+        if cache is None:
+            return self._next_delivery_location(current_location)
+        query = ('next', current_location)
+        location = cache.get(query)
+        if location is MISSING:
+            version = cache.version
+            location = self._next_delivery_location(current_location)
+            # The nearest location is a neighbour: only that edge matters.
+            cache.put(query, location, version, () if location is None else [(current_location, location)])
+        return location
+
+    def _next_delivery_location(self, current_location):
+        if self.compact:
+            return self.locations.nearest_location(current_location)
+        return nearest_location(self.locations, current_location)
+
+    def render_connections(self, path=None):
+        # Users (circles) linked to their companies (squares); a .svg/.eps
+        # path is written without opening a turtle window, as is
+        # turtle_render.FALLBACK_PATH when there is no display.
+        from turtle_render import draw_connections
+
+        return draw_connections(self.connections.adjacency(), self.nodes, path)
+
+    def get_connections(self, user_id):
+        # Companies the user is linked to
+        return self.connections.companies_of(user_id)
+
+    def get_companies_sharing_users(self, company_id):
+        # {company_id: number of shared users}, most shared first
+        return self.connections.shared_users(company_id)
+
+    def rebuild_connections(self):
+        # Re-derive the links from the product table, e.g. after rows were
+        # appended to it directly; add_edge_pro links without orders are dropped.
+        self.connections = Connections.from_products(self.products)
 
     def add_product_to_node(self, company_id, product):
+        # Stores the order once in the product table; the company node and
+        # the ordering user only keep its row index.
         if company_id in self.nodes:
-            node = self.nodes[company_id]
-            node.add_product(product)
+            row = self.products.append(company_id, product['name'], product['date'], product['user_id'])
+            self.nodes[company_id].add_product(row)
+            self.add_user_product(product['user_id'], row)
+            self.connections.add(product['user_id'], company_id)
+            if self.order_totals is not None:
+                self.order_totals.add_rows(self.products, row, row + 1)
+            return row
         
     def get_products_by_node(self, company_id):
         if company_id in self.nodes:
             node = self.nodes[company_id]
-            return node.products
+            return self.products.take(node.products)
         return []
 
     def get_all_nodes(self):
         return list(self.nodes.keys())
 
-    def add_user_product(self, user_id, product):
+    def add_user_product(self, user_id, row):
         if user_id in self.user_products:
-            self.user_products[user_id].append(product)
+            self.user_products[user_id].append(row)
         else:
-            self.user_products[user_id] = [product]
+            self.user_products[user_id] = array('q', [row])
 
     def get_user_products(self, user_id):
         if user_id in self.user_products:
-            return self.user_products[user_id]
+            return self.products.take(self.user_products[user_id])
         return []
         
     def get_companies_by_user(self, user_id):
-        companies = []
-        for company_id in self.nodes:
-            products = self.get_products_by_node(company_id)
-            for product in products:
-                if product['user_id'] == user_id:
-                    companies.append(company_id)
-        return companies
-
+        return self.products.companies_of(self.user_products.get(user_id, []))
+
+    def ingest_orders(self, events, chunk_size=None):
+        # Streams order events (dicts, or a JSON-lines file path) into the
+        # product table a batch at a time, registering unknown companies,
+        # and keeps the running totals current; returns the number ingested.
+        from order_stream import CHUNK_SIZE, grouped_rows, iter_order_chunks, iter_order_events
+
+        if isinstance(events, str):
+            events = iter_order_events(events)
+        totals = self._order_totals()
+        products = self.products
+        count = 0
+        for company_ids, names, days, user_ids in iter_order_chunks(events, chunk_size or CHUNK_SIZE):
+            start = products.extend(company_ids, names, days, user_ids)
+            for company_id, rows in grouped_rows(company_ids, start):
+                self.add_node(company_id)
+                self.nodes[company_id].products.frombytes(rows.tobytes())
+            users = products.user_column.data[start:len(products)]
+            for user, rows in grouped_rows(users, start):
+                user_id = products.users[user]
+                if user_id not in self.user_products:
+                    self.user_products[user_id] = array('q')
+                self.user_products[user_id].frombytes(rows.tobytes())
+            pairs = set(zip(users.tolist(), company_ids.tolist()))
+            self.connections.add_many((products.users[user], company_id) for user, company_id in pairs)
+            totals.add_rows(products, start, len(products))
+            count += len(names)
+        return count
+
+    def _order_totals(self, today_number=None):
+        # Status buckets are as of one day; rebuilt (one vectorised pass)
+        # when a report asks about another.
+        from order_stream import OrderTotals
+
+        reference = today() if today_number is None else today_number
+        if self.order_totals is None or self.order_totals.reference != reference:
+            self.order_totals = OrderTotals.from_table(self.products, reference)
+        return self.order_totals
+
+    def get_delivery_status_counts(self, today_number=None):
+        # {company_id: {status: count}} read from the running totals
+        company_ids, counts = self._order_totals(today_number).status_counts()
+        return {company_id: dict(zip(DELIVERY_STATUSES, row))
+                for company_id, row in zip(company_ids.tolist(), counts.tolist())}
+
+    def get_average_delivery_time(self, today_number=None):
+        # (number of orders, mean days since order); the day sums don't
+        # depend on the reference day, so any totals will do.
+        reference = today() if today_number is None else today_number
+        totals = self.order_totals if self.order_totals is not None else self._order_totals(reference)
+        return totals.count, totals.average_days(reference)
+
+    def get_company_order_summary(self, company_id, today_number=None):
+        # {'count', 'average_days', 'statuses'} or None without orders
+        return self._order_totals(today_number).company(company_id)
+
+    def get_user_order_summary(self, user_id, today_number=None):
+        return self._order_totals(today_number).user(self.products.user_ids.get(user_id))
+
+    def search_products_by_name(self, name):
+        # [(company_id, product), ...] for every product with that name
+        return self.products.products_named(name)
+
+    def _rows_with_companies(self, rows):
+        companies = self.products.company_column.data
+        return [(int(companies[row]), self.products.row(row)) for row in rows.tolist()]
+
+    def get_orders_between(self, start_date, end_date, company_id=None):
+        # [(company_id, product), ...] ordered in that date range (inclusive),
+        # oldest first; only one company's with company_id
+        rows = self.products.date_index().rows_between(start_date, end_date, company_id)
+        return self._rows_with_companies(rows)
+
+    def get_daily_order_counts(self, start_date, end_date, company_id=None):
+        # {'YYYY-MM-DD': number of orders} for every day of the range
+        from date_index import _day
+
+        first = _day(start_date)
+        counts = self.products.date_index().day_counts(first, end_date, company_id)
+        return {from_day(first + i): count for i, count in enumerate(counts.tolist())}
+
+    def get_oldest_undelivered(self, limit=10, today_number=None, company_id=None):
+        # [(company_id, product), ...] of the longest-waiting open orders
+        rows = self.products.date_index().oldest_undelivered(today_number, limit, company_id)
+        return self._rows_with_companies(rows)
+
+@instrumentation.instrument
 class DeliveryService:
-    def __init__(self):
-        self.graph = Graph()
+    def __init__(self, compact=False):
+        self.graph = Graph(compact)
 
     def add_location(self):
         location = input("Enter location: ")
@@ -127,6 +533,14 @@ class DeliveryService:
         distance = float(input("Enter distance: "))
         self.graph.add_edge(source, destination, distance)
 
+    def import_edges(self):
+        path = input("Enter edge list (.csv/.tsv) or distance matrix (.npy) path: ")
+        try:
+            count = self.graph.load_edges(path)
+            print(f"Imported {count} edges.")
+        except (OSError, ValueError) as e:
+            print(f"Import failed: {e}")
+
     def visualize_graph(self):
         self.graph.visualize_graph()
 
@@ -140,25 +554,16 @@ class DeliveryService:
         current_location = input("Enter current location: ")
         next_location = self.graph.get_next_delivery_location(current_location)
         return next_location
-    
-class PriorityQueue:
-    def __init__(self):
-        self.queue = []
-
-    def push(self, priority, item):
-        self.queue.append((priority, item))
-
-    def pop(self):
-        if not self.is_empty():
-            min_index = 0
-            for i in range(1, len(self.queue)):
-                if self.queue[i][0] < self.queue[min_index][0]:
-                    min_index = i
-            return self.queue.pop(min_index)[1]
-
-    def is_empty(self):
-        return len(self.queue) == 0
 
+    def plan_route(self):
+        start = input("Enter start location: ")
+        stops = [stop.strip() for stop in input("Enter stops (comma separated): ").split(',') if stop.strip()]
+        try:
+            return self.graph.plan_route(start, stops)
+        except ValueError as e:
+            print(e)
+            return None
+    
 def validate_date(date_str):
     try:
         order_date = datetime.datetime.strptime(date_str, "%Y-%m-%d")
@@ -192,34 +597,25 @@ def add_product(user):
         product = {'name': name, 'date': date, 'user_id': user} #add user id to the product
         r[user]=product
         graph.add_node(company_id)
-        graph.add_product_to_node(company_id, product)
-        graph.add_user_product(user, product)  # Store the product for the user
+        graph.add_product_to_node(company_id, product)  # Also stores the product for the user
         print("Product details added successfully.")
     except ValueError:
         print("Invalid company ID. Please enter a valid integer.")
 
 def check_delivery_status():
     print("=== Delivery Status ===")
-    priority_queue = PriorityQueue()
+    today_number = today()  # one "today" for the whole report
+    status_counts = graph.get_delivery_status_counts(today_number)
+    statuses = graph.products.delivery_status(today_number)
     for company_id in graph.get_all_nodes():
-        products = graph.get_products_by_node(company_id)
-        if products:
-            order_date = datetime.datetime.strptime(products[0]['date'], "%Y-%m-%d").date()
-            current_date = datetime.datetime.now().date()
-            days_difference = (current_date - order_date).days
-            delivery_status = ''
-
-            if days_difference < 3:
-                delivery_status = 'In-transit'
-            elif 3 <= days_difference <= 5:
-                delivery_status = 'Out of delivery'
-            else:
-                delivery_status = 'Delivered'
-
+        rows = graph.nodes[company_id].products
+        if rows:
             print(f"Delivery status for Company {company_id}:")
-            print(f"Number of products: {len(products)}")
-            for product in products:
-                print(f"Delivery status {product['name']} from Company {company_id} ordered on {product['date']} - {delivery_status}")
+            print(f"Number of products: {len(rows)}")
+            print(", ".join(f"{status}: {count}" for status, count in status_counts[company_id].items()))
+            for row in rows:
+                product = graph.products.row(row)
+                print(f"Delivery status {product['name']} from Company {company_id} ordered on {product['date']} - {DELIVERY_STATUSES[statuses[row]]}")
         else:
             print(f"No products found for Company {company_id}")
     else:
@@ -239,34 +635,46 @@ def get_products_by_company():
 
 def calculate_average_delivery_time():
     print("=== Calculate Average Delivery Time ===")
-    total_delivery_time = 0
-    count = 0
-    for company_id in graph.get_all_nodes():
-        products = graph.get_products_by_node(company_id)
-        if products:
-            for product in products:
-                order_date = datetime.datetime.strptime(product['date'], "%Y-%m-%d").date()
-                current_date = datetime.datetime.now().date()
-                days_difference = (current_date - order_date).days
-                total_delivery_time += days_difference
-                count += 1
+    count, average_delivery_time = graph.get_average_delivery_time()
     if count > 0:
-        average_delivery_time = total_delivery_time / count
         print(f"The average delivery time for {count} products is: {average_delivery_time:.2f} days")
     else:
         print("No products found.")
 
+def import_orders():
+    print("=== Import Orders ===")
+    path = input("Enter order events file (JSON lines): ")
+    try:
+        count = graph.ingest_orders(path)
+        print(f"Imported {count} orders.")
+    except (OSError, ValueError) as e:
+        print(f"Import failed: {e}")
+
+def get_orders_between_dates():
+    print("=== Orders Between Dates ===")
+    start_date = input("Enter the start date (YYYY-MM-DD): ")
+    end_date = input("Enter the end date (YYYY-MM-DD): ")
+    try:
+        orders = graph.get_orders_between(start_date, end_date)
+    except ValueError:
+        print("Invalid date format. Please enter dates in YYYY-MM-DD format.")
+        return
+    print(f"Number of orders: {len(orders)}")
+    for company_id, product in orders:
+        print(f"Company {company_id}: {product['name']} ordered on {product['date']} by {product['user_id']}")
+    oldest = graph.get_oldest_undelivered(5)
+    if oldest:
+        print("Oldest undelivered orders:")
+        for company_id, product in oldest:
+            print(f"Company {company_id}: {product['name']} ordered on {product['date']} by {product['user_id']}")
+
 def search_product_by_name():
     print("=== Search Product by Name ===")
     product_name = input("Enter the product name to search: ")
-    found = False
-    for company_id in graph.get_all_nodes():
-        products = graph.get_products_by_node(company_id)
-        for product in products:
-            if product['name'] == product_name:
-                print(f"Product found in Company {company_id}:")
-                print(f"Product Name: {product['name']}, Order Date: {product['date']}")
-                found = True
+    found = graph.search_products_by_name(product_name)
+    for company_id, product in found:
+        print(f"Product found in Company {company_id}:")
+        print(f"Product Name: {product['name']}, Order Date: {product['date']}")
     if not found:
         print(f"No products found with the name '{product_name}'.")
 
@@ -300,8 +708,10 @@ def main():
         print("8. Get Companies by users")
         print("9. Show Company IDs")
         print("10. Show the Companies using edges connected with users")
-        print("11. Exit")
-        choice = input("Enter your choice (1-11): ")
+        print("11. Import Orders From File")
+        print("12. Orders Between Dates")
+        print("13. Exit")
+        choice = input("Enter your choice (1-13): ")
         if choice == '1':
             for user in names:
                 add_product(user)
@@ -312,7 +722,9 @@ def main():
                 print("3. Visualize Graph")
                 print("4. Get Shortest Delivery Path")
                 print("5. Get Next Delivery Location")
-                print("6. Exit")
+                print("6. Import Edges From File")
+                print("7. Plan Multi-Stop Route")
+                print("8. Exit")
                 choice = int(input("\nEnter your choice: "))
 
                 if choice == 1:
@@ -328,6 +740,13 @@ def main():
                     next_delivery_location = delivery_service.get_next_delivery_location()
                     print("Next Delivery Location:", next_delivery_location)
                 elif choice == 6:
+                    delivery_service.import_edges()
+                elif choice == 7:
+                    route = delivery_service.plan_route()
+                    if route is not None:
+                        print("Stop Order:", route[0])
+                        print("Route:", route[1])
+                elif choice == 8:
                     break
                 else:
                     print("Invalid choice. Please try again.")
@@ -353,17 +772,23 @@ def main():
             x = graph.get_all_nodes()
             print(x)
         elif choice == '10':
-            x = graph.get_all_nodes()
-            for i in range(n):
-                for j in x:
-                    graph.add_edge_pro(i, j)
-                connections = graph.get_connections(i)
+            for user in names:
+                connections = graph.get_connections(user)
                 # Print the connected companies
-                print(f"User {names[i]} is connected to the following companies:")
+                print(f"User {user} is connected to the following companies:")
                 print(connections)
-                # for k in connections:
-                #     print(k)
+            for company_id in graph.get_all_nodes():
+                shared = graph.get_companies_sharing_users(company_id)
+                if shared:
+                    print(f"Company {company_id} shares users with (company: users): {shared}")
+            drawn = graph.render_connections()
+            if isinstance(drawn, str):
+                print(f"No display available; connection map written to {drawn}")
         elif choice == '11':
+            import_orders()
+        elif choice == '12':
+            get_orders_between_dates()
+        elif choice == '13':
             print("Exiting the program...")
             break
         else:
@@ -374,74 +799,3 @@ if __name__ == '__main__':
     graph = Graph()
     delivery_service = DeliveryService()
     main()
-
-
-# Set up the turtle screen
-screen = turtle.Screen()
-screen.setup(1200, 600)
-
-# Create the turtle objects
-t1 = turtle.Turtle()
-t2 = turtle.Turtle()
-t1.speed(20)
-t2.speed(20)
-
-# Define colors for the circles
-circle_colors = ['red', 'blue']
-
-# Draw the central circle for the first output
-radius = 50
-t1.penup()
-t1.goto(-300, -radius)
-t1.pendown()
-t1.color(circle_colors[0])
-t1.begin_fill()
-t1.circle(radius)
-t1.end_fill()
-
-# Draw the outer circles and connecting lines for the first output
-num_shapes = 7
-angle = 360 / num_shapes
-
-for i in range(num_shapes):
-    t1.penup()
-    t1.goto(-320, 0)
-    t1.pendown()
-    t1.setheading(i * angle)
-    t1.forward(radius * 2)
-
-    # Draw the square for the first output
-    t1.color(circle_colors[1])
-    t1.begin_fill()
-    for _ in range(4):
-        t1.forward(radius)
-        t1.right(90)
-    t1.end_fill()
-
-# Draw the central circle for the second output
-t2.penup()
-t2.goto(200, 0)
-t2.pendown()
-t2.color(circle_colors[0])
-t2.begin_fill()
-t2.circle(radius)
-t2.end_fill()
-
-# Connect the second output circle with adjacent two blue squares in the first output
-for i in range(2):
-    # Connect each side of the second output circle with the corresponding blue square
-    t2.penup()
-    t2.goto(175, 0)
-    t2.pendown()
-    t2.setheading((i+0.25) * angle)
-    t2.color('red')
-    t2.pensize(5)
-    t2.forward(radius)
-    t2.goto(-259 + radius, 0 + (radius * 2 * i))
-
-# Hide the turtle cursors
-t1.hideturtle()
-t2.hideturtle()
-
-# Close the turtle graphics window
-turtle.done()
@@ -0,0 +1,118 @@
+import heapq
+from itertools import count
+
+
+class PriorityQueue:
+    """Binary min-heap of ``(priority, item)`` with decrease-key.
+
+    Items with equal priority come out in the order they were pushed.  An
+    item -> heap position index makes ``update_priority`` and ``remove``
+    O(log n), so items must be hashable and are unique in the queue:
+    pushing an item that is already queued just changes its priority.
+    """
+
+    def __init__(self):
+        self.queue = []         # heap of [priority, sequence, item]
+        self.position = {}      # item -> index in self.queue
+        self._sequence = count()
+
+    def push(self, priority, item):
+        if item in self.position:
+            self.update_priority(item, priority)
+            return
+        self.queue.append([priority, next(self._sequence), item])
+        self.position[item] = len(self.queue) - 1
+        self._sift_up(len(self.queue) - 1)
+
+    def push_many(self, pairs):
+        """Add many ``(priority, item)`` pairs, heapifying once at the end."""
+        for priority, item in pairs:
+            if item in self.position:
+                self.queue[self.position[item]][0] = priority
+            else:
+                self.position[item] = len(self.queue)
+                self.queue.append([priority, next(self._sequence), item])
+        heapq.heapify(self.queue)
+        self.position = {entry[2]: i for i, entry in enumerate(self.queue)}
+
+    def pop(self):
+        if not self.is_empty():
+            return self._remove_at(0)[2]
+
+    def peek(self):
+        if not self.is_empty():
+            return self.queue[0][2]
+
+    def update_priority(self, item, priority):
+        i = self.position[item]
+        entry = self.queue[i]
+        old, entry[0] = entry[0], priority
+        if priority < old:
+            self._sift_up(i)
+        else:
+            self._sift_down(i)
+
+    def remove(self, item):
+        self._remove_at(self.position[item])
+
+    def is_empty(self):
+        return len(self.queue) == 0
+
+    def __len__(self):
+        return len(self.queue)
+
+    def __contains__(self, item):
+        return item in self.position
+
+    def _remove_at(self, i):
+        queue = self.queue
+        entry = queue[i]
+        del self.position[entry[2]]
+        last = queue.pop()
+        if i < len(queue):
+            queue[i] = last
+            self.position[last[2]] = i
+            self._sift_down(i)
+            self._sift_up(i)
+        return entry
+
+    def _sift_up(self, i):
+        queue, position = self.queue, self.position
+        entry = queue[i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            if entry < queue[parent]:
+                queue[i] = queue[parent]
+                position[queue[i][2]] = i
+                i = parent
+            else:
+                break
+        queue[i] = entry
+        position[entry[2]] = i
+
+    def _sift_down(self, i):
+        # Same strategy as heapq._siftup: walk the smaller child up to a leaf,
+        # then sift the displaced entry back up, which saves comparisons.
+        queue, position = self.queue, self.position
+        n = len(queue)
+        start = i
+        entry = queue[i]
+        child = 2 * i + 1
+        while child < n:
+            right = child + 1
+            if right < n and not queue[child] < queue[right]:
+                child = right
+            queue[i] = queue[child]
+            position[queue[i][2]] = i
+            i = child
+            child = 2 * i + 1
+        while i > start:
+            parent = (i - 1) >> 1
+            if entry < queue[parent]:
+                queue[i] = queue[parent]
+                position[queue[i][2]] = i
+                i = parent
+            else:
+                break
+        queue[i] = entry
+        position[entry[2]] = i
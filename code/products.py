@@ -0,0 +1,252 @@
+import datetime
+import re
+from array import array
+
+import numpy as np
+
+EPOCH = datetime.date(1970, 1, 1)
+ISO_DATE = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+# Delivery status buckets by days since the order: < 3, 3-5, > 5.
+DELIVERY_STATUSES = ('In-transit', 'Out of delivery', 'Delivered')
+# Days since the order at which each status after the first begins.
+STATUS_BOUNDS = (3, 6)
+
+
+def to_day(date):
+    """``'YYYY-MM-DD'`` (or a ``date``) -> days since 1970-01-01."""
+    if isinstance(date, str):
+        try:
+            date = datetime.date.fromisoformat(date)
+        except ValueError:
+            # validate_date accepts unpadded dates such as 2024-3-7 too
+            date = datetime.datetime.strptime(date, "%Y-%m-%d").date()
+    return (date - EPOCH).days
+
+
+def to_days(dates, latest=None):
+    """Day numbers (int32 array) for a sequence of ``'YYYY-MM-DD'`` strings.
+
+    Stricter than NumPy's own parsing, which takes 'today', 'NaT' or
+    '2024-03' too: anything but a real YYYY-MM-DD date, or a date after
+    ``latest`` (default today, as validate_date has it), raises ValueError.
+    """
+    try:
+        ok = all(map(ISO_DATE.fullmatch, dates))
+    except TypeError:
+        ok = False
+    if not ok:
+        bad = next(date for date in dates if not isinstance(date, str) or not ISO_DATE.fullmatch(date))
+        raise ValueError(f"order date {bad!r} is not a YYYY-MM-DD date")
+    days = np.array(dates, dtype='datetime64[D]').astype(np.int64)
+    latest = today() if latest is None else latest
+    if len(days) and days.max() > latest:
+        raise ValueError(f"order date {dates[int(days.argmax())]!r} is in the future")
+    return days.astype(np.int32)
+
+
+def from_day(day):
+    return (EPOCH + datetime.timedelta(days=int(day))).isoformat()
+
+
+def today():
+    return to_day(datetime.date.today())
+
+
+def status_codes(days, today_number):
+    """Index into DELIVERY_STATUSES for each order day, as of ``today_number``."""
+    return np.digitize(today_number - np.asarray(days), STATUS_BOUNDS).astype(np.int8)
+
+
+class _Column:
+    """Append-only NumPy column that doubles its capacity as it grows."""
+
+    def __init__(self, dtype):
+        self.data = np.empty(1024, dtype=dtype)
+        self.size = 0
+
+    def append(self, value):
+        if self.size == len(self.data):
+            self.data = np.resize(self.data, 2 * len(self.data))
+        self.data[self.size] = value
+        self.size += 1
+
+    def extend(self, values):
+        values = np.asarray(values)
+        if values.dtype.kind in 'iu' and self.data.dtype.kind in 'iu' and len(values):
+            limits = np.iinfo(self.data.dtype)
+            if values.min() < limits.min or values.max() > limits.max:
+                raise ValueError(f"values outside the {self.data.dtype} range of the column")
+        values = values.astype(self.data.dtype, copy=False)
+        needed = self.size + len(values)
+        if needed > len(self.data):
+            self.data = np.resize(self.data, max(needed, 2 * len(self.data)))
+        self.data[self.size:needed] = values
+        self.size = needed
+
+    def view(self):
+        # Safe to keep: growing swaps in a new buffer instead of resizing this one.
+        return self.data[:self.size]
+
+
+class ProductTable:
+    """Columnar store of every product (order) added to a ``Graph``.
+
+    One row per order: interned product-name and user ids, the company id
+    and the order date as an int32 day number (days since 1970-01-01, which
+    ``astype('datetime64[D]')`` reads directly).  ``Node.products`` and
+    ``Graph.user_products`` hold row indices into it, and an inverted
+    index from product name to rows is kept up to date on write.
+    Date-range queries go through ``date_index()``.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.name_ids = {}
+        self.users = []
+        self.user_ids = {}
+        self.name_column = _Column(np.int32)
+        self.user_column = _Column(np.int32)
+        self.company_column = _Column(np.int32)
+        self.day_column = _Column(np.int32)
+        self.rows_by_name = {}
+        self._date_index = None
+
+    @classmethod
+    def from_columns(cls, names, users, name_ids, user_ids, company_ids, days):
+        """Rebuild a table around existing (possibly memory-mapped) columns.
+
+        The columns are only copied if rows are appended later.
+        """
+        from snapshot import group_rows
+
+        table = cls()
+        table.names, table.users = names, users
+        table.name_ids = {name: i for i, name in enumerate(names)}
+        table.user_ids = {user: i for i, user in enumerate(users)}
+        for column, values in ((table.name_column, name_ids), (table.user_column, user_ids),
+                               (table.company_column, company_ids), (table.day_column, days)):
+            column.data, column.size = values, len(values)
+        order, offsets = group_rows(table.name_column.view(), len(names))
+        for name_id in range(len(names)):
+            table.rows_by_name[name_id] = array('q', order[offsets[name_id]:offsets[name_id + 1]].tobytes())
+        return table
+
+    def __len__(self):
+        return self.day_column.size
+
+    @staticmethod
+    def _intern(value, ids, values):
+        i = ids.get(value)
+        if i is None:
+            i = ids[value] = len(values)
+            values.append(value)
+        return i
+
+    def append(self, company_id, name, date, user_id):
+        """Store one order and return its row index."""
+        row = len(self)
+        name_id = self._intern(name, self.name_ids, self.names)
+        user = self._intern(user_id, self.user_ids, self.users)
+        self.name_column.append(name_id)
+        self.user_column.append(user)
+        self.company_column.append(company_id)
+        self.day_column.append(to_day(date))
+        rows = self.rows_by_name.get(name_id)
+        if rows is None:
+            rows = self.rows_by_name[name_id] = array('q')
+        rows.append(row)
+        return row
+
+    def extend(self, company_ids, names, days, user_ids):
+        """Store a batch of orders (``days`` as day numbers, see to_days);
+        returns the row index of the first one."""
+        start = len(self)
+        # First, so an out-of-range company id fails before anything changes.
+        self.company_column.extend(company_ids)
+        intern = self._intern
+        name_ids = np.fromiter((intern(name, self.name_ids, self.names) for name in names),
+                               dtype=np.int32, count=len(names))
+        users = np.fromiter((intern(user, self.user_ids, self.users) for user in user_ids),
+                            dtype=np.int32, count=len(user_ids))
+        self.name_column.extend(name_ids)
+        self.user_column.extend(users)
+        self.day_column.extend(days)
+        present, inverse = np.unique(name_ids, return_inverse=True)
+        order = np.argsort(inverse, kind='stable') + start
+        offsets = np.zeros(len(present) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(inverse, minlength=len(present)), out=offsets[1:])
+        for k, name_id in enumerate(present.tolist()):
+            rows = self.rows_by_name.get(name_id)
+            if rows is None:
+                rows = self.rows_by_name[name_id] = array('q')
+            rows.frombytes(order[offsets[k]:offsets[k + 1]].tobytes())
+        return start
+
+    @property
+    def days(self):
+        return self.day_column.view()
+
+    @property
+    def companies(self):
+        return self.company_column.view()
+
+    def row(self, i):
+        """The order as the ``{'name', 'date', 'user_id'}`` dict callers expect."""
+        return {'name': self.names[self.name_column.data[i]],
+                'date': from_day(self.day_column.data[i]),
+                'user_id': self.users[self.user_column.data[i]]}
+
+    def take(self, rows):
+        return [self.row(i) for i in rows]
+
+    def products_named(self, name):
+        name_id = self.name_ids.get(name)
+        if name_id is None:
+            return []
+        companies = self.company_column.data
+        return [(int(companies[i]), self.row(i)) for i in self.rows_by_name[name_id]]
+
+    def date_index(self):
+        """The DateIndex over the order dates, built on first use."""
+        if self._date_index is None:
+            from date_index import DateIndex
+            self._date_index = DateIndex(self)
+        return self._date_index
+
+    def companies_of(self, rows):
+        """Distinct company ids among ``rows`` (e.g. one user's orders)."""
+        if not len(rows):
+            return []
+        rows = np.frombuffer(rows, dtype=np.int64) if isinstance(rows, array) else np.asarray(rows)
+        return np.unique(self.company_column.data[rows]).tolist()
+
+    def delivery_status(self, today_number=None):
+        """Per-row status codes (see DELIVERY_STATUSES)."""
+        return status_codes(self.days, today() if today_number is None else today_number)
+
+    def status_counts(self, today_number=None):
+        """``(company_ids, counts)`` where ``counts[i]`` holds the number of
+        orders of ``company_ids[i]`` in each DELIVERY_STATUSES bucket."""
+        companies = self.companies.astype(np.int64)
+        codes = self.delivery_status(today_number)
+        buckets = len(DELIVERY_STATUSES)
+        if not len(companies):
+            return companies, np.zeros((0, buckets), dtype=np.int64)
+        low, high = companies.min(), companies.max()
+        if high - low <= 2 * len(companies):
+            # Dense ids: bincount straight on the offset ids, no sort needed.
+            counts = np.bincount((companies - low) * buckets + codes,
+                                 minlength=(high - low + 1) * buckets).reshape(-1, buckets)
+            present = np.flatnonzero(counts.any(axis=1))
+            return present + low, counts[present]
+        company_ids, inverse = np.unique(companies, return_inverse=True)
+        counts = np.bincount(inverse * buckets + codes, minlength=len(company_ids) * buckets)
+        return company_ids, counts.reshape(-1, buckets)
+
+    def average_delivery_days(self, today_number=None):
+        """Mean days since order over every row, or None when empty."""
+        if not len(self):
+            return None
+        days = self.days
+        return float((today() if today_number is None else today_number) - days.mean(dtype=np.float64))
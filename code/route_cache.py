@@ -0,0 +1,173 @@
+import sys
+import threading
+from collections import OrderedDict
+
+import instrumentation
+
+MISSING = object()
+
+MAX_ENTRIES = 4096
+MAX_BYTES = 256 << 20
+# A source that misses this many times gets its whole shortest-path tree
+# cached, so further routes from the same depot are a predecessor walk.
+TREE_AFTER = 3
+
+
+class RouteCache:
+    """Bounded LRU of route query results for one ``Graph``.
+
+    Every entry belongs to the graph ``version`` it was computed at.
+    Adding a location or edge, or shortening an edge, bumps the version and
+    drops every entry, and ``put`` refuses a result computed against an
+    older version, so a stale route is never served.  Lengthening an edge
+    only evicts the entries whose route uses it (``evict_edges``): a longer
+    edge can't make any other route shorter.
+
+    Besides single results it keeps single-source shortest-path trees
+    (``(dist, prev)`` maps) for sources that are asked about often.  Sizes
+    are estimated from the containers, not the location names they share
+    with the graph.  Safe to use from several reader threads.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES, tree_after=TREE_AFTER):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.tree_after = tree_after
+        self.version = 0
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.tree_hits = 0
+        self._entries = OrderedDict()   # query -> (value, size, edges)
+        self._edge_queries = {}         # (a, b) -> {query}
+        self._trees = set()             # queries holding a tree
+        self._source_misses = {}
+        self._trees_fit = True
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, query):
+        """The cached value for ``query`` (a tuple), or MISSING."""
+        with self._lock:
+            entry = self._entries.get(query)
+            if entry is not None:
+                self._entries.move_to_end(query)
+                self.hits += 1
+            else:
+                self.misses += 1
+        instrumentation.cache('route', entry is not None)
+        return MISSING if entry is None else entry[0]
+
+    def put(self, query, value, version, edges=()):
+        """Store ``value`` for ``query`` if the graph is still at ``version``
+        (read before computing it); ``edges`` are the ``(a, b)`` pairs the
+        result depends on."""
+        size = _size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if version != self.version:
+                return
+            if query in self._entries:
+                self._remove(query)
+            edges = tuple(edges)
+            self._entries[query] = (value, size, edges)
+            self.bytes += size
+            for edge in edges:
+                self._edge_queries.setdefault(edge, set()).add(query)
+            if query[0] == 'tree':
+                self._trees.add(query)
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, query):
+        value, size, edges = self._entries.pop(query)
+        self.bytes -= size
+        self._trees.discard(query)
+        for edge in edges:
+            queries = self._edge_queries.get(edge)
+            if queries is not None:
+                queries.discard(query)
+                if not queries:
+                    del self._edge_queries[edge]
+
+    def invalidate(self):
+        """The graph changed in a way that can shorten routes: start over."""
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+            self._edge_queries.clear()
+            self._trees.clear()
+            self._source_misses.clear()
+            self.bytes = 0
+
+    def evict_edges(self, edges):
+        """Drop the entries whose route uses any of the ``(a, b)`` edges,
+        in either direction; returns how many were dropped."""
+        edges = list(edges)
+        dropped = 0
+        with self._lock:
+            for a, b in edges:
+                for edge in ((a, b), (b, a)):
+                    for query in list(self._edge_queries.get(edge, ())):
+                        self._remove(query)
+                        dropped += 1
+            # Trees aren't in the edge index (that would be an entry per
+            # location); an edge is in one if it is a predecessor link.
+            for query in list(self._trees):
+                prev = self._entries[query][0][1]
+                if any(prev.get(b, MISSING) == a or prev.get(a, MISSING) == b for a, b in edges):
+                    self._remove(query)
+                    dropped += 1
+        return dropped
+
+    def tree(self, source):
+        """The cached ``(dist, prev)`` tree of ``source``, or None."""
+        with self._lock:
+            entry = self._entries.get(('tree', source))
+            if entry is not None:
+                self._entries.move_to_end(('tree', source))
+                self.tree_hits += 1
+        instrumentation.cache('route_tree', entry is not None)
+        return None if entry is None else entry[0]
+
+    def wants_tree(self, source):
+        """Count a miss from ``source``; True once it is worth a tree.
+
+        The count starts again then, so a tree that keeps getting evicted
+        is rebuilt only every ``tree_after`` misses.
+        """
+        if not self._trees_fit:
+            return False
+        with self._lock:
+            if len(self._source_misses) >= self.max_entries:
+                self._source_misses.clear()
+            misses = self._source_misses.get(source, 0) + 1
+            if misses >= self.tree_after:
+                self._source_misses.pop(source, None)
+                return True
+            self._source_misses[source] = misses
+        return False
+
+    def put_tree(self, source, dist, prev, version):
+        if _size((dist, prev)) > self.max_bytes:
+            # The network has outgrown the cache; stop building trees.
+            self._trees_fit = False
+        self.put(('tree', source), (dist, prev), version)
+
+    def stats(self):
+        # A miss answered from a source's tree counts towards the hit rate.
+        lookups = self.hits + self.misses
+        return {'entries': len(self._entries), 'bytes': self.bytes, 'version': self.version,
+                'hits': self.hits, 'misses': self.misses, 'tree_hits': self.tree_hits,
+                'hit_rate': (self.hits + self.tree_hits) / lookups if lookups else 0.0}
+
+
+def _size(value):
+    if isinstance(value, tuple) and len(value) == 2 and isinstance(value[0], dict):
+        dist, prev = value
+        # The maps plus a float per distance.
+        return sys.getsizeof(dist) + sys.getsizeof(prev) + 24 * len(dist)
+    return sys.getsizeof(value)
@@ -0,0 +1,239 @@
+"""Headless access to the delivery network.
+
+``call(graph, op, args)`` runs one operation without any ``input()``, and
+``serve()`` exposes the same operations as JSON lines over TCP::
+
+    python code/service.py --port 8765 --edges roads.csv
+    {"id": 1, "op": "shortest_path", "args": {"start_location": "A", "end_location": "B"}}
+    {"id": 1, "result": ["A", "C", "B"]}
+
+Requests on one connection may be pipelined; replies carry the request id
+and can come back out of order.  Queries run in a thread pool (or, with
+``--processes`` and a snapshot, in worker processes that each map the same
+snapshot file) so the event loop keeps accepting clients.
+
+A request with ``"profile": true`` also gets a ``"profile"`` entry (cProfile
+top functions, seconds and peak allocation, see instrumentation.capture);
+with ``--stats`` the ``stats`` op returns the collected timings and counters
+(route-cache hit rates are always included).
+"""
+import argparse
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+import instrumentation
+
+READ, WRITE = 'read', 'write'
+
+# op -> (Graph method, kind)
+OPERATIONS = {
+    'add_location': ('add_location', WRITE),
+    'add_edge': ('add_edge', WRITE),
+    'add_edges': ('add_edges', WRITE),
+    'update_edge_weights': ('update_edge_weights', WRITE),
+    'shortest_path': ('get_shortest_path', READ),
+    'shortest_paths_batch': ('get_shortest_paths_batch', READ),
+    'next_location': ('get_next_delivery_location', READ),
+    'distance': ('get_distance', READ),
+    'plan_route': ('plan_route', READ),
+}
+
+
+def call(graph, op, args=None):
+    """Run ``op`` (a key of OPERATIONS) on ``graph`` with keyword ``args``."""
+    if op == 'stats':
+        stats = instrumentation.snapshot()
+        if getattr(graph, 'route_cache', None) is not None:
+            stats['route_cache'] = graph.route_cache.stats()
+        return stats
+    if op not in OPERATIONS:
+        raise ValueError(f"Unknown operation {op!r}")
+    method, kind = OPERATIONS[op]
+    args = dict(args or {})
+    if op == 'shortest_paths_batch':
+        args.setdefault('workers', 1)   # already inside a pool worker
+    result = getattr(graph, method)(**args)
+    return list(result) if isinstance(result, tuple) else result
+
+
+def profiled_call(graph, op, args=None):
+    """``call`` under instrumentation.capture; returns ``(result, report)``."""
+    with instrumentation.capture() as report:
+        result = call(graph, op, args)
+    return result, report
+
+
+class ReadWriteLock:
+    """Any number of concurrent readers, or a single writer.
+
+    Waiting writers block new readers so updates are not starved by a steady
+    stream of queries.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self):
+        with self._condition:
+            while self._writer or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = False
+                self._condition.notify_all()
+
+
+class GraphService:
+    """Thread-safe wrapper used by the server; usable directly as well."""
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.lock = ReadWriteLock()
+
+    def call(self, op, args=None, profile=False):
+        kind = OPERATIONS.get(op, (None, READ))[1]
+        with (self.lock.write() if kind == WRITE else self.lock.read()):
+            return (profiled_call if profile else call)(self.graph, op, args)
+
+
+_WORKER_GRAPH = None
+
+
+def _load_worker(graph_class, snapshot, stats=False):
+    global _WORKER_GRAPH
+    instrumentation.enable(stats)
+    _WORKER_GRAPH = graph_class.load(snapshot)
+
+
+def _worker_call(op, args, profile=False):
+    return (profiled_call if profile else call)(_WORKER_GRAPH, op, args)
+
+
+async def _handle(reader, writer, service, loop, pool, processes):
+    # asyncio and the executors are only imported by the server itself, so
+    # call()/GraphService users and pool workers don't pay for them.
+    import asyncio
+
+    send_lock = asyncio.Lock()
+
+    async def reply(line):
+        request = None
+        try:
+            request = json.loads(line)
+            op, args = request.get('op'), request.get('args') or {}
+            profile = bool(request.get('profile'))
+            response = {'id': request.get('id')}
+            if processes is not None and OPERATIONS.get(op, (None, READ))[1] == READ:
+                result = await loop.run_in_executor(processes, _worker_call, op, args, profile)
+            elif processes is not None:
+                raise ValueError("the server is read-only when queries run in worker processes")
+            else:
+                result = await loop.run_in_executor(pool, service.call, op, args, profile)
+            if profile:
+                result, response['profile'] = result
+            response['result'] = result
+        except Exception as e:
+            response = {'id': request.get('id') if isinstance(request, dict) else None,
+                        'error': f"{type(e).__name__}: {e}"}
+        async with send_lock:
+            writer.write(json.dumps(response).encode() + b'\n')
+            await writer.drain()
+
+    tasks = set()
+    try:
+        while line := await reader.readline():
+            if line.strip():
+                task = asyncio.ensure_future(reply(line))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks)
+    finally:
+        writer.close()
+
+
+async def serve(graph, host='127.0.0.1', port=8765, threads=None, processes=0, snapshot=None, ready=None):
+    """Serve ``graph`` until cancelled; ``ready(host, port)`` is called once
+    the socket is listening (``port=0`` picks a free one)."""
+    import asyncio
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    loop = asyncio.get_running_loop()
+    service = GraphService(graph)
+    pool = ThreadPoolExecutor(threads or min(32, (os.cpu_count() or 1) + 4))
+    workers = None
+    if processes:
+        if snapshot is None:
+            raise ValueError("worker processes need a snapshot to map")
+        workers = ProcessPoolExecutor(processes, initializer=_load_worker,
+                                      initargs=(type(graph), snapshot, instrumentation.ENABLED))
+    server = await asyncio.start_server(
+        lambda r, w: _handle(r, w, service, loop, pool, workers), host, port, limit=2**24)
+    if ready is not None:
+        ready(*server.sockets[0].getsockname()[:2])
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        pool.shutdown(wait=False)
+        if workers is not None:
+            workers.shutdown(wait=False)
+
+
+def main():
+    import asyncio
+
+    from Advanced import Graph
+
+    parser = argparse.ArgumentParser(description="JSON-lines delivery network server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--snapshot', help="Graph.save() file to serve")
+    parser.add_argument('--edges', help="edge list / .npy matrix to load at start-up")
+    parser.add_argument('--threads', type=int)
+    parser.add_argument('--processes', type=int, default=0,
+                        help="answer queries in N processes mapping --snapshot (read-only)")
+    parser.add_argument('--stats', action='store_true', help="collect timings and counters for the stats op")
+    args = parser.parse_args()
+    if args.stats:
+        instrumentation.enable()
+
+    graph = Graph.load(args.snapshot) if args.snapshot else Graph(compact=True)
+    if args.edges:
+        graph.load_edges(args.edges)
+
+    def ready(host, port):
+        print(f"listening on {host}:{port}", flush=True)
+
+    try:
+        asyncio.run(serve(graph, args.host, args.port, args.threads, args.processes, args.snapshot, ready))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,402 @@
+import heapq
+from contextlib import closing
+
+import instrumentation
+
+INF = float('inf')
+
+
+def iter_settled(adjacency, source):
+    """Yield ``(location, cost)`` in the order Dijkstra settles them.
+
+    ``adjacency`` maps a location to a list of ``(neighbor, distance)`` pairs,
+    the same shape as ``Graph.locations``.  The heap uses lazy deletion: an
+    improved cost is pushed again and stale entries are skipped when popped,
+    so a full run costs O((V + E) log V) instead of rescanning the heap.
+    The search is counted when the generator finishes or is closed.
+    """
+    best = {source: 0}
+    settled = set()
+    heap = [(0, source)]
+    relaxed = 0
+    try:
+        while heap:
+            cost, location = heapq.heappop(heap)
+            if location in settled:
+                continue
+            settled.add(location)
+            yield location, cost
+            for neighbor, distance in adjacency[location]:
+                new_cost = cost + distance
+                if new_cost < best.get(neighbor, INF):
+                    best[neighbor] = new_cost
+                    heapq.heappush(heap, (new_cost, neighbor))
+                    relaxed += 1
+    finally:
+        if instrumentation.ENABLED:
+            instrumentation.search('iter_settled', len(settled), relaxed)
+
+
+def dijkstra(adjacency, source, target=None):
+    """Return ``(dist, prev)`` for every location reachable from ``source``.
+
+    The search stops as soon as ``target`` is settled when one is given; in
+    that case only the entries on the way to ``target`` are final.
+    """
+    dist = {source: 0}
+    prev = {}
+    settled = set()
+    heap = [(0, source)]
+    relaxed = 0
+    while heap:
+        cost, location = heapq.heappop(heap)
+        if location in settled:
+            continue
+        settled.add(location)
+        if location == target:
+            break
+        for neighbor, distance in adjacency[location]:
+            new_cost = cost + distance
+            if new_cost < dist.get(neighbor, INF):
+                dist[neighbor] = new_cost
+                prev[neighbor] = location
+                heapq.heappush(heap, (new_cost, neighbor))
+                relaxed += 1
+    if instrumentation.ENABLED:
+        instrumentation.search('dijkstra', len(settled), relaxed)
+    return dist, prev
+
+
+def location_dijkstra(adjacency, source, target=None):
+    """``dijkstra`` keyed by location name for either ``Graph`` backend.
+
+    A ``CSRGraph`` (anything with ``views()``) is searched by integer id and
+    the result translated back to names.
+    """
+    views = getattr(adjacency, 'views', None)
+    if views is None:
+        return dijkstra(adjacency, source, target)
+    ids, names = adjacency.ids, adjacency.names
+    dist, prev = csr_dijkstra(*views(), ids[source], None if target is None else ids[target])
+    return ({names[k]: d for k, d in dist.items()},
+            {names[k]: names[p] for k, p in prev.items()})
+
+
+def reconstruct_path(prev, source, target):
+    """Walk the predecessor map back from ``target``; None if unreachable."""
+    if target != source and target not in prev:
+        return None
+    path = [target]
+    while path[-1] != source:
+        path.append(prev[path[-1]])
+    path.reverse()
+    return path
+
+
+def shortest_path(adjacency, source, target):
+    if source not in adjacency or target not in adjacency:
+        return None
+    dist, prev = dijkstra(adjacency, source, target)
+    return reconstruct_path(prev, source, target)
+
+
+def add_shortest_edges(graph, edges):
+    """Add ``(source, destination, distance)`` edges to a networkx graph,
+    which holds one edge per pair: of parallel roads it keeps the shortest,
+    as the searches over the adjacency lists would."""
+    for source, destination, distance in edges:
+        data = graph.get_edge_data(source, destination)
+        if data is None or distance < data['weight']:
+            graph.add_edge(source, destination, weight=distance)
+
+
+def nearest_location(adjacency, source):
+    """The closest reachable location other than ``source`` (or None)."""
+    if source not in adjacency:
+        return None
+    with closing(iter_settled(adjacency, source)) as settled:
+        for location, cost in settled:
+            if location != source:
+                return location
+    return None
+
+
+def csr_dijkstra(offsets, targets, weights, source, target=None):
+    """Integer-id variant of ``dijkstra`` over compressed sparse rows.
+
+    Neighbours of ``u`` are ``targets[offsets[u]:offsets[u + 1]]`` with the
+    matching ``weights``.  Pass memoryviews (see ``CSRGraph.views``) rather
+    than NumPy arrays: indexing them yields plain Python numbers.
+    """
+    dist = {source: 0}
+    prev = {}
+    settled = set()
+    heap = [(0, source)]
+    relaxed = 0
+    while heap:
+        cost, u = heapq.heappop(heap)
+        if u in settled:
+            continue
+        settled.add(u)
+        if u == target:
+            break
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            new_cost = cost + weights[k]
+            if new_cost < dist.get(v, INF):
+                dist[v] = new_cost
+                prev[v] = u
+                heapq.heappush(heap, (new_cost, v))
+                relaxed += 1
+    if instrumentation.ENABLED:
+        instrumentation.search('csr_dijkstra', len(settled), relaxed)
+    return dist, prev
+
+
+def csr_nearest(offsets, targets, weights, source):
+    """Closest neighbour id of ``source`` (ties go to the lower id)."""
+    best = None
+    for k in range(offsets[source], offsets[source + 1]):
+        v = targets[k]
+        if v != source and (best is None or (weights[k], v) < best):
+            best = (weights[k], v)
+    if instrumentation.ENABLED:
+        # Only the source is settled; every edge out of it is looked at.
+        instrumentation.search('csr_nearest', 1, offsets[source + 1] - offsets[source])
+    return None if best is None else best[1]
+
+
+def dense_dijkstra(distances, source=0, target=None):
+    """O(V^2) Dijkstra over a dense ``n x n`` distance matrix.
+
+    Each step takes the argmin over the unvisited costs and relaxes the whole
+    row of the settled location at once, which beats a heap on complete
+    graphs.  As in ``bulk_loader.iter_matrix_chunks``, inf/nan entries mean
+    "no edge", 0 is a zero-length road and a negative off-diagonal entry
+    raises ValueError.  Returns NumPy arrays ``(dist, prev)`` with -1 as
+    "no predecessor".
+    """
+    import numpy as np
+
+    distances = np.asarray(distances, dtype=np.float64)
+    n = distances.shape[0]
+    if distances.ndim != 2 or distances.shape[1] != n:
+        raise ValueError(f"expected a square distance matrix, got shape {distances.shape}")
+    negative = distances < 0
+    np.fill_diagonal(negative, False)
+    if negative.any():
+        raise ValueError("distances must be non-negative")
+    dist = np.full(n, INF)
+    prev = np.full(n, -1, dtype=np.int64)
+    unvisited = np.ones(n, dtype=bool)
+    dist[source] = 0
+    for _ in range(n):
+        u = int(np.argmin(np.where(unvisited, dist, INF)))
+        if not unvisited[u] or dist[u] == INF:
+            break
+        unvisited[u] = False
+        if u == target:
+            break
+        row = distances[u]
+        candidate = dist[u] + np.where(np.isnan(row), INF, row)
+        better = unvisited & (candidate < dist)
+        dist[better] = candidate[better]
+        prev[better] = u
+    return dist, prev
+
+
+def dense_path(prev, source, target):
+    """Location indices from ``source`` to ``target`` using ``dense_dijkstra``'s prev."""
+    if target != source and prev[target] < 0:
+        return None
+    path = [target]
+    while path[-1] != source:
+        path.append(int(prev[path[-1]]))
+    path.reverse()
+    return path
+
+
+def astar(adjacency, source, target, heuristic=None):
+    """Point-to-point search guided by ``heuristic(location)``, a lower bound
+    on the remaining distance to ``target`` (plain Dijkstra when None).
+
+    Returns ``(path, cost, settled)``.  The search stops when ``target``
+    is settled, so the path is the shortest one only if the bound never
+    overestimates.
+    """
+    if source not in adjacency or target not in adjacency:
+        return None, INF, 0
+    best = {source: 0}
+    prev = {}
+    settled = 0
+    heap = [(heuristic(source) if heuristic else 0, 0, source)]
+    path, found = None, INF
+    relaxed = 0
+    while heap:
+        _, cost, location = heapq.heappop(heap)
+        if cost > best[location]:
+            continue
+        settled += 1
+        if location == target:
+            path, found = reconstruct_path(prev, source, target), cost
+            break
+        for neighbor, distance in adjacency[location]:
+            new_cost = cost + distance
+            if new_cost < best.get(neighbor, INF):
+                best[neighbor] = new_cost
+                prev[neighbor] = location
+                estimate = new_cost + heuristic(neighbor) if heuristic else new_cost
+                heapq.heappush(heap, (estimate, new_cost, neighbor))
+                relaxed += 1
+    if instrumentation.ENABLED:
+        instrumentation.search('astar' if heuristic else 'dijkstra', settled, relaxed)
+    return path, found, settled
+
+
+def bidirectional_dijkstra(adjacency, source, target):
+    """Dijkstra from both ends of an undirected network at once.
+
+    Returns ``(path, cost, settled)``; stops once the two frontiers' minimum
+    costs add up to at least the best meeting route found so far.
+    """
+    if source not in adjacency or target not in adjacency:
+        return None, INF, 0
+    if source == target:
+        return [source], 0, 1
+    dist = ({source: 0}, {target: 0})
+    prev = ({}, {})
+    done = (set(), set())
+    heaps = ([(0, source)], [(0, target)])
+    best, meeting, settled, relaxed = INF, None, 0, 0
+    while heaps[0] and heaps[1]:
+        if heaps[0][0][0] + heaps[1][0][0] >= best:
+            break
+        side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+        cost, location = heapq.heappop(heaps[side])
+        if location in done[side]:
+            continue
+        done[side].add(location)
+        settled += 1
+        other = dist[1 - side]
+        for neighbor, distance in adjacency[location]:
+            new_cost = cost + distance
+            if new_cost < dist[side].get(neighbor, INF):
+                dist[side][neighbor] = new_cost
+                prev[side][neighbor] = location
+                heapq.heappush(heaps[side], (new_cost, neighbor))
+                relaxed += 1
+            if neighbor in other and new_cost + other[neighbor] < best:
+                best = new_cost + other[neighbor]
+                meeting = (location, neighbor) if side == 0 else (neighbor, location)
+    if instrumentation.ENABLED:
+        instrumentation.search('bidirectional', settled, relaxed)
+    if meeting is None:
+        return None, INF, settled
+    # meeting is an edge (u, v): source ... u -> v ... target
+    u, v = meeting
+    forward = reconstruct_path(prev[0], source, u)
+    backward = reconstruct_path(prev[1], target, v)
+    return forward + backward[::-1], best, settled
+
+
+class Landmarks:
+    """Precomputed distances from a few landmark locations (ALT).
+
+    By the triangle inequality ``|d(L, t) - d(L, v)|`` never exceeds the
+    true distance from ``v`` to ``t``, so the largest such gap over all
+    landmarks is an admissible A* heuristic that needs no coordinates.
+    Landmarks are picked farthest-first so they sit on the network's edge.
+    """
+
+    def __init__(self, adjacency, count=8):
+        self.distances = []
+        locations = iter(adjacency)
+        first = next(locations, None)
+        if first is None:
+            return
+        landmark = first
+        nearest = {}
+        for _ in range(min(count, len(adjacency))):
+            dist, _ = dijkstra(adjacency, landmark)
+            self.distances.append(dist)
+            for location, d in dist.items():
+                if d < nearest.get(location, INF):
+                    nearest[location] = d
+            landmark = max(nearest, key=nearest.get)
+            if nearest[landmark] == 0:
+                break
+
+    def heuristic(self, target):
+        bounds = [(d, d[target]) for d in self.distances if target in d]
+
+        def estimate(location):
+            best = 0
+            for d, to_target in bounds:
+                gap = to_target - d.get(location, to_target)
+                if gap < 0:
+                    gap = -gap
+                if gap > best:
+                    best = gap
+            return best
+        return estimate
+
+
+SEARCH_ALGORITHMS = ('dijkstra', 'astar', 'bidirectional', 'alt')
+
+
+def coordinate_scale(adjacency, coordinates):
+    """Largest factor ``s`` with ``s * straight_line <= road_distance`` on
+    every edge, so that the scaled straight-line distance is a consistent A*
+    bound whatever the units.
+
+    0.0 (no bound, so A* runs as Dijkstra) unless every location has
+    coordinates: a road through a location without them can be far shorter
+    than the straight line between its ends suggests.
+    """
+    scale = INF
+    for location in adjacency:
+        a = coordinates.get(location)
+        if a is None:
+            return 0.0
+        for neighbor, distance in adjacency[location]:
+            b = coordinates.get(neighbor)
+            if b is None:
+                return 0.0
+            straight = ((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2) ** 0.5
+            if straight > 0 and distance / straight < scale:
+                scale = distance / straight
+    return 0.0 if scale == INF else scale
+
+
+def coordinate_heuristic(coordinates, target, scale):
+    goal = coordinates.get(target)
+    if goal is None or scale <= 0:
+        return None
+    gx, gy = goal
+
+    def estimate(location):
+        point = coordinates.get(location)
+        if point is None:
+            return 0
+        return scale * ((point[0] - gx) ** 2 + (point[1] - gy) ** 2) ** 0.5
+    return estimate
+
+
+def point_to_point(adjacency, source, target, algorithm='dijkstra',
+                   coordinates=None, scale=0.0, landmarks=None):
+    """Run one of SEARCH_ALGORITHMS; returns ``(path, cost, settled)``.
+
+    'astar' needs ``coordinates`` and ``scale`` (see coordinate_scale), 'alt'
+    needs a Landmarks instance; without them both degrade to Dijkstra.
+    """
+    if algorithm == 'bidirectional':
+        return bidirectional_dijkstra(adjacency, source, target)
+    if algorithm == 'astar':
+        heuristic = coordinate_heuristic(coordinates or {}, target, scale)
+    elif algorithm == 'alt':
+        heuristic = landmarks.heuristic(target) if landmarks is not None else None
+    elif algorithm == 'dijkstra':
+        heuristic = None
+    else:
+        raise ValueError(f"Unknown algorithm {algorithm!r}; expected one of {SEARCH_ALGORITHMS}")
+    return astar(adjacency, source, target, heuristic)
@@ -0,0 +1,271 @@
+"""Single-file binary snapshots of a Graph that load with ``np.memmap``.
+
+Layout: an 8-byte magic, a little-endian uint64 header length, a JSON header
+(array name -> offset/dtype/shape, plus metadata), then every array at a
+64-byte aligned offset.  Loading maps the file read-only, so start-up does
+not depend on the file size and processes loading the same snapshot share
+its pages.  Strings are stored as a UTF-8 blob with an offsets array and a
+sorted permutation, which lets name lookups binary-search the mapped data
+instead of rebuilding a dict.
+"""
+import json
+import os
+import struct
+from array import array
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+
+MAGIC = b'NGSNAP01'
+ALIGN = 64
+
+
+def _align(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def write_arrays(path, arrays, meta=None):
+    header = {'meta': meta or {}, 'arrays': {}}
+    offset = 0
+    arrays = {name: np.ascontiguousarray(a) for name, a in arrays.items()}
+    for name, a in arrays.items():
+        header['arrays'][name] = {'offset': offset, 'dtype': a.dtype.str, 'shape': list(a.shape)}
+        offset = _align(offset + a.nbytes)
+    blob = json.dumps(header).encode()
+    data_start = _align(len(MAGIC) + 8 + len(blob))
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(blob)))
+        f.write(blob)
+        for name, a in arrays.items():
+            f.seek(data_start + header['arrays'][name]['offset'])
+            a.tofile(f)
+        f.truncate(data_start + offset)
+    os.replace(tmp, path)
+
+
+def read_arrays(path, mmap=True):
+    """Return ``(arrays, meta)``; arrays are read-only views of the file."""
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path}: not a graph snapshot")
+        (length,) = struct.unpack('<Q', f.read(8))
+        header = json.loads(f.read(length))
+    data_start = _align(len(MAGIC) + 8 + length)
+    if mmap:
+        data = np.memmap(path, dtype=np.uint8, mode='r')
+    else:
+        with open(path, 'rb') as f:
+            data = np.frombuffer(f.read(), dtype=np.uint8)
+    arrays = {}
+    for name, spec in header['arrays'].items():
+        dtype = np.dtype(spec['dtype'])
+        count = int(np.prod(spec['shape'], dtype=np.int64))
+        start = data_start + spec['offset']
+        arrays[name] = data[start:start + count * dtype.itemsize].view(dtype).reshape(spec['shape'])
+    return arrays, header['meta']
+
+
+class StringTable(Sequence):
+    """Read-only sequence of strings decoded on access from mapped arrays."""
+
+    def __init__(self, blob, offsets, order):
+        self.blob, self.offsets, self.order = blob, offsets, order
+
+    @staticmethod
+    def encode(strings):
+        encoded = [s.encode() for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        blob = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        order = np.array(sorted(range(len(encoded)), key=encoded.__getitem__), dtype=np.int64)
+        return blob, offsets, order
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        i = int(i)
+        if i < 0:
+            i += len(self)
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes().decode()
+
+    def find(self, value):
+        if not isinstance(value, str):
+            return None
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self[self.order[mid]] < value:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self) and self[self.order[lo]] == value:
+            return int(self.order[lo])
+        return None
+
+
+class IntTable(Sequence):
+    """Read-only sequence of integer location names (e.g. from a .npy load)."""
+
+    def __init__(self, values, order):
+        self.values, self.order = values, order
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, i):
+        return int(self.values[i])
+
+    def find(self, value):
+        if not isinstance(value, (int, np.integer)) or isinstance(value, bool):
+            return None
+        k = int(np.searchsorted(self.values, value, sorter=self.order))
+        if k < len(self.values) and self.values[self.order[k]] == value:
+            return int(self.order[k])
+        return None
+
+
+class NameIndex(Mapping):
+    """name -> id view over a StringTable/IntTable, answered by binary search."""
+
+    def __init__(self, table):
+        self.table = table
+
+    def __getitem__(self, name):
+        i = self.table.find(name)
+        if i is None:
+            raise KeyError(name)
+        return i
+
+    def __contains__(self, name):
+        return self.table.find(name) is not None
+
+    def __iter__(self):
+        return iter(self.table)
+
+    def __len__(self):
+        return len(self.table)
+
+
+def _encode_names(prefix, names, arrays, meta):
+    names = list(names)
+    if names and all(isinstance(n, (int, np.integer)) and not isinstance(n, bool) for n in names):
+        values = np.array(names, dtype=np.int64)
+        arrays[prefix + '_values'] = values
+        arrays[prefix + '_order'] = np.argsort(values, kind='stable')
+        meta[prefix] = 'int'
+    elif all(isinstance(n, str) for n in names):
+        arrays[prefix + '_blob'], arrays[prefix + '_offsets'], arrays[prefix + '_order'] = StringTable.encode(names)
+        meta[prefix] = 'str'
+    else:
+        raise ValueError(f"{prefix}: snapshots need all-str or all-int names")
+
+
+def _decode_names(prefix, arrays, meta):
+    if meta[prefix] == 'int':
+        return IntTable(arrays[prefix + '_values'], arrays[prefix + '_order'])
+    return StringTable(arrays[prefix + '_blob'], arrays[prefix + '_offsets'], arrays[prefix + '_order'])
+
+
+def group_rows(keys, num_keys=None):
+    """Row indices grouped by an integer key column: ``(order, offsets)``
+    such that rows with key ``k`` are ``order[offsets[k]:offsets[k + 1]]``."""
+    keys = np.asarray(keys)
+    order = np.argsort(keys, kind='stable')
+    offsets = np.zeros((num_keys if num_keys is not None else (int(keys.max()) + 1 if len(keys) else 0)) + 1,
+                       dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=len(offsets) - 1), out=offsets[1:])
+    return order, offsets
+
+
+def save_graph(graph, path):
+    """Write ``graph``'s delivery network (and products, when it has them)."""
+    from csr_graph import CSRGraph
+
+    store = graph.locations if graph.compact else CSRGraph.from_adjacency(graph.locations)
+    arrays, meta = {}, {'version': 1}
+    _encode_names('location', store.names, arrays, meta)
+    arrays['edge_sources'] = np.asarray(store.edge_sources, dtype=np.int32)
+    arrays['edge_targets'] = np.asarray(store.edge_targets, dtype=np.int32)
+    arrays['edge_weights'] = np.asarray(store.edge_weights, dtype=np.float64)
+    arrays['csr_offsets'], arrays['csr_targets'], arrays['csr_weights'] = store.csr()
+    coordinates = getattr(graph, 'coordinates', None)
+    if coordinates:
+        xy = np.full((len(store.names), 2), np.nan)
+        for location, point in coordinates.items():
+            if location in store.ids:
+                xy[store.ids[location]] = point
+        arrays['location_xy'] = xy
+    contraction = getattr(graph, 'contraction', None)
+    if contraction is not None:
+        arrays.update(contraction.arrays())
+
+    products = getattr(graph, 'products', None)
+    if products is not None:
+        _encode_names('product_name', products.names, arrays, meta)
+        _encode_names('product_user', products.users, arrays, meta)
+        arrays['product_name_id'] = products.name_column.view()
+        arrays['product_user_id'] = products.user_column.view()
+        arrays['product_company'] = products.company_column.view()
+        arrays['product_day'] = products.day_column.view()
+        arrays['company_ids'] = np.array(list(graph.nodes), dtype=np.int64)
+        connections = getattr(graph, 'connections', None)
+        if connections is not None:
+            users, companies, keys = connections.arrays()
+            _encode_names('connection_user', users, arrays, meta)
+            arrays['connection_companies'] = companies
+            arrays['connection_keys'] = keys
+    write_arrays(path, arrays, meta)
+
+
+def load_graph(cls, path, mmap=True):
+    """Build a compact ``cls`` instance from a snapshot written by save_graph."""
+    from csr_graph import CSRGraph
+    from products import ProductTable
+
+    arrays, meta = read_arrays(path, mmap)
+    graph = cls(compact=True)
+    graph.locations = CSRGraph.from_arrays(
+        _decode_names('location', arrays, meta),
+        arrays['edge_sources'], arrays['edge_targets'], arrays['edge_weights'],
+        (arrays['csr_offsets'], arrays['csr_targets'], arrays['csr_weights']))
+    if 'location_xy' in arrays:
+        # NaN rows are locations without coordinates.
+        names = graph.locations.names
+        xy = arrays['location_xy']
+        keep = np.flatnonzero(~np.isnan(xy[:, 0]))
+        graph.coordinates = {names[i]: tuple(point) for i, point in zip(keep.tolist(), xy[keep].tolist())}
+    if 'ch_rank' in arrays:
+        from contraction import ContractionHierarchy
+        graph.contraction = ContractionHierarchy.from_arrays(graph.locations.names, graph.locations.ids, arrays)
+
+    if 'product_day' in arrays and hasattr(graph, 'products'):
+        products = ProductTable.from_columns(
+            list(_decode_names('product_name', arrays, meta)),
+            list(_decode_names('product_user', arrays, meta)),
+            arrays['product_name_id'], arrays['product_user_id'],
+            arrays['product_company'], arrays['product_day'])
+        graph.products = products
+        for company_id in arrays['company_ids'].tolist():
+            graph.add_node(company_id)
+        if hasattr(graph, 'connections'):
+            from connections import Connections
+            if 'connection_keys' in arrays:
+                graph.connections = Connections.from_arrays(
+                    _decode_names('connection_user', arrays, meta),
+                    arrays['connection_companies'], arrays['connection_keys'])
+            else:
+                graph.connections = Connections.from_products(products)
+        if len(products):
+            company_ids, inverse = np.unique(products.companies, return_inverse=True)
+            order, offsets = group_rows(inverse, len(company_ids))
+            for k, company_id in enumerate(company_ids.tolist()):
+                graph.add_node(company_id)
+                graph.nodes[company_id].products = array('q', order[offsets[k]:offsets[k + 1]].tobytes())
+            users = products.user_column.view()
+            order, offsets = group_rows(users, len(products.users))
+            for k, user_id in enumerate(products.users):
+                graph.user_products[user_id] = array('q', order[offsets[k]:offsets[k + 1]].tobytes())
+    return graph
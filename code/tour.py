@@ -0,0 +1,146 @@
+import time
+
+import numpy as np
+
+from shortest_path import INF, location_dijkstra, reconstruct_path
+
+EPSILON = 1e-9
+
+
+def road_distances(adjacency, locations):
+    """Road-distance submatrix between ``locations`` plus each one's search tree."""
+    matrix = np.full((len(locations), len(locations)), INF)
+    trees = []
+    for i, location in enumerate(locations):
+        dist, prev = location_dijkstra(adjacency, location)
+        matrix[i] = [dist.get(other, INF) for other in locations]
+        trees.append(prev)
+    return matrix, trees
+
+
+def tour_length(matrix, tour):
+    tour = np.asarray(tour)
+    return float(matrix[tour[:-1], tour[1:]].sum())
+
+
+def nearest_neighbor_tour(matrix, start=0, closed=False):
+    n = len(matrix)
+    unvisited = np.ones(n, dtype=bool)
+    unvisited[start] = False
+    tour = [start]
+    for _ in range(n - 1):
+        nxt = int(np.argmin(np.where(unvisited, matrix[tour[-1]], INF)))
+        unvisited[nxt] = False
+        tour.append(nxt)
+    if closed:
+        tour.append(start)
+    return tour
+
+
+def two_opt(matrix, tour, deadline, closed=False):
+    """Segment reversals, scoring every end point for a given start at once."""
+    tour = np.array(tour)
+    m = len(tour)
+    last = m - 2 if closed else m - 1   # last position that may move
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for i in range(1, last):
+            a, b = tour[i - 1], tour[i]
+            js = np.arange(i + 1, last + 1)
+            c = tour[js]
+            delta = matrix[a, c] - matrix[a, b]
+            has_e = js + 1 < m
+            e = tour[js[has_e] + 1]
+            delta[has_e] += matrix[b, e] - matrix[c[has_e], e]
+            k = int(np.argmin(delta))
+            if delta[k] < -EPSILON:
+                j = js[k]
+                tour[i:j + 1] = tour[i:j + 1][::-1].copy()
+                improved = True
+            if time.perf_counter() > deadline:
+                break
+    return tour.tolist()
+
+
+def or_opt(matrix, tour, deadline, closed=False, max_segment=3):
+    """Move runs of 1..max_segment stops, possibly reversed, to a cheaper slot."""
+    tour = list(tour)
+    m = len(tour)
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for length in range(1, max_segment + 1):
+            last = m - 2 if closed else m - 1
+            for i in range(1, last - length + 2):
+                s0, s1 = tour[i], tour[i + length - 1]
+                before = tour[i - 1]
+                after = tour[i + length] if i + length < m else None
+                gain = matrix[before, s0]
+                if after is not None:
+                    gain += matrix[s1, after] - matrix[before, after]
+                rest = np.array(tour[:i] + tour[i + length:])
+                slots = len(rest) - 1 if closed else len(rest)
+                x = rest[:slots]
+                y = rest[1:slots + 1]
+                forward = matrix[x, s0]
+                backward = matrix[x, s1]
+                if len(y):
+                    link = np.zeros(slots)
+                    link[:len(y)] = matrix[s1, y] - matrix[x[:len(y)], y]
+                    forward = forward + link
+                    link[:len(y)] = matrix[s0, y] - matrix[x[:len(y)], y]
+                    backward = backward + link
+                p_forward, p_backward = int(np.argmin(forward)), int(np.argmin(backward))
+                if forward[p_forward] <= backward[p_backward]:
+                    p, cost, segment = p_forward, forward[p_forward], tour[i:i + length]
+                else:
+                    p, cost, segment = p_backward, backward[p_backward], tour[i:i + length][::-1]
+                if cost - gain < -EPSILON:
+                    rest = rest.tolist()
+                    tour = rest[:p + 1] + segment + rest[p + 1:]
+                    improved = True
+                if time.perf_counter() > deadline:
+                    return tour
+    return tour
+
+
+def optimize_tour(matrix, start=0, time_budget=1.0, closed=False):
+    """Nearest-neighbour tour improved by 2-opt and Or-opt until nothing
+    improves or ``time_budget`` seconds have passed."""
+    deadline = time.perf_counter() + time_budget
+    tour = nearest_neighbor_tour(matrix, start, closed)
+    while time.perf_counter() < deadline:
+        length = tour_length(matrix, tour)
+        tour = two_opt(matrix, tour, deadline, closed)
+        tour = or_opt(matrix, tour, deadline, closed)
+        if tour_length(matrix, tour) >= length - EPSILON:
+            break
+    return tour
+
+
+def plan_route(adjacency, start, stops, time_budget=1.0, return_to_start=False):
+    """Order ``stops`` into a short tour from ``start``.
+
+    Returns ``(ordered_stops, path)``: the visiting order (starting with
+    ``start``) and the full location-by-location road path.  Raises
+    ValueError if ``start`` or a stop is unknown or unreachable.
+    """
+    if start not in adjacency:
+        raise ValueError(f"Unknown location {start!r}")
+    locations = [start]
+    for stop in stops:
+        if stop not in adjacency:
+            raise ValueError(f"Unknown location {stop!r}")
+        if stop not in locations:
+            locations.append(stop)
+    matrix, trees = road_distances(adjacency, locations)
+    unreachable = [locations[i] for i in np.nonzero(matrix[0] == INF)[0]]
+    if unreachable:
+        raise ValueError(f"Unreachable from {start!r}: {unreachable}")
+    tour = optimize_tour(matrix, 0, time_budget, return_to_start)
+    ordered = [locations[i] for i in tour]
+    path = [start]
+    for a, b in zip(tour, tour[1:]):
+        path.extend(reconstruct_path(trees[a], locations[a], locations[b])[1:])
+    return ordered, path
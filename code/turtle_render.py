@@ -0,0 +1,170 @@
+from xml.sax.saxutils import escape
+
+# Drawing area in turtle units, (0, 0) in the middle as on a turtle screen.
+WIDTH, HEIGHT = 1200, 600
+MARGIN = 40
+# Above this many users or companies the names are left out.
+LABEL_LIMIT = 60
+# Written instead when there is no turtle window to draw in.
+FALLBACK_PATH = 'connections.svg'
+
+USER_COLOR = (0.85, 0.15, 0.15)
+COMPANY_COLOR = (0.15, 0.3, 0.85)
+EDGE_COLOR = (0.6, 0.6, 0.6)
+
+
+def connection_scene(connections, companies, width=WIDTH, height=HEIGHT):
+    """Lay out a user/company connection map.
+
+    ``connections`` is ``{node: [connected nodes]}`` as kept by
+    ``Graph.add_edge_pro``; nodes in ``companies`` are drawn as squares in
+    a column on the right, everything else as circles on the left.
+    Returns ``(positions, edges, size)`` with each edge listed once.
+    """
+    nodes = set(connections)
+    for neighbors in connections.values():
+        nodes.update(neighbors)
+    right = sorted((node for node in nodes if node in companies), key=str)
+    left = sorted((node for node in nodes if node not in companies), key=str)
+    positions = {}
+    for column, x in ((left, -width / 4), (right, width / 4)):
+        step = (height - 2 * MARGIN) / max(len(column), 1)
+        for i, node in enumerate(column):
+            positions[node] = (x, height / 2 - MARGIN - (i + 0.5) * step)
+    size = min(20.0, 0.8 * (height - 2 * MARGIN) / max(len(left), len(right), 1))
+    edges = set()
+    for node, neighbors in connections.items():
+        for neighbor in neighbors:
+            if (neighbor, node) not in edges:
+                edges.add((node, neighbor))
+    return positions, sorted(edges, key=str), size
+
+
+def draw_connections(connections, companies, path=None, labels=None, screen=None):
+    """Draw the connection map.
+
+    A ``.svg`` or ``.eps`` path is written directly, without Tk, so this
+    works headless.  Otherwise the map goes to ``screen`` (any
+    TurtleScreen, e.g. one on an offscreen canvas) or the default turtle
+    window, with animation off and a single ``update`` at the end.  Without
+    Tk or a display the map is written to FALLBACK_PATH instead.  Returns
+    the path written or the screen drawn on.
+    """
+    if path is None and screen is None:
+        screen = _default_screen()
+        if screen is None:
+            path = FALLBACK_PATH
+    positions, edges, size = connection_scene(connections, companies)
+    labels = labels or {}
+    show_labels = len(positions) <= 2 * LABEL_LIMIT
+    if path is not None:
+        write = _write_eps if path.lower().endswith(('.eps', '.ps')) else _write_svg
+        with open(path, 'w') as f:
+            write(f, positions, edges, size, companies, labels, show_labels)
+        return path
+    return _draw_turtle(screen, positions, edges, size, companies, labels, show_labels)
+
+
+def _default_screen():
+    # The turtle window, or None where Tk or a display is missing.
+    try:
+        import tkinter
+        import turtle
+    except ImportError:
+        return None
+    try:
+        screen = turtle.Screen()
+    except (tkinter.TclError, turtle.Terminator):
+        return None
+    screen.clear()
+    screen.setup(WIDTH, HEIGHT)
+    return screen
+
+
+def _draw_turtle(screen, positions, edges, size, companies, labels, show_labels):
+    import turtle
+
+    tracer = screen.tracer()
+    screen.tracer(0)
+    pen = turtle.RawTurtle(screen, visible=False)
+    pen.speed(0)
+    pen.color(EDGE_COLOR)
+    for node, neighbor in edges:
+        pen.penup()
+        pen.goto(positions[node])
+        pen.pendown()
+        pen.goto(positions[neighbor])
+    pen.penup()
+    half = size / 2
+    for node, (x, y) in positions.items():
+        if node in companies:
+            pen.goto(x - half, y - half)
+            pen.color(COMPANY_COLOR)
+            pen.begin_fill()
+            for corner in ((x + half, y - half), (x + half, y + half), (x - half, y + half), (x - half, y - half)):
+                pen.goto(corner)
+            pen.end_fill()
+        else:
+            pen.goto(x, y)
+            pen.dot(size, USER_COLOR)
+        if show_labels:
+            pen.goto(x, y + half + 2)
+            pen.color('black')
+            pen.write(str(labels.get(node, node)), align='center', font=('Arial', 8, 'normal'))
+    screen.update()
+    screen.tracer(tracer)
+    return screen
+
+
+def _write_svg(f, positions, edges, size, companies, labels, show_labels):
+    def point(x, y):
+        # SVG's y axis points down, the turtle's up.
+        return x + WIDTH / 2, HEIGHT / 2 - y
+
+    def rgb(color):
+        return 'rgb({},{},{})'.format(*(round(255 * c) for c in color))
+
+    f.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{WIDTH}" height="{HEIGHT}">\n')
+    f.write(f'<g stroke="{rgb(EDGE_COLOR)}" stroke-width="1">\n')
+    for node, neighbor in edges:
+        (x1, y1), (x2, y2) = point(*positions[node]), point(*positions[neighbor])
+        f.write(f'<line x1="{x1:.1f}" y1="{y1:.1f}" x2="{x2:.1f}" y2="{y2:.1f}"/>\n')
+    f.write('</g>\n')
+    half = size / 2
+    for node, position in positions.items():
+        x, y = point(*position)
+        if node in companies:
+            f.write(f'<rect x="{x - half:.1f}" y="{y - half:.1f}" width="{size:.1f}" height="{size:.1f}" '
+                    f'fill="{rgb(COMPANY_COLOR)}"/>\n')
+        else:
+            f.write(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="{half:.1f}" fill="{rgb(USER_COLOR)}"/>\n')
+        if show_labels:
+            f.write(f'<text x="{x:.1f}" y="{y - half - 2:.1f}" font-size="8" text-anchor="middle">'
+                    f'{escape(str(labels.get(node, node)))}</text>\n')
+    f.write('</svg>\n')
+
+
+def _write_eps(f, positions, edges, size, companies, labels, show_labels):
+    def text(value):
+        return str(value).replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+    f.write('%!PS-Adobe-3.0 EPSF-3.0\n')
+    f.write(f'%%BoundingBox: 0 0 {WIDTH} {HEIGHT}\n')
+    f.write(f'{WIDTH / 2} {HEIGHT / 2} translate\n')
+    f.write('{} {} {} setrgbcolor 1 setlinewidth\n'.format(*EDGE_COLOR))
+    for node, neighbor in edges:
+        (x1, y1), (x2, y2) = positions[node], positions[neighbor]
+        f.write(f'newpath {x1:.1f} {y1:.1f} moveto {x2:.1f} {y2:.1f} lineto stroke\n')
+    half = size / 2
+    f.write('/Helvetica findfont 8 scalefont setfont\n')
+    for node, (x, y) in positions.items():
+        if node in companies:
+            f.write('{} {} {} setrgbcolor '.format(*COMPANY_COLOR))
+            f.write(f'{x - half:.1f} {y - half:.1f} {size:.1f} {size:.1f} rectfill\n')
+        else:
+            f.write('{} {} {} setrgbcolor '.format(*USER_COLOR))
+            f.write(f'newpath {x:.1f} {y:.1f} {half:.1f} 0 360 arc fill\n')
+        if show_labels:
+            f.write(f'0 setgray {x:.1f} {y + half + 2:.1f} moveto ({text(labels.get(node, node))}) '
+                    'dup stringwidth pop 2 div neg 0 rmoveto show\n')
+    f.write('showpage\n%%EOF\n')
@@ -0,0 +1,247 @@
+import numpy as np
+
+# Up to this many locations every node, label and edge distance is drawn;
+# above it the map is binned into a grid of at most GRID x GRID cells.
+DETAIL_LIMIT = 300
+GRID = 256
+
+
+class GraphLayout:
+    """Cached 2-D positions for the locations of a network.
+
+    ``update`` only places locations it hasn't seen yet, so redrawing after
+    a few ``add_location`` calls doesn't lay the whole graph out again.
+    Known coordinates are used as they are; a small graph is laid out with
+    networkx's spring layout, a large one with a pivot layout (hop counts
+    from a few far-apart locations, projected to 2-D) that costs a handful
+    of breadth-first searches.  A location added later starts at the
+    centre of its already-placed neighbours.
+    """
+
+    def __init__(self, seed=0):
+        self.names = []
+        self.ids = {}
+        self.xy = np.empty((0, 2))
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return len(self.names)
+
+    def update(self, adjacency, coordinates=None):
+        """Place any locations of ``adjacency`` added since the last call."""
+        coordinates = coordinates or {}
+        new = list(_tail(adjacency, len(self.names)))
+        if not new:
+            return self
+        first = not self.names
+        start = len(self.names)
+        for name in new:
+            self.ids[name] = len(self.names)
+            self.names.append(name)
+        sources, targets = edge_arrays(adjacency, self.ids)
+        xy = np.full((len(self.names), 2), np.nan)
+        xy[:start] = self.xy
+        for name in new:
+            point = coordinates.get(name)
+            if point is not None:
+                xy[self.ids[name]] = point
+        missing = np.flatnonzero(np.isnan(xy[:, 0]))
+        if first and len(missing) == len(xy):
+            xy = (_spring_layout(self.names, sources, targets, self.rng) if len(xy) <= DETAIL_LIMIT
+                  else _pivot_layout(len(xy), sources, targets, self.rng))
+        elif len(missing):
+            xy = _place_near_neighbors(xy, missing, sources, targets, self.rng)
+            if len(xy) <= DETAIL_LIMIT:
+                # Let the new locations settle around the ones already drawn.
+                fixed = np.setdiff1d(np.arange(len(xy)), missing)
+                xy = _spring_layout(self.names, sources, targets, self.rng, xy, fixed)
+        self.xy = xy
+        return self
+
+    def positions(self):
+        return {name: tuple(point) for name, point in zip(self.names, self.xy.tolist())}
+
+
+def edge_arrays(adjacency, ids):
+    """``(sources, targets)`` id arrays with each undirected edge once."""
+    if hasattr(adjacency, 'edge_sources'):
+        # CSRGraph: same insertion order as the layout, so ids carry over.
+        return (np.asarray(adjacency.edge_sources, dtype=np.int64),
+                np.asarray(adjacency.edge_targets, dtype=np.int64))
+    pairs = [(ids[source], ids[destination])
+             for source, neighbors in adjacency.items() for destination, _ in neighbors]
+    pairs = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+    pairs = pairs[pairs[:, 0] <= pairs[:, 1]]
+    return pairs[:, 0], pairs[:, 1]
+
+
+def draw_network(adjacency, layout, path=None, title=None, detail_limit=DETAIL_LIMIT, grid=GRID):
+    """Draw ``adjacency`` at ``layout``'s positions.
+
+    Small networks get labelled nodes and edge distances.  Larger ones are
+    binned into a ``grid`` x ``grid`` raster: one marker per occupied cell,
+    sized by how many locations it holds, and one segment per pair of
+    connected cells, all in a single LineCollection.  With ``path`` the
+    figure is rendered headlessly through the Agg canvas and written as
+    PNG or SVG (by extension); otherwise it is shown with pyplot.
+    """
+    from matplotlib.collections import LineCollection
+
+    figure, axes = _figure(path)
+    xy = layout.xy
+    sources, targets = edge_arrays(adjacency, layout.ids)
+    if len(xy) <= detail_limit:
+        points = xy
+        sizes = np.full(len(xy), 300.0)
+    else:
+        cells, points, counts = _bin(xy, grid)
+        sizes = 0.5 + 6 * counts / counts.max()
+        sources, targets = cells[sources], cells[targets]
+        keep = sources != targets
+        pairs = np.unique(np.stack((np.minimum(sources, targets), np.maximum(sources, targets)))[:, keep], axis=1)
+        sources, targets = pairs
+    segments = np.stack((points[sources], points[targets]), axis=1)
+    axes.add_collection(LineCollection(segments, colors='gray', linewidths=0.5 if len(xy) > detail_limit else 1.0,
+                                       zorder=1))
+    axes.scatter(points[:, 0], points[:, 1], s=sizes, c='lightblue', edgecolors='none', zorder=2)
+    if len(xy) <= detail_limit:
+        for name, (x, y) in zip(layout.names, xy.tolist()):
+            axes.annotate(str(name), (x, y), ha='center', va='center', fontsize=8, zorder=3)
+        for source, destination, distance in _labelled_edges(adjacency):
+            middle = (xy[layout.ids[source]] + xy[layout.ids[destination]]) / 2
+            axes.annotate(f"{distance:g}", middle, ha='center', va='center', fontsize=7, color='dimgray')
+    axes.autoscale_view()
+    axes.set_axis_off()
+    if title:
+        axes.set_title(title)
+    return _finish(figure, path)
+
+
+def _figure(path):
+    if path is None:
+        import matplotlib.pyplot as plt
+        figure = plt.figure(figsize=(10, 10))
+    else:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        figure = Figure(figsize=(10, 10))
+        FigureCanvasAgg(figure)
+    return figure, figure.add_subplot(1, 1, 1)
+
+
+def _finish(figure, path):
+    if path is None:
+        import matplotlib.pyplot as plt
+        plt.show()
+        return None
+    figure.savefig(path, dpi=150)
+    return path
+
+
+def _labelled_edges(adjacency):
+    seen = set()
+    for source in adjacency:
+        for destination, distance in adjacency[source]:
+            key = (destination, source)
+            if key not in seen:
+                seen.add((source, destination))
+                yield source, destination, distance
+
+
+def _tail(adjacency, start):
+    names = getattr(adjacency, 'names', None)
+    if names is not None:
+        return [names[i] for i in range(start, len(names))]
+    return list(adjacency)[start:]
+
+
+def _bin(xy, grid):
+    """Map every location to a raster cell; returns (cell of each location,
+    centre of mass of each occupied cell, locations per occupied cell)."""
+    low = xy.min(axis=0)
+    span = np.maximum(xy.max(axis=0) - low, 1e-12)
+    cell = np.minimum(((xy - low) / span * grid).astype(np.int64), grid - 1)
+    flat = cell[:, 0] * grid + cell[:, 1]
+    occupied, cells = np.unique(flat, return_inverse=True)
+    counts = np.bincount(cells, minlength=len(occupied))
+    points = np.stack([np.bincount(cells, weights=xy[:, k], minlength=len(occupied)) for k in (0, 1)], axis=1)
+    return cells, points / counts[:, None], counts
+
+
+def _spring_layout(names, sources, targets, rng, xy=None, fixed=None):
+    import networkx as nx
+
+    graph = nx.Graph()
+    graph.add_nodes_from(range(len(names)))
+    graph.add_edges_from(zip(sources.tolist(), targets.tolist()))
+    pos = None if xy is None else dict(enumerate(xy))
+    fixed = None if fixed is None or not len(fixed) else fixed.tolist()
+    pos = nx.spring_layout(graph, pos=pos, fixed=fixed, seed=int(rng.integers(2 ** 31)))
+    return np.array([pos[i] for i in range(len(names))], dtype=np.float64)
+
+
+def _pivot_layout(n, sources, targets, rng, pivots=20):
+    """High-dimensional embedding: hop distances from a few far-apart pivot
+    locations, projected onto their two principal axes."""
+    rows = np.concatenate((sources, targets))
+    order = np.argsort(rows, kind='stable')
+    neighbors = np.concatenate((targets, sources))[order]
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=offsets[1:])
+    distances = np.empty((min(pivots, n), n))
+    nearest = np.full(n, np.inf)
+    pivot = int(rng.integers(n))
+    for k in range(len(distances)):
+        distances[k] = _hops(offsets, neighbors, pivot)
+        nearest = np.minimum(nearest, distances[k])
+        pivot = int(np.argmax(nearest))
+    centred = distances - distances.mean(axis=1, keepdims=True)
+    _, vectors = np.linalg.eigh(centred @ centred.T)
+    return centred.T @ vectors[:, -2:]
+
+
+def _hops(offsets, neighbors, source):
+    # Breadth-first hop counts, a whole level per step; unreachable
+    # locations are put one hop beyond the farthest reachable one.
+    hops = np.full(len(offsets) - 1, -1.0)
+    hops[source] = 0
+    frontier = np.array([source])
+    level = 0
+    while len(frontier):
+        level += 1
+        starts, ends = offsets[frontier], offsets[frontier + 1]
+        counts = ends - starts
+        shift = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        reached = neighbors[np.arange(counts.sum()) + shift]
+        reached = np.unique(reached[hops[reached] < 0])
+        hops[reached] = level
+        frontier = reached
+    hops[hops < 0] = level
+    return hops
+
+
+def _place_near_neighbors(xy, missing, sources, targets, rng):
+    # A few averaging sweeps so chains of new locations follow their anchors.
+    placed = ~np.isnan(xy[:, 0])
+    if not placed.any():
+        xy[:] = rng.random(xy.shape)
+        return xy
+    low, high = xy[placed].min(axis=0), xy[placed].max(axis=0)
+    jitter = 0.01 * np.maximum(high - low, 1e-9)
+    for _ in range(10):
+        still = missing[np.isnan(xy[missing, 0])]
+        if not len(still):
+            break
+        known = np.nan_to_num(xy)
+        weight = (~np.isnan(xy[:, 0])).astype(np.float64)
+        n = len(xy)
+        count = (np.bincount(sources, weights=weight[targets], minlength=n)
+                 + np.bincount(targets, weights=weight[sources], minlength=n))
+        for k in (0, 1):
+            total = (np.bincount(sources, weights=known[targets, k], minlength=n)
+                     + np.bincount(targets, weights=known[sources, k], minlength=n))
+            reachable = still[count[still] > 0]
+            xy[reachable, k] = total[reachable] / count[reachable] + rng.normal(0, jitter[k], len(reachable))
+    isolated = missing[np.isnan(xy[missing, 0])]
+    xy[isolated] = low + rng.random((len(isolated), 2)) * np.maximum(high - low, 1e-9)
+    return xy
@@ -0,0 +1,6 @@
+import os
+import sys
+
+CODE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'code')
+if CODE_DIR not in sys.path:
+    sys.path.insert(0, CODE_DIR)
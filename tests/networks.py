@@ -0,0 +1,67 @@
+"""Small random road networks and a reference Dijkstra for the tests."""
+import heapq
+import random
+
+
+def random_network(n, seed, extra=2, components=1):
+    """``(edges, coordinates)`` for ``n`` locations named ``L0``...
+
+    Roads cost 1-2x the straight line between their ends, so the
+    coordinates are a valid A* bound.  Locations are split round-robin into
+    ``components`` groups that no road joins; each group is a random tree
+    plus about ``extra`` more roads per location; about one road in ten
+    has a parallel road of a different length.
+    """
+    rng = random.Random(seed)
+    coordinates = {f"L{i}": (rng.uniform(0, 100), rng.uniform(0, 100)) for i in range(n)}
+    groups = [[f"L{i}" for i in range(start, n, components)] for start in range(components)]
+    pairs = []
+    for group in groups:
+        pairs += [(group[i], rng.choice(group[:i])) for i in range(1, len(group))]
+        pairs += [tuple(rng.sample(group, 2)) for _ in range(extra * len(group)) if len(group) > 1]
+    pairs += [(b, a) for a, b in rng.sample(pairs, len(pairs) // 10)]
+    edges = []
+    for a, b in pairs:
+        (ax, ay), (bx, by) = coordinates[a], coordinates[b]
+        straight = ((ax - bx) ** 2 + (ay - by) ** 2) ** 0.5
+        edges.append((a, b, straight * rng.uniform(1, 2)))
+    return edges, coordinates
+
+
+def reference_distances(edges, source):
+    """Distance from ``source`` to every location it reaches."""
+    adjacency = {}
+    for a, b, distance in edges:
+        adjacency.setdefault(a, []).append((b, distance))
+        adjacency.setdefault(b, []).append((a, distance))
+    dist = {source: 0}
+    heap = [(0, source)]
+    while heap:
+        cost, location = heapq.heappop(heap)
+        if cost > dist[location]:
+            continue
+        for neighbor, distance in adjacency.get(location, ()):
+            if cost + distance < dist.get(neighbor, float('inf')):
+                dist[neighbor] = cost + distance
+                heapq.heappush(heap, (cost + distance, neighbor))
+    return dist
+
+
+def path_cost(edges, path):
+    """Length of ``path`` over the cheapest road between each pair, or None
+    if some step has no road."""
+    roads = {}
+    for a, b, distance in edges:
+        for key in ((a, b), (b, a)):
+            roads[key] = min(distance, roads.get(key, distance))
+    steps = [roads.get(step) for step in zip(path, path[1:])]
+    return None if None in steps else sum(steps)
+
+
+def build(cls, edges, coordinates, compact=False):
+    graph = cls(compact)
+    for name, point in coordinates.items():
+        graph.add_location(name, point)
+    for a, b, distance in edges:
+        graph.add_edge(a, b, distance)
+    return graph
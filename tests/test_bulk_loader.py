@@ -0,0 +1,35 @@
+"""The same roads loaded from an edge list and from a distance matrix."""
+import numpy as np
+import pytest
+
+from Advanced import Graph
+from shortest_path import dense_dijkstra
+
+INF = float('inf')
+MATRIX = [[0, 0, INF, 5],
+          [0, 0, 1, INF],
+          [INF, 1, 0, float('nan')],
+          [5, INF, float('nan'), 0]]
+
+
+def test_zero_length_road_is_kept_by_every_loader(tmp_path):
+    csv_path, npy_path = tmp_path / 'edges.csv', tmp_path / 'distances.npy'
+    csv_path.write_text("0,1,0\n1,2,1\n0,3,5\n")
+    np.save(npy_path, np.array(MATRIX))
+    from_csv, from_npy = Graph(), Graph()
+    from_csv.load_edges(str(csv_path))
+    from_npy.load_edges(str(npy_path))
+    assert from_csv.get_distance('0', '2') == from_npy.get_distance(0, 2) == 1
+    assert from_npy.get_shortest_path(0, 2) == [0, 1, 2]
+    dist, _ = dense_dijkstra(MATRIX, 0)
+    assert dist.tolist() == [0, 0, 1, 5]
+
+
+def test_negative_matrix_entry_is_rejected(tmp_path):
+    matrix = np.array(MATRIX)
+    matrix[0, 3] = matrix[3, 0] = -1
+    np.save(tmp_path / 'distances.npy', matrix)
+    with pytest.raises(ValueError, match="row 0, column 3"):
+        Graph().load_edges(str(tmp_path / 'distances.npy'))
+    with pytest.raises(ValueError):
+        dense_dijkstra(matrix, 0)
@@ -0,0 +1,65 @@
+"""DistanceTable repairs against a fresh Dijkstra after every change."""
+import random
+
+import pytest
+
+import Advanced
+import integrated_with_turtle
+from networks import build, path_cost, random_network, reference_distances
+
+GRAPHS = [Advanced.Graph, integrated_with_turtle.Graph]
+
+
+def check_table(graph, edges):
+    table = graph.distance_table
+    for source in table.sources:
+        expected = reference_distances(edges, source)
+        for target in table.names:
+            distance = graph.get_distance(source, target)
+            assert distance == pytest.approx(expected.get(target, float('inf'))), (source, target)
+            path = table.path(source, target)
+            if target in expected:
+                assert path_cost(edges, path) == pytest.approx(expected[target]), (source, target)
+            else:
+                assert path is None
+
+
+def set_distance(edges, a, b, distance):
+    # update_edge_weights changes every road between the pair.
+    return [(s, d, distance if {s, d} == {a, b} else w) for s, d, w in edges]
+
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('method,depots', [('floyd-warshall', False), ('dijkstra', False), ('dijkstra', True)])
+@pytest.mark.parametrize('compact', [False, True])
+@pytest.mark.parametrize('cls', GRAPHS)
+def test_repairs_match_dijkstra(cls, compact, method, depots, seed):
+    rng = random.Random(seed)
+    edges, coordinates = random_network(30, seed, components=2)
+    graph = build(cls, edges, coordinates, compact)
+    names = sorted(coordinates)
+    graph.precompute_distances(rng.sample(names, 6) if depots else None, method)
+    check_table(graph, edges)
+
+    # New locations and roads, including one that joins the two components.
+    for i in range(3):
+        name = f"new{i}"
+        graph.add_location(name)
+        names.append(name)
+        for _ in range(2):
+            edge = (name, rng.choice(names[:-1]), rng.uniform(1, 50))
+            graph.add_edge(*edge)
+            edges.append(edge)
+    edge = ('L0', 'L1', rng.uniform(1, 50))
+    graph.add_edge(*edge)
+    edges.append(edge)
+    check_table(graph, edges)
+
+    # Roads made longer, shorter and both at once; the first round
+    # lengthens most of them so whole rows are recomputed as well.
+    for scale in ((3, 10), (0.1, 0.5), (0.5, 2), (0.5, 2)):
+        changes = [(a, b, w * rng.uniform(*scale)) for a, b, w in rng.sample(edges, 8)]
+        graph.update_edge_weights(changes)
+        for a, b, distance in changes:
+            edges = set_distance(edges, a, b, distance)
+        check_table(graph, edges)
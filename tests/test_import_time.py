@@ -0,0 +1,14 @@
+"""Import-time budget of the entry-point modules (benchmarks/bench_import_time.py)."""
+import os
+import subprocess
+import sys
+
+SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks', 'bench_import_time.py')
+
+
+def test_import_time_within_budget():
+    # IMPORT_TIME_SCALE loosens every budget on slow CI machines.
+    scale = os.environ.get('IMPORT_TIME_SCALE', '1')
+    result = subprocess.run([sys.executable, SCRIPT, '--repeat', '5', '--scale', scale],
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stdout + result.stderr
@@ -0,0 +1,63 @@
+"""Answers served through the route cache against a fresh Dijkstra while
+the network changes underneath it."""
+import random
+
+import pytest
+
+import Advanced
+import integrated_with_turtle
+from networks import build, path_cost, random_network, reference_distances
+from shortest_path import SEARCH_ALGORITHMS
+
+GRAPHS = [Advanced.Graph, integrated_with_turtle.Graph]
+
+
+def check_queries(graph, edges, sources, targets):
+    for source in sources:
+        expected = reference_distances(edges, source)
+        nearest = min((w for s, d, w in edges if source in (s, d) and s != d), default=None)
+        for target in targets:
+            for algorithm in (None, None, None) + SEARCH_ALGORITHMS:
+                path = graph.get_shortest_path(source, target, algorithm)
+                assert path_cost(edges, path) == pytest.approx(expected[target]), (source, target, algorithm)
+        location = graph.get_next_delivery_location(source)
+        if nearest is None:
+            assert location is None
+        else:
+            roads = [w for s, d, w in edges if {s, d} == {source, location}]
+            assert min(roads) == pytest.approx(nearest)
+
+
+@pytest.mark.parametrize('seed', range(4))
+@pytest.mark.parametrize('compact', [False, True])
+@pytest.mark.parametrize('cls', GRAPHS)
+def test_cached_answers_follow_the_network(cls, compact, seed):
+    rng = random.Random(seed)
+    edges, coordinates = random_network(30, seed)
+    graph = build(cls, edges, coordinates, compact)
+    names = sorted(coordinates)
+    # Few sources, asked about repeatedly, so shortest-path trees get cached.
+    sources = rng.sample(names, 3)
+    for step in range(12):
+        check_queries(graph, edges, sources, rng.sample(names, 6))
+        kind = step % 4
+        if kind == 0:
+            # Longer roads: only the routes over them are evicted.
+            changes = [(a, b, w * rng.uniform(1.5, 5)) for a, b, w in rng.sample(edges, 4)]
+        elif kind == 1:
+            changes = [(a, b, w * rng.uniform(0.1, 0.7)) for a, b, w in rng.sample(edges, 4)]
+        elif kind == 2:
+            name = f"new{step}"
+            graph.add_location(name, (rng.uniform(0, 100), rng.uniform(0, 100)))
+            names.append(name)
+            changes = []
+            for _ in range(2):
+                edge = (name, rng.choice(names[:-1]), rng.uniform(1, 50))
+                graph.add_edge(*edge)
+                edges.append(edge)
+        else:
+            changes = [(a, b, w * rng.uniform(0.5, 2)) for a, b, w in rng.sample(edges, 4)]
+        graph.update_edge_weights(changes)
+        for a, b, distance in changes:
+            edges = [(s, d, distance if {s, d} == {a, b} else w) for s, d, w in edges]
+    assert graph.route_cache.stats()['tree_hits'] > 0
@@ -0,0 +1,69 @@
+"""Every search mode against plain Dijkstra."""
+import random
+
+import pytest
+
+import Advanced
+import integrated_with_turtle
+from networks import build, path_cost, random_network, reference_distances
+from shortest_path import SEARCH_ALGORITHMS, dijkstra
+
+GRAPHS = [Advanced.Graph, integrated_with_turtle.Graph]
+
+
+@pytest.mark.parametrize('algorithm', SEARCH_ALGORITHMS + ('ch',))
+@pytest.mark.parametrize('compact', [False, True])
+@pytest.mark.parametrize('cls', GRAPHS)
+def test_route_through_location_without_coordinates(cls, compact, algorithm):
+    # w has no coordinates, and s-v-w-t (2) is far shorter than the straight
+    # line from s to t (10) suggests.
+    edges = [('s', 't', 10), ('s', 'v', 1), ('v', 'w', 0.5), ('w', 't', 0.5)]
+    graph = build(cls, edges, {'s': (0, 0), 't': (10, 0), 'v': (-1, 0), 'w': None}, compact)
+    dist, _ = dijkstra(graph.locations, 's', 't')
+    assert dist['t'] == 2
+    path = graph.get_shortest_path('s', 't', algorithm)
+    assert path == ['s', 'v', 'w', 't']
+    assert path_cost(edges, path) == dist['t']
+
+
+@pytest.mark.parametrize('algorithm', (None,) + SEARCH_ALGORITHMS + ('ch',))
+@pytest.mark.parametrize('compact', [False, True])
+@pytest.mark.parametrize('cls', GRAPHS)
+def test_parallel_road_added_later_does_not_hide_shorter_one(cls, compact, algorithm):
+    edges = [('a', 'b', 1), ('b', 'c', 1), ('a', 'c', 3), ('a', 'b', 5)]
+    graph = build(cls, edges, dict.fromkeys('abc'), compact)
+    graph.graph   # the networkx copy is then kept up to date edge by edge
+    graph.add_edge('b', 'c', 4)
+    assert graph.get_shortest_path('a', 'c', algorithm) == ['a', 'b', 'c']
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('partial', [False, True])
+@pytest.mark.parametrize('compact', [False, True])
+@pytest.mark.parametrize('cls', GRAPHS)
+def test_random_networks_match_dijkstra(cls, compact, partial, seed):
+    edges, coordinates = random_network(40, seed)
+    if partial:
+        # Every third location without coordinates.
+        coordinates = {name: None if i % 3 == 0 else point for i, (name, point) in enumerate(coordinates.items())}
+    graph = build(cls, edges, coordinates, compact)
+    graph.route_cache = None
+    rng = random.Random(seed)
+    for source in rng.sample(sorted(coordinates), 5):
+        expected = reference_distances(edges, source)
+        for target in rng.sample(sorted(coordinates), 8):
+            for algorithm in (None,) + SEARCH_ALGORITHMS + ('ch',):
+                path = graph.get_shortest_path(source, target, algorithm)
+                assert path[0] == source and path[-1] == target, algorithm
+                assert path_cost(edges, path) == pytest.approx(expected[target]), algorithm
+            assert graph.get_distance(source, target) == pytest.approx(expected[target])
+
+
+@pytest.mark.parametrize('algorithm', (None,) + SEARCH_ALGORITHMS + ('ch',))
+@pytest.mark.parametrize('compact', [False, True])
+@pytest.mark.parametrize('cls', GRAPHS)
+def test_no_route_is_none_on_every_backend(cls, compact, algorithm):
+    graph = build(cls, [('a', 'b', 1), ('c', 'd', 1)], dict.fromkeys('abcde'), compact)
+    for start, end in (('a', 'c'), ('a', 'missing'), ('missing', 'a'), ('e', 'a')):
+        assert graph.get_shortest_path(start, end, algorithm) is None
+    assert graph.get_shortest_path('e', 'e', algorithm) == ['e']